@@ -0,0 +1,177 @@
+"""
+Learning-path analytics over sequential_paths (roadmap phase 3).
+
+Two streams of keys are counted per article (each key once per article):
+  - prefixes of every path:      (L3,), (L3, L4), (L3, L4, L5), (L3, L4, L5, L6)
+  - contiguous n-grams, n >= 2:  (L4, L5), (L3, L4, L5), ...
+Counts live in a count-min sketch per stream: fixed-size hashed counters
+instead of a dict of every progression, whose estimates can overcount on
+collisions but never undercount. A heavy-hitter table
+keeps the TOP_K keys by estimated count: after each batch the table and the
+batch's distinct keys are re-estimated together and the top TOP_K are kept.
+Path depths are counted exactly. PathAnalytics is a StoreIndex, so it is
+persisted next to the store and fed each ingested article by core; dashboards
+read these aggregates instead of rescanning the store.
+"""
+import zlib
+import typing as T
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+
+from store_index import StoreIndex
+
+LEVELS = ["L3", "L4", "L5", "L6"]
+SKETCH_WIDTH = 1 << 16
+SKETCH_DEPTH = 4
+TOP_K = 256
+
+Key = T.Tuple[str, ...]
+
+
+def _encode(key: Key) -> bytes:
+    return "\x1f".join(key).encode("utf-8")
+
+
+class CountMinSketch:
+    """depth × width int32 counters; row i hashes with h1 + i*h2 (double hashing)."""
+
+    def __init__(self, width: int = SKETCH_WIDTH, depth: int = SKETCH_DEPTH):
+        self.table = np.zeros((depth, width), dtype=np.int32)
+
+    def _cells(self, keys: T.Sequence[Key]) -> np.ndarray:
+        raw = [_encode(k) for k in keys]
+        h1 = np.fromiter((zlib.crc32(b) for b in raw), dtype=np.int64, count=len(raw))
+        h2 = np.fromiter((zlib.adler32(b) | 1 for b in raw), dtype=np.int64, count=len(raw))
+        depth, width = self.table.shape
+        return (h1[None, :] + np.arange(depth)[:, None] * h2[None, :]) % width
+
+    def add(self, keys: T.Sequence[Key], counts: np.ndarray) -> None:
+        cells = self._cells(keys)
+        for row in range(self.table.shape[0]):
+            np.add.at(self.table[row], cells[row], counts.astype(np.int32))
+
+    def estimate(self, keys: T.Sequence[Key]) -> np.ndarray:
+        if not len(keys):
+            return np.empty(0, dtype=np.int64)
+        cells = self._cells(keys)
+        return self.table[np.arange(self.table.shape[0])[:, None], cells].min(axis=0)
+
+
+class HeavyHitters:
+    """Count-min sketch plus the top_k keys by estimated count."""
+
+    def __init__(self, top_k: int = TOP_K, width: int = SKETCH_WIDTH):
+        self.sketch = CountMinSketch(width)
+        self.top_k = top_k
+        self.top: T.Dict[Key, int] = {}
+
+    def update(self, counts: T.Dict[Key, int]) -> None:
+        if not counts:
+            return
+        keys = list(counts)
+        self.sketch.add(keys, np.fromiter(counts.values(), dtype=np.int64, count=len(keys)))
+        candidates = list(dict.fromkeys(list(self.top) + keys))
+        est = self.sketch.estimate(candidates)
+        if len(candidates) > self.top_k:
+            keep = np.argpartition(-est, self.top_k - 1)[:self.top_k]
+        else:
+            keep = np.arange(len(candidates))
+        self.top = {candidates[i]: int(est[i]) for i in keep.tolist()}
+
+    def estimate(self, key: Key) -> int:
+        return int(self.sketch.estimate([tuple(key)])[0])
+
+    def most_common(self, k: int, where: T.Optional[T.Callable[[Key], bool]] = None) -> T.List[T.Tuple[Key, int]]:
+        items = [(key, c) for key, c in self.top.items() if where is None or where(key)]
+        return sorted(items, key=lambda kc: (-kc[1], kc[0]))[:k]
+
+
+def article_keys(paths: T.Any) -> T.Tuple[T.Set[Key], T.Set[Key], T.List[int]]:
+    """(distinct prefixes, distinct n-grams, depth of each valid path) of one article."""
+    prefixes: T.Set[Key] = set()
+    ngrams: T.Set[Key] = set()
+    depths: T.List[int] = []  # aligned with the paths that have at least an L3
+    for path in paths if isinstance(paths, list) else []:
+        if not isinstance(path, list):
+            continue
+        tags = []
+        for tag in path[:len(LEVELS)]:
+            if not isinstance(tag, str) or not tag:
+                break
+            tags.append(tag)
+        if not tags:
+            continue
+        depths.append(len(tags))
+        prefixes.add((tags[0],))
+        for end in range(2, len(tags) + 1):
+            prefixes.add(tuple(tags[:end]))
+            for start in range(end - 1):
+                ngrams.add(tuple(tags[start:end]))
+    return prefixes, ngrams, depths
+
+
+class PathAnalytics(StoreIndex):
+    name = "paths"
+
+    def __init__(self, top_k: int = TOP_K, width: int = SKETCH_WIDTH):
+        super().__init__()
+        self.prefixes = HeavyHitters(top_k, width)
+        self.ngrams = HeavyHitters(top_k, width)
+        self.depth_counts = np.zeros(len(LEVELS) + 1, dtype=np.int64)   # paths per depth 1..4
+        self.articles_with_paths = 0
+        self.root_depth: T.Dict[str, T.List[int]] = {}                  # L3 -> [articles, summed deepest level]
+
+    def add_articles(self, paths_per_article: T.Iterable[T.Any]) -> None:
+        """Stream a batch of articles' sequential_paths into the aggregates."""
+        prefix_counts: Counter = Counter()
+        ngram_counts: Counter = Counter()
+        for paths in paths_per_article:
+            prefixes, ngrams, depths = article_keys(paths)
+            if not depths:
+                continue
+            self.articles_with_paths += 1
+            prefix_counts.update(prefixes)
+            ngram_counts.update(ngrams)
+            for d in depths:
+                self.depth_counts[d] += 1
+            deepest: T.Dict[str, int] = {}
+            for key in prefixes:
+                deepest[key[0]] = max(deepest.get(key[0], 0), len(key))
+            for root, d in deepest.items():
+                stats = self.root_depth.setdefault(root, [0, 0])
+                stats[0] += 1
+                stats[1] += d
+        self.prefixes.update(prefix_counts)
+        self.ngrams.update(ngram_counts)
+
+    def _add_rows(self, df: pd.DataFrame, start: int) -> None:
+        self.add_articles(df["sequential_paths"].iloc[start:].tolist())
+
+    # ---- queries ----
+    def top_progressions(self, k: int = 10, length: T.Optional[int] = None, root: T.Optional[str] = None) -> T.List[T.Tuple[Key, int]]:
+        """Most common path prefixes (L3→L4→...), optionally of one length / under one L3."""
+        return self.prefixes.most_common(
+            k, lambda key: (length is None or len(key) == length) and (root is None or key[0] == root)
+        )
+
+    def top_ngrams(self, k: int = 10, n: T.Optional[int] = None) -> T.List[T.Tuple[Key, int]]:
+        """Most common contiguous tag sequences anywhere in a path (n >= 2)."""
+        return self.ngrams.most_common(k, None if n is None else (lambda key: len(key) == n))
+
+    def progression_count(self, progression: T.Sequence[str]) -> int:
+        """Estimated number of articles with a path starting with progression (never an underestimate)."""
+        return self.prefixes.estimate(tuple(progression))
+
+    def depth_profile(self) -> T.Dict[str, T.Any]:
+        """Paths per depth (1 = L3 only ... 4 = down to L6) and the mean depth."""
+        total = int(self.depth_counts.sum())
+        hist = {LEVELS[d - 1]: int(self.depth_counts[d]) for d in range(1, len(LEVELS) + 1)}
+        mean = float((self.depth_counts * np.arange(len(self.depth_counts))).sum() / total) if total else 0.0
+        return {"paths": total, "articles": self.articles_with_paths, "by_depth": hist, "mean_depth": mean}
+
+    def root_complexity(self, k: int = 10) -> T.List[T.Tuple[str, float, int]]:
+        """(L3, mean deepest level reached under it per article, articles), deepest first."""
+        rows = [(root, s[1] / s[0], s[0]) for root, s in self.root_depth.items() if s[0]]
+        return sorted(rows, key=lambda r: (-r[1], -r[2], r[0]))[:k]
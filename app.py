@@ -1,7 +1,7 @@
 import streamlit as st
 import pandas as pd
 import re
-from core import process_new_link, mark_card_status, load_all_unlearned_cards, generate_cards_for_url, reset_learned, canonicalize_url,load_unlearned_cards,load_csv
+from core import process_new_link, mark_card_status, load_all_unlearned_cards, generate_cards_for_url, reset_learned, canonicalize_url,load_unlearned_cards,load_csv,tag_index,search_articles,semantic_search,knowledge_gaps,knowledge_tree,tree_json,CSV_PATH
 
 ## TESTING comment for mintlify testing
 ## TESTING comment for mintlify testing222
@@ -185,6 +185,120 @@ def has_any(selected, cell):
         return any(item in cell for item in selected)
     return False
 
+def tag_filter_controls(links_index, key_prefix):
+    """L1/L2 multiselects plus L3–L6 in an expander; options (with article counts) come from the tag index"""
+    labels = {"L1": "L1 (Domain)", "L2": "L2 (Category)", "L3": "L3", "L4": "L4", "L5": "L5", "L6": "L6"}
+
+    def select(level):
+        counts = dict(links_index.options(level))
+        return st.multiselect(f"Filter by {labels[level]}", options=list(counts),
+                              format_func=lambda tag: f"{tag} ({counts[tag]})", key=f"{key_prefix}_{level.lower()}")
+
+    selection = {}
+    col_l1, col_l2 = st.columns(2)
+    with col_l1:
+        selection["L1"] = select("L1")
+    with col_l2:
+        selection["L2"] = select("L2")
+    with st.expander("More tag filters (L3–L6)"):
+        for col, level in zip(st.columns(4), ["L3", "L4", "L5", "L6"]):
+            with col:
+                selection[level] = select(level)
+    return selection
+
+def search_box(df_links, key_prefix):
+    """Keyword (BM25) or similar-meaning (hashed n-gram vectors) search over the stored articles"""
+    col_query, col_mode = st.columns([4, 1])
+    with col_query:
+        query = st.text_input("Search articles", key=f"{key_prefix}_search", placeholder="e.g. gradient boosting")
+    with col_mode:
+        mode = st.radio("Match", ["Keywords", "Similar text"], key=f"{key_prefix}_search_mode", horizontal=True)
+    if not query.strip():
+        return
+    if mode == "Keywords":
+        results = search_articles(df_links, query, k=20, path=CSV_PATH)
+    else:
+        results = semantic_search(df_links, query, k=20, path=CSV_PATH)
+    if results.empty:
+        st.write("No matching articles.")
+        return
+    st.caption(f"Top {len(results)} matches")
+    for _, row in results.iterrows():
+        headline = row.get("headline") or row["url"]
+        path = " → ".join(str(v) for v in (row.get("L1"), row.get("L2")) if isinstance(v, str) and v)
+        st.markdown(f"**[{headline}]({row['url']})**" + (f"  \n{path}" if path else ""))
+
+def knowledge_gap_panel(df_links, key_prefix):
+    """Per-L2 gap reports (dead ends, thin links, missing links), analyzed when a domain is first selected"""
+    with st.expander("Knowledge gaps by domain"):
+        gaps = knowledge_gaps(df_links, CSV_PATH)
+        domains = gaps.domains()
+        if not domains:
+            st.write("No learning paths yet.")
+            return
+        articles = dict(domains)
+        domain = st.selectbox("L2 domain", list(articles), key=f"{key_prefix}_gap_domain",
+                              format_func=lambda d: f"{d} ({articles[d]} articles)")
+        report = gaps.report(domain)
+        sections = [("dead_ends", "Dead ends"), ("thin_nodes", "Thin links"),
+                    ("missing_links", "Missing links"), ("missing_intermediates", "Missing intermediate steps")]
+        for key, title in sections:
+            if report[key]:
+                st.markdown(f"**{title}**")
+                st.dataframe(pd.DataFrame(report[key]), use_container_width=True, hide_index=True)
+
+TREE_PAGE_SIZE = 25      # children shown per expanded node before "Show more"
+TREE_ARTICLE_LIMIT = 20  # articles listed for the selected node
+
+def knowledge_tree_view(df_links, key_prefix):
+    """L1→L6 tree that sends only the children of expanded nodes (one page at a time) to the browser"""
+    tree = knowledge_tree(df_links, CSV_PATH)
+    selected_key = f"{key_prefix}_tree_selected"
+    # node ids are only stable while the tree is extended: a new synonym map rebuilds it
+    if st.session_state.get(f"{key_prefix}_tree_synonyms", tree.tag_synonyms) != tree.tag_synonyms:
+        for key in (f"{key_prefix}_tree_open", f"{key_prefix}_tree_pages", selected_key):
+            st.session_state.pop(key, None)
+    st.session_state[f"{key_prefix}_tree_synonyms"] = tree.tag_synonyms
+    opened = st.session_state.setdefault(f"{key_prefix}_tree_open", set())
+    pages = st.session_state.setdefault(f"{key_prefix}_tree_pages", {})
+
+    def toggle(node):
+        opened.symmetric_difference_update({node})
+        st.session_state[selected_key] = node
+
+    def more(node):
+        pages[node] = pages.get(node, 1) + 1
+
+    def render(node, depth):
+        children, total = tree.children_page(node, 0, TREE_PAGE_SIZE * pages.get(node, 1))
+        for child, label, count in children:
+            pad, body = st.columns([0.02 + 0.04 * depth, 1])
+            with body:
+                arrow = ("▾" if child in opened else "▸") if tree.has_children(child) else "•"
+                st.button(f"{arrow} {label} ({count})", key=f"{key_prefix}_tree_{child}",
+                          on_click=toggle, args=(child,), type="tertiary")
+            if child in opened:
+                render(child, depth + 1)
+        if total > len(children):
+            pad, body = st.columns([0.02 + 0.04 * depth, 1])
+            with body:
+                st.button(f"Show more ({len(children)} of {total})", key=f"{key_prefix}_tree_more_{node}",
+                          on_click=more, args=(node,))
+
+    with st.expander("Knowledge tree"):
+        if not tree.has_children(0):
+            st.write("No categorized links yet.")
+            return
+        render(0, 0)
+        node = st.session_state.get(selected_key)
+        if node is not None and node < len(tree):
+            rows = tree.rows(node)
+            st.caption(f"{' → '.join(tree.path(node))}: {len(rows)} articles")
+            shown = df_links.iloc[rows[:TREE_ARTICLE_LIMIT]]
+            st.dataframe(shown[[c for c in ("headline", "url", "L1", "L2") if c in shown.columns]],
+                         use_container_width=True, hide_index=True,
+                         column_config={"url": st.column_config.LinkColumn("URL")})
+
 def clean_tldr(tldr):
     if isinstance(tldr, list):
         # Remove extra quotes and join with newlines
@@ -341,33 +455,13 @@ if page == "Add Links":
 
     # --- Table filters ---
     if not st.session_state.process_clicked:
-        # Historic table filters - using L1 and L2 for filtering
-        # Check if L1-L6 columns exist
-        if "L1" in df_links.columns and "L2" in df_links.columns:
-            all_l1_values = sorted({val for val in df_links["L1"] if pd.notna(val) and val})
-            all_l2_values = sorted({val for val in df_links["L2"] if pd.notna(val) and val})
-        else:
-            all_l1_values = []
-            all_l2_values = []
-
-        col_l1, col_l2 = st.columns(2)
-        with col_l1:
-            selected_l1 = st.multiselect("Filter by L1 (Domain)", options=all_l1_values, key="historic_l1")
-        with col_l2:
-            selected_l2 = st.multiselect("Filter by L2 (Category)", options=all_l2_values, key="historic_l2")
-
-        # Create proper boolean masks for filtering
-        if "L1" in df_links.columns and selected_l1:
-            l1_mask = df_links["L1"].isin(selected_l1)
-        else:
-            l1_mask = pd.Series([True] * len(df_links), index=df_links.index)
-
-        if "L2" in df_links.columns and selected_l2:
-            l2_mask = df_links["L2"].isin(selected_l2)
-        else:
-            l2_mask = pd.Series([True] * len(df_links), index=df_links.index)
-
-        df_links_filtered = df_links[l1_mask & l2_mask].copy()
+        # Historic table filters - answered by posting-list intersection on the persisted tag index
+        search_box(df_links, "historic")
+        knowledge_gap_panel(df_links, "historic")
+        knowledge_tree_view(df_links, "historic")
+        links_index = tag_index(df_links, CSV_PATH)
+        selection = tag_filter_controls(links_index, "historic")
+        df_links_filtered = df_links.iloc[links_index.rows_matching(selection)].copy()
         df_links_filtered["tldr"] = df_links_filtered["tldr"].apply(clean_tldr)
 
         # Create display dataframe with bubble-style formatting for L3-L6 arrays
@@ -434,34 +528,14 @@ if page == "Add Links":
     else:
         # Updated table filters (new keys!)
         df_links = load_csv()
-        # Check if L1-L6 columns exist
-        if "L1" in df_links.columns and "L2" in df_links.columns:
-            all_l1_values = sorted({val for val in df_links["L1"] if pd.notna(val) and val})
-            all_l2_values = sorted({val for val in df_links["L2"] if pd.notna(val) and val})
-        else:
-            all_l1_values = []
-            all_l2_values = []
-
-        col_l1, col_l2 = st.columns(2)
-        with col_l1:
-            selected_l1_new = st.multiselect("Filter by L1 (Domain)", options=all_l1_values, key="updated_l1")
-        with col_l2:
-            selected_l2_new = st.multiselect("Filter by L2 (Category)", options=all_l2_values, key="updated_l2")
-
-        df_links_display = df_links.copy()
-        df_links_display["tldr"] = df_links_display["tldr"].apply(clean_tldr)
-        # Create proper boolean masks for filtering
-        if "L1" in df_links_display.columns and selected_l1_new:
-            l1_mask = df_links_display["L1"].isin(selected_l1_new)
-        else:
-            l1_mask = pd.Series([True] * len(df_links_display), index=df_links_display.index)
+        search_box(df_links, "updated")
+        knowledge_gap_panel(df_links, "updated")
+        knowledge_tree_view(df_links, "updated")
+        links_index = tag_index(df_links, CSV_PATH)
+        selection_new = tag_filter_controls(links_index, "updated")
 
-        if "L2" in df_links_display.columns and selected_l2_new:
-            l2_mask = df_links_display["L2"].isin(selected_l2_new)
-        else:
-            l2_mask = pd.Series([True] * len(df_links_display), index=df_links_display.index)
-
-        df_links_filtered = df_links_display[l1_mask & l2_mask].copy()
+        df_links_filtered = df_links.iloc[links_index.rows_matching(selection_new)].copy()
+        df_links_filtered["tldr"] = df_links_filtered["tldr"].apply(clean_tldr)
 
         # Create display dataframe with bubble-style formatting for L3-L6 arrays
         def format_array_as_bubbles(col_data):
@@ -890,4 +964,7 @@ elif page == "Review Cards":
 
 # Add footer
 st.sidebar.markdown("---")
+# built only when clicked (not on every rerun), from the knowledge tree's per-root JSON cache
+st.sidebar.download_button("Download knowledge tree (JSON)", data=lambda: tree_json(load_csv(), path=CSV_PATH),
+                           file_name="knowledge_tree.json", mime="application/json")
 st.sidebar.markdown("Made with Owen Huang")
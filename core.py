@@ -1,9 +1,11 @@
-import os, re, json, datetime, hashlib, typing as T
+import gc, io, os, re, json, math, heapq, pickle, functools, datetime, hashlib, weakref, tempfile, threading, typing as T
 from pathlib import Path
+from contextlib import contextmanager
 from dataclasses import dataclass
 from urllib.parse import urlparse
 from collections import deque
 
+import numpy as np
 import pandas as pd
 import requests
 from bs4 import BeautifulSoup
@@ -11,6 +13,26 @@ import trafilatura
 from dotenv import load_dotenv
 from openai import OpenAI
 
+from lazy_columns import (
+    CODECS, CompressedTextArray, CompressedTextDtype, LazyJSONArray, LazyJSONDtype,
+    json_loads_many, orjson,
+)
+from store_index import StoreIndex
+from analytics import PathAnalytics
+from knowledge_gaps import KnowledgeGaps
+from recommendations import RelatedArticles
+from relationship_graph import RelationshipGraph
+from search_index import SearchIndex
+from semantic_index import SemanticIndex
+from tag_index import TagIndex
+from tree_utils import KnowledgeTree
+
+try:
+    import fcntl  # POSIX advisory file locks
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
 # Load config
 load_dotenv()
 client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
@@ -109,11 +131,7 @@ def get_flashcard_for_review(url: str = None) -> dict:
 def mark_card_status(card_id: str, learned: bool) -> bool:
     """Mark card as learned/unlearned - called from Streamlit"""
     try:
-        df = _ensure_cards_csv(CARDS_CSV)
-        idx = df.index[df["card_id"] == card_id]
-        if len(idx) > 0:
-            df.loc[idx, "learned"] = learned
-            _save_cards_df(df, CARDS_CSV)
+        _append_card_event(card_id, learned, CARDS_CSV)
         return True
     except:
         return False
@@ -232,23 +250,456 @@ def extract_readable_text(url: str) -> PageContent:
         text_len=len(text or "")
     )
 
+# =========================
+# Store locking & atomic writes
+# =========================
+# Every store file (links CSV, cards CSV, taxonomy JSON) is written as:
+#   exclusive lock on <path>.lock -> check <path>.version against the version the
+#   caller loaded -> write a temp file + fsync + os.replace -> bump <path>.version.
+# Readers never lock: a rename is atomic and the version is bumped only after the
+# data file is replaced, so a reader that loads version N sees data >= N.
+STORE_WRITE_RETRIES = int(os.getenv("STORE_WRITE_RETRIES", "5"))
+
+class StoreConflictError(RuntimeError):
+    """The store was committed by another writer since the caller loaded it."""
+
+_lock_state = threading.local()
+
+def _lock_fd(f) -> None:
+    if fcntl is not None:
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+    else:
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+
+def _unlock_fd(f) -> None:
+    if fcntl is not None:
+        fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+    else:
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+@contextmanager
+def store_lock(path: str):
+    """Exclusive cross-process lock for one store file (re-entrant per thread)."""
+    key = os.path.abspath(path)
+    held = _lock_state.__dict__.setdefault("held", {})
+    if held.get(key):
+        held[key] += 1
+        try:
+            yield
+        finally:
+            held[key] -= 1
+        return
+    with open(key + ".lock", "a+") as f:
+        _lock_fd(f)
+        held[key] = 1
+        try:
+            yield
+        finally:
+            held.pop(key, None)
+            _unlock_fd(f)
+
+def _version_path(path: str) -> str:
+    return str(path) + ".version"
+
+def store_version(path: str) -> int:
+    """Monotonic commit counter of a store file (0 = never committed through save)."""
+    try:
+        return int(Path(_version_path(path)).read_text(encoding="utf-8").strip() or 0)
+    except (FileNotFoundError, ValueError):
+        return 0
+
+def _atomic_write(path: str, write: T.Callable[[T.IO], None], binary: bool = False) -> None:
+    """write(f) into a temp file next to `path`, fsync it, then rename over `path`."""
+    path = os.path.abspath(path)
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), prefix=os.path.basename(path) + ".", suffix=".tmp")
+    try:
+        with (os.fdopen(fd, "wb") if binary else os.fdopen(fd, "w", encoding="utf-8", newline="")) as f:
+            write(f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.chmod(tmp, os.stat(path).st_mode & 0o777 if os.path.exists(path) else 0o644)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
+
+def _commit_store(path: str, write: T.Callable[[T.IO], None], expected_version: T.Optional[int]) -> int:
+    """
+    Atomically replace a store file under its lock. Raises StoreConflictError if
+    expected_version is given and another writer committed in between.
+    Returns the new version.
+    """
+    with store_lock(path):
+        current = store_version(path)
+        if expected_version is not None and expected_version != current:
+            raise StoreConflictError(
+                f"{path} changed on disk (version {current}, loaded {expected_version}); reload and retry"
+            )
+        _atomic_write(path, write)
+        _atomic_write(_version_path(path), lambda f: f.write(str(current + 1)))
+        return current + 1
+
+@contextmanager
+def _gc_paused():
+    """
+    Skip cyclic GC passes while building many small acyclic containers
+    (unpickling frames/indexes, bulk list construction): they only add time.
+    """
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+# =========================
+# Binary snapshots (fast cold start)
+# =========================
+# After each commit the parsed frame (as load_csv / _ensure_cards_csv build it:
+# list columns decoded, lazy columns still lazy) is pickled to
+# <store>.snapshot.pkl together with the version, file signature and a checksum of the CSV bytes it came from.
+# Loaders use the snapshot when the version matches and either the signature
+# matches or the CSV bytes hash to the same checksum; otherwise they parse the
+# CSV and write a fresh snapshot. Snapshots are a cache: safe to delete, and
+# never read unless written by this module next to the store.
+# Links snapshots also keep L3–L6 as the tag-synonym map canonicalizes them,
+# under the map file's signature ("tags": (signature, {column: cells})), so a
+# load only re-maps the tags after the store or the map changed.
+STORE_SNAPSHOTS = os.getenv("STORE_SNAPSHOTS", "1") != "0"
+_SNAPSHOT_FORMAT = 1
+
+def _snapshot_path(path: str) -> Path:
+    return Path(path).with_suffix(".snapshot.pkl")
+
+def _checksum(raw: bytes) -> str:
+    return hashlib.blake2b(raw, digest_size=16).hexdigest()
+
+def _read_store_bytes(path: str) -> T.Tuple[bytes, T.Optional[tuple]]:
+    """File contents plus its signature (None if it changed while reading)."""
+    before = _file_signature(path)
+    raw = Path(path).read_bytes()
+    return raw, (before if _file_signature(path) == before else None)
+
+def _load_snapshot(path: str, version: int) -> T.Tuple[T.Optional[dict], bytes, T.Optional[tuple]]:
+    """
+    (snapshot, b"", None) on a hit; on a miss (None, csv bytes, their
+    signature) so the caller parses exactly the bytes that were checked.
+    """
+    sp = _snapshot_path(path)
+    snap = None
+    if STORE_SNAPSHOTS and sp.exists():
+        try:
+            with _gc_paused(), open(sp, "rb") as f:
+                snap = pickle.load(f)
+            if snap["format"] != _SNAPSHOT_FORMAT or snap["version"] != version:
+                snap = None
+        except Exception:
+            snap = None
+    if snap is not None and snap["signature"] is not None and snap["signature"] == _file_signature(path):
+        return snap, b"", None
+    raw, signature = _read_store_bytes(path)
+    if snap is not None and _checksum(raw) == snap["checksum"]:
+        return snap, b"", None
+    return None, raw, signature
+
+def _snapshot(frame: pd.DataFrame, raw: bytes, signature: T.Optional[tuple], version: int, **extra: T.Any) -> dict:
+    return {"format": _SNAPSHOT_FORMAT, "version": version, "signature": signature,
+            "checksum": _checksum(raw), "frame": frame, **extra}
+
+def _save_snapshot(path: str, snap: dict) -> None:
+    if not STORE_SNAPSHOTS:
+        return
+    try:
+        _atomic_write(str(_snapshot_path(path)),
+                      lambda f: pickle.dump(snap, f, protocol=pickle.HIGHEST_PROTOCOL), binary=True)
+    except Exception as e:
+        print(f"⚠️ Could not write snapshot for {path}: {e}")
+
+def _write_snapshot(path: str, frame: pd.DataFrame, raw: bytes, signature: T.Optional[tuple], version: int,
+                    **extra: T.Any) -> None:
+    _save_snapshot(path, _snapshot(frame, raw, signature, version, **extra))
+
 # =========================
 # Taxonomy persistence
 # =========================
+# taxonomy.json holds the compacted vocabulary:
+#   {"categories": [...], "tags": [...], "counts": {"categories": {term: n}, "tags": {...}},
+#    "journal_gen": g}
+# Each ingest appends one line to <taxonomy>.journal.jsonl instead of rewriting
+# it: {"categories": [...], "tags": [...], "domain": d} = terms used by one record
+# (new terms join the vocabulary in order, every listed term gets +1 usage, also
+# counted per domain under "domains" to rank prompt shortlists). The journal's
+# first line is {"gen": g}; compaction folds it into taxonomy.json with gen g+1
+# and then starts a fresh journal, so a journal whose gen differs from the JSON
+# has already been folded in (a crash between the two steps loses nothing and
+# counts nothing twice). Appends and compaction hold the taxonomy store lock.
+TAXONOMY_JOURNAL_COMPACT_BYTES = int(os.getenv("TAXONOMY_JOURNAL_COMPACT_BYTES", "65536"))
+TAXONOMY_KINDS = ("categories", "tags")
+# Prompt shortlist budgets (estimated tokens / max terms per kind)
+PROMPT_CATEGORY_TOKENS = int(os.getenv("PROMPT_CATEGORY_TOKENS", "120"))
+PROMPT_TAG_TOKENS = int(os.getenv("PROMPT_TAG_TOKENS", "400"))
+_KEYWORD_RE = re.compile(r"[a-z0-9][a-z0-9+#.]*")
+
+def _keywords(text: str) -> T.Set[str]:
+    """Lowercase word tokens of 2+ characters (keeps 'c++', 'c#', 'ml')."""
+    return {w.rstrip(".") for w in _KEYWORD_RE.findall((text or "").lower()) if len(w.rstrip(".")) >= 2}
+
+def _estimate_tokens(term: str) -> int:
+    # ~4 characters per token, plus quotes/comma in the JSON list
+    return len(term) // 4 + 2
+
+def _domain_key(domain: T.Optional[str]) -> T.Optional[str]:
+    d = (domain or "").strip().lower()
+    return d[4:] if d.startswith("www.") else (d or None)
+
+def _taxonomy_journal_path(path: str = TAXONOMY_PATH) -> str:
+    return str(Path(path).with_suffix(".journal.jsonl"))
+
+class TaxonomyService:
+    """
+    Cached view of one taxonomy store. Every accessor first catches up with
+    other writers: a changed version reloads the JSON, otherwise only the
+    journal bytes appended since the last call are read.
+    """
+
+    def __init__(self, path: str = TAXONOMY_PATH):
+        self.path = path
+        self.version = -1
+        self._gen = 0
+        self._offset = 0
+        self._set_state({k: [] for k in TAXONOMY_KINDS}, {k: {} for k in TAXONOMY_KINDS}, {})
+        self._mutex = threading.RLock()  # Streamlit sessions share the service across threads
+
+    # ---- state ----
+    def _set_state(self, terms: T.Dict[str, T.List[str]], counts: T.Dict[str, T.Dict[str, int]],
+                   domains: T.Dict[str, T.Dict[str, T.Dict[str, int]]]) -> None:
+        self._terms = {k: [] for k in TAXONOMY_KINDS}
+        self._pos: T.Dict[str, T.Dict[str, int]] = {k: {} for k in TAXONOMY_KINDS}
+        self._by_keyword: T.Dict[str, T.Dict[str, T.List[str]]] = {k: {} for k in TAXONOMY_KINDS}
+        for kind in TAXONOMY_KINDS:
+            for term in terms[kind]:
+                self._add_term(kind, term)
+        self._counts = counts
+        self._domains = domains  # domain -> kind -> term -> uses
+        self._matchers: T.Dict[str, TaxonomyMatcher] = {}
+
+    def _add_term(self, kind: str, term: str) -> None:
+        if term in self._pos[kind]:
+            return
+        self._pos[kind][term] = len(self._terms[kind])
+        self._terms[kind].append(term)
+        for word in _keywords(term):
+            self._by_keyword[kind].setdefault(word, []).append(term)
+
+    def _reload(self, version: int) -> None:
+        p = Path(self.path)
+        data = json.loads(p.read_text(encoding="utf-8")) if p.exists() else {}
+        counts = data.get("counts") or {}
+        self._set_state(
+            {k: list(data.get(k) or []) for k in TAXONOMY_KINDS},
+            {k: {t: int(n) for t, n in (counts.get(k) or {}).items()} for k in TAXONOMY_KINDS},
+            data.get("domains") or {},
+        )
+        self._gen = int(data.get("journal_gen", 0))
+        self._offset = 0
+        self.version = version
+
+    def _apply(self, entry: dict) -> None:
+        domain = entry.get("domain")
+        for kind in TAXONOMY_KINDS:
+            counts = self._counts[kind]
+            by_domain = self._domains.setdefault(domain, {}).setdefault(kind, {}) if domain else None
+            for term in entry.get(kind) or []:
+                self._add_term(kind, term)
+                counts[term] = counts.get(term, 0) + 1
+                if by_domain is not None:
+                    by_domain[term] = by_domain.get(term, 0) + 1
+
+    # ---- reading ----
+
+    def refresh(self) -> "TaxonomyService":
+        with self._mutex:
+            version = store_version(self.path)  # read before the data (see store locking notes)
+            if version != self.version:
+                self._reload(version)
+            jp = Path(_taxonomy_journal_path(self.path))
+            try:
+                if jp.stat().st_size <= self._offset:
+                    return self
+                with jp.open("rb") as f:
+                    f.seek(self._offset)
+                    chunk = f.read()
+            except FileNotFoundError:
+                return self
+            end = chunk.rfind(b"\n") + 1  # ignore a partially written last line
+            lines = chunk[:end].splitlines()
+            if self._offset == 0 and lines:
+                try:
+                    gen = json.loads(lines.pop(0)).get("gen")
+                except ValueError:
+                    gen = None
+                if gen != self._gen:
+                    return self  # already folded into the JSON we loaded
+            for line in lines:
+                try:
+                    self._apply(json.loads(line))
+                except ValueError:
+                    continue  # blank or torn line
+            self._offset += end
+            return self
+
+    @property
+    def categories(self) -> T.List[str]:
+        """Current category vocabulary (shared list: do not mutate)."""
+        return self.refresh()._terms["categories"]
+
+    @property
+    def tags(self) -> T.List[str]:
+        """Current tag vocabulary (shared list: do not mutate)."""
+        return self.refresh()._terms["tags"]
+
+    def usage(self, kind: str = "tags") -> T.Dict[str, int]:
+        """term -> number of recorded uses."""
+        with self._mutex:
+            return dict(self.refresh()._counts[kind])
+
+    def shortlist(
+        self,
+        kind: str = "tags",
+        domain: T.Optional[str] = None,
+        title: T.Optional[str] = None,
+        max_tokens: T.Optional[int] = None,
+        max_terms: int = 200,
+    ) -> T.List[str]:
+        """
+        Most relevant vocabulary terms for one prompt, within an estimated token
+        budget. Score = 3·log(1+uses on this domain) + 2·(title keywords shared)
+        + log(1+uses overall); ties keep vocabulary order.
+        """
+        if max_tokens is None:
+            max_tokens = PROMPT_CATEGORY_TOKENS if kind == "categories" else PROMPT_TAG_TOKENS
+        with self._mutex:
+            self.refresh()
+            counts, pos = self._counts[kind], self._pos[kind]
+            on_domain = self._domains.get(_domain_key(domain) or "", {}).get(kind, {})
+            title_hits: T.Dict[str, int] = {}
+            for word in _keywords(title):
+                for term in self._by_keyword[kind].get(word, ()):
+                    title_hits[term] = title_hits.get(term, 0) + 1
+            popular = heapq.nlargest(max_terms, pos, key=lambda t: (counts.get(t, 0), -pos[t]))
+            candidates = set(on_domain) | set(title_hits) | set(popular)
+            candidates &= pos.keys()
+
+            def score(term: str) -> float:
+                return (3.0 * math.log1p(on_domain.get(term, 0)) + 2.0 * title_hits.get(term, 0)
+                        + math.log1p(counts.get(term, 0)))
+
+            out, used = [], 0
+            for term in sorted(candidates, key=lambda t: (-score(t), pos[t])):
+                cost = _estimate_tokens(term)
+                if used + cost > max_tokens or len(out) >= max_terms:
+                    break
+                out.append(term)
+                used += cost
+            return out
+
+    def matcher(self, kind: str = "tags") -> "TaxonomyMatcher":
+        """TaxonomyMatcher over the vocabulary, extended as terms are added."""
+        with self._mutex:
+            terms = self.refresh()._terms[kind]
+            matcher = self._matchers.get(kind)
+            self._matchers[kind] = matcher.sync(terms) if matcher is not None else TaxonomyMatcher(terms)
+            return self._matchers[kind]
+
+    # ---- writing ----
+    def record(self, categories: T.Iterable[str] = (), tags: T.Iterable[str] = (),
+               domain: T.Optional[str] = None) -> None:
+        """Append the terms used by one record (new terms extend the vocabulary)."""
+        entry = {"categories": [t for t in categories if t], "tags": [t for t in tags if t]}
+        if not entry["categories"] and not entry["tags"]:
+            return
+        if _domain_key(domain):
+            entry["domain"] = _domain_key(domain)
+        jp = _taxonomy_journal_path(self.path)
+        with self._mutex, store_lock(self.path):
+            self.refresh()
+            lines = b""
+            if not os.path.exists(jp) or self._offset == 0:
+                lines = json.dumps({"gen": self._gen}).encode("utf-8") + b"\n"
+                Path(jp).write_bytes(b"")  # stale (already folded) or missing journal
+            elif os.path.getsize(jp) > self._offset:
+                os.truncate(jp, self._offset)  # torn tail left by a writer that crashed
+            lines += json.dumps(entry, ensure_ascii=False).encode("utf-8") + b"\n"
+            with open(jp, "ab") as f:
+                f.write(lines)
+                f.flush()
+                os.fsync(f.fileno())
+            self._apply(entry)
+            self._offset += len(lines)
+            if self._offset >= TAXONOMY_JOURNAL_COMPACT_BYTES:
+                self.compact()
+
+    def _commit(self, terms: T.Dict[str, T.List[str]], counts: T.Dict[str, T.Dict[str, int]],
+                domains: T.Dict[str, T.Dict[str, T.Dict[str, int]]]) -> int:
+        payload = {**terms, "counts": counts, "domains": domains, "journal_gen": self._gen + 1}
+        version = _commit_store(self.path, lambda f: json.dump(payload, f, ensure_ascii=False), None)
+        jp = _taxonomy_journal_path(self.path)
+        _atomic_write(jp, lambda f: f.write(json.dumps({"gen": self._gen + 1}) + "\n"))
+        self._set_state(terms, counts, domains)
+        self._gen += 1
+        self._offset = os.path.getsize(jp)
+        self.version = version
+        return version
+
+    def compact(self) -> int:
+        """Fold the journal into taxonomy.json and start an empty journal."""
+        with self._mutex, store_lock(self.path):
+            self.refresh()
+            return self._commit(self._terms, self._counts, self._domains)
+
+    def replace(self, categories: T.List[str], tags: T.List[str], expected_version: T.Optional[int] = None) -> int:
+        """Set the vocabulary outright (usage counts kept for surviving terms)."""
+        with self._mutex, store_lock(self.path):
+            self.refresh()
+            if expected_version is not None and expected_version != self.version:
+                raise StoreConflictError(
+                    f"{self.path} changed on disk (version {self.version}, loaded {expected_version}); reload and retry"
+                )
+            terms = {"categories": list(categories), "tags": list(tags)}
+            keep = {k: set(terms[k]) for k in TAXONOMY_KINDS}
+            counts = {k: {t: n for t, n in self._counts[k].items() if t in keep[k]} for k in TAXONOMY_KINDS}
+            domains = {d: {k: {t: n for t, n in per[k].items() if t in keep[k]} for k in per}
+                       for d, per in self._domains.items()}
+            return self._commit(terms, counts, domains)
+
+_TAXONOMY_SERVICES: T.Dict[str, TaxonomyService] = {}
+_taxonomy_services_lock = threading.Lock()
+
+def taxonomy_service(path: str = TAXONOMY_PATH) -> TaxonomyService:
+    """Process-wide TaxonomyService for a taxonomy file."""
+    key = os.path.abspath(path)
+    with _taxonomy_services_lock:
+        if key not in _TAXONOMY_SERVICES:
+            _TAXONOMY_SERVICES[key] = TaxonomyService(path)
+        return _TAXONOMY_SERVICES[key]
+
 def load_taxonomy(path: str = TAXONOMY_PATH) -> dict:
-    p = Path(path)
-    if not p.exists():
-        return {"categories": [], "tags": []}
-    with p.open("r", encoding="utf-8") as f:
-        data = json.load(f)
-    # ensure keys
-    data.setdefault("categories", [])
-    data.setdefault("tags", [])
-    return data
-
-def save_taxonomy(categories: T.List[str], tags: T.List[str], path: str = TAXONOMY_PATH) -> None:
-    with open(path, "w", encoding="utf-8") as f:
-        json.dump({"categories": categories, "tags": tags}, f, ensure_ascii=False, indent=2)
+    """Returns {"categories", "tags", "_version"}; pass _version back to save_taxonomy."""
+    service = taxonomy_service(path).refresh()
+    return {"categories": list(service.categories), "tags": list(service.tags), "_version": service.version}
+
+def save_taxonomy(
+    categories: T.List[str],
+    tags: T.List[str],
+    path: str = TAXONOMY_PATH,
+    expected_version: T.Optional[int] = None,
+) -> int:
+    """Replace the whole vocabulary (locked, atomic); raises StoreConflictError if expected_version is stale."""
+    return taxonomy_service(path).replace(categories, tags, expected_version)
 
 # =========================
 # Matching & evolving lists
@@ -256,15 +707,116 @@ def save_taxonomy(categories: T.List[str], tags: T.List[str], path: str = TAXONO
 def _normalize_token(s: str) -> str:
     return re.sub(r"\s+", " ", s.strip().lower())
 
-def update_matches(candidates: T.List[str], allowed: T.List[str], max_k: int) -> T.Tuple[T.List[str], T.List[str]]:
+class TaxonomyMatcher:
+    """
+    Index over an allowed-term list for update_matches.
+      - exact: normalized term -> term
+      - allowed term inside candidate: probe the candidate's substrings of
+        each indexed term length against the exact map
+      - candidate inside allowed term: intersect the postings of the
+        candidate's character n-grams (n <= 3), then verify
+    The first allowed term (list order) satisfying either direction wins, as
+    in a linear scan, but the cost depends on the candidate, not on the
+    taxonomy size. Terms are only ever appended, so the index grows with add().
+    """
+    GRAM = 3
+
+    def __init__(self, terms: T.Iterable[str] = ()):
+        self.terms: T.List[str] = []
+        self._norms: T.List[str] = []
+        self._first: T.Dict[str, int] = {}     # norm -> first position
+        self._raw: T.Dict[str, str] = {}       # norm -> term (last one wins, like a dict build)
+        self._lengths: T.Set[int] = set()
+        self._grams: T.Dict[str, T.List[int]] = {}
+        self.extend(terms)
+
+    @classmethod
+    def _grams_of(cls, s: str, n: int) -> T.Set[str]:
+        return {s[i:i + n] for i in range(len(s) - n + 1)}
+
+    def add(self, term: str) -> None:
+        pos = len(self.terms)
+        norm = _normalize_token(term)
+        self.terms.append(term)
+        self._norms.append(norm)
+        if not norm:
+            return
+        self._raw[norm] = term
+        if norm in self._first:
+            return
+        self._first[norm] = pos
+        self._lengths.add(len(norm))
+        for n in range(1, self.GRAM + 1):
+            for g in self._grams_of(norm, n):
+                self._grams.setdefault(g, []).append(pos)
+
+    def extend(self, terms: T.Iterable[str]) -> None:
+        for t in terms:
+            self.add(t)
+
+    def sync(self, allowed: T.List[str]) -> "TaxonomyMatcher":
+        """Index terms appended to `allowed` since the last call; rebuild if it was edited otherwise."""
+        n = len(self.terms)
+        if len(allowed) >= n and allowed[:n] == self.terms:
+            self.extend(allowed[n:])
+            return self
+        return TaxonomyMatcher(allowed)
+
+    def match(self, candidate: str) -> T.Optional[str]:
+        c = _normalize_token(candidate)
+        if not c:
+            return None
+        if c in self._first:
+            return self._raw[c]
+        best = None
+        # allowed term contained in the candidate
+        for n in self._lengths:
+            for i in range(len(c) - n + 1):
+                pos = self._first.get(c[i:i + n])
+                if pos is not None and (best is None or pos < best):
+                    best = pos
+        # candidate contained in an allowed term
+        n = min(self.GRAM, len(c))
+        postings = sorted((self._grams.get(g, []) for g in self._grams_of(c, n)), key=len)
+        if postings and postings[0]:
+            common = set(postings[0]).intersection(*postings[1:])
+            for pos in sorted(common):
+                if best is not None and pos >= best:
+                    break
+                if c in self._norms[pos]:
+                    best = pos
+                    break
+        return self._raw[self._norms[best]] if best is not None else None
+
+# matchers reused across update_matches calls, keyed by the allowed list object
+_MATCHERS: T.Dict[int, TaxonomyMatcher] = {}
+_MAX_MATCHERS = 8
+
+def _matcher_for(allowed: T.List[str]) -> TaxonomyMatcher:
+    matcher = _MATCHERS.get(id(allowed))
+    matcher = matcher.sync(allowed) if matcher is not None else TaxonomyMatcher(allowed)
+    if id(allowed) not in _MATCHERS and len(_MATCHERS) >= _MAX_MATCHERS:
+        _MATCHERS.pop(next(iter(_MATCHERS)))
+    _MATCHERS[id(allowed)] = matcher
+    return matcher
+
+def update_matches(
+    candidates: T.List[str],
+    allowed: T.List[str],
+    max_k: int,
+    matcher: T.Optional[TaxonomyMatcher] = None,
+) -> T.Tuple[T.List[str], T.List[str]]:
     """
     Try to match candidates against allowed list.
     If no match found for a candidate, add it as a new allowed term.
     Returns (final_matches, updated_allowed_list).
+    Matching goes through a TaxonomyMatcher over `allowed` (pass one to reuse
+    it; otherwise one is kept per allowed list and extended as it grows).
     """
-    allowed_norm = { _normalize_token(a): a for a in allowed }
+    matcher = matcher.sync(allowed) if matcher is not None else _matcher_for(allowed)
     matches, updated_allowed = [], allowed.copy()
     seen = set()
+    known = set(allowed)
 
     for c in candidates:
         if not isinstance(c, str):
@@ -272,24 +824,15 @@ def update_matches(candidates: T.List[str], allowed: T.List[str], max_k: int) ->
         c_clean = c.strip()
         if not c_clean:
             continue
-        c_norm = _normalize_token(c_clean)
 
-        hit = None
-        # exact
-        if c_norm in allowed_norm:
-            hit = allowed_norm[c_norm]
-        else:
-            # substring match either way
-            for an_norm, raw in allowed_norm.items():
-                if c_norm in an_norm or an_norm in c_norm:
-                    hit = raw; break
+        hit = matcher.match(c_clean)
         if hit:
             if hit not in seen:
                 matches.append(hit); seen.add(hit)
         else:
             # new term → append to allowed
-            if c_clean not in updated_allowed:
-                updated_allowed.append(c_clean)
+            if c_clean not in known:
+                updated_allowed.append(c_clean); known.add(c_clean)
             if c_clean not in seen:
                 matches.append(c_clean); seen.add(c_clean)
 
@@ -361,9 +904,17 @@ def analyze_link_plus(
     allowed_categories: T.List[str] = None,
     allowed_tags: T.List[str] = None,
     force_local: bool = False,
+    category_matcher: T.Optional[TaxonomyMatcher] = None,
+    tag_matcher: T.Optional[TaxonomyMatcher] = None,
+    taxonomy: T.Optional["TaxonomyService"] = None,
 ) -> dict:
     """
-    Returns a normalized record (dict) and includes updated taxonomy under _taxonomy.
+    Returns a normalized record (dict) and includes updated taxonomy under _taxonomy
+    (updated_* = allowed list plus new terms, matched_* = vocabulary terms this
+    record used, prompt_* = terms shown to the LLM). Pass matchers built over the
+    allowed lists to reuse their index. With a TaxonomyService the prompt gets
+    its relevance-ranked shortlists (domain, title, popularity) instead of the
+    first allowed terms.
     Keys:
         fetched_at_utc, url, domain, headline, categories, tags, tldr (list),
         content_text, source_title, author, publish_date, _source, _taxonomy
@@ -375,17 +926,23 @@ def analyze_link_plus(
     # parse locally first so you can verify and fall back if needed
     page = extract_readable_text(url)
 
+    if taxonomy is not None:
+        prompt_categories = taxonomy.shortlist("categories", domain=page.domain, title=page.title)
+        prompt_tags = taxonomy.shortlist("tags", domain=page.domain, title=page.title)
+    else:
+        prompt_categories, prompt_tags = allowed_categories, allowed_tags
+
     # LLM metadata
     try:
         if force_local:
             raise RuntimeError("forced_local")
-        llm_data = analyze_link_with_web_tool(url, allowed_categories, allowed_tags)
+        llm_data = analyze_link_with_web_tool(url, prompt_categories, prompt_tags)
         mode = "openai_web_tool"
         model_used = MODEL_WITH_WEB
     except Exception:
         if page.text_len < 200:
             raise RuntimeError("Could not extract enough text; page may be paywalled or script-rendered.")
-        llm_data = summarize_local_content(page, allowed_categories, allowed_tags)
+        llm_data = summarize_local_content(page, prompt_categories, prompt_tags)
         mode = "local_fallback"
         model_used = MODEL_FALLBACK
 
@@ -403,11 +960,21 @@ def analyze_link_plus(
     L2 = llm_data.get("L2", "")
     sequential_paths = llm_data.get("sequential_paths", [])
 
+    # Canonical tag spellings (see tag_synonyms.py) before deriving L3-L6
+    sequential_paths = canonical_paths(sequential_paths, load_tag_synonyms())
+
     # Generate knowledge paths and extract L3-L6 arrays while preserving relationships
     knowledge_paths, L3_array, L4_array, L5_array, L6_array, relationships = process_sequential_paths_with_relationships(
         L1, L2, sequential_paths
     )
 
+    # evolve the vocabularies: L1/L2 are categories, L3–L6 terms are tags
+    tag_terms = L3_array + L4_array + L5_array + L6_array
+    matched_categories, updated_categories = update_matches(
+        [L1, L2], allowed_categories, max_k=2, matcher=category_matcher)
+    matched_tags, updated_tags = update_matches(
+        tag_terms, allowed_tags, max_k=len(tag_terms), matcher=tag_matcher)
+
     record = {
         "fetched_at_utc": fetched_at_utc,
         "url": page.url,
@@ -428,8 +995,12 @@ def analyze_link_plus(
         "publish_date": llm_data.get("publish_date") or page.publish_date,
         "_source": {"mode": mode, "model": model_used},
         "_taxonomy": {
-            "updated_categories": [],
-            "updated_tags": []
+            "updated_categories": updated_categories,
+            "updated_tags": updated_tags,
+            "matched_categories": matched_categories,
+            "matched_tags": matched_tags,
+            "prompt_categories": prompt_categories[:50],
+            "prompt_tags": prompt_tags[:200],
         }
     }
     return record
@@ -474,6 +1045,16 @@ def canonicalize_url(url: str) -> str:
     canon = urlunparse((scheme, netloc, path, "", query, ""))
     return canon
 
+def canonicalize_urls(urls: pd.Series) -> pd.Series:
+    """Bulk canonicalize_url: each distinct URL is parsed once, nulls stay null."""
+    urls = pd.Series(urls, dtype=object)
+    valid = urls.notna()
+    uniques = urls[valid].unique()
+    mapping = dict(zip(uniques, (canonicalize_url(str(u)) for u in uniques)))
+    out = pd.Series(None, index=urls.index, dtype=object)
+    out[valid] = urls[valid].map(mapping)
+    return out
+
 # =========================
 # DataFrame Store (CSV cache with dedupe by url_canonical)
 # =========================
@@ -549,6 +1130,106 @@ def process_sequential_paths_with_relationships(L1: str, L2: str, sequential_pat
          for k, level in relationships.items()}
     )
 
+@dataclass
+class BulkPaths:
+    """
+    Result of process_sequential_paths_bulk. Per article: knowledge_paths and
+    the L3–L6 arrays, as process_sequential_paths_with_relationships returns
+    them. Columnar: one entry per path tag (article id, path id, depth 0 = L3,
+    tag id into terms). Global edges: one entry per distinct (depth, src, dst)
+    tag-id edge (depth of src), weight = number of articles containing it.
+    """
+    knowledge_paths: T.List[list]
+    L3: T.List[T.List[str]]
+    L4: T.List[T.List[str]]
+    L5: T.List[T.List[str]]
+    L6: T.List[T.List[str]]
+    terms: np.ndarray
+    article: np.ndarray
+    path: np.ndarray
+    depth: np.ndarray
+    tag: np.ndarray
+    edge_depth: np.ndarray
+    edge_src: np.ndarray
+    edge_dst: np.ndarray
+    edge_weight: np.ndarray
+
+    def relationships(self) -> T.Dict[str, T.Dict[str, T.List[str]]]:
+        """Store-wide relationships map in the per-article format."""
+        out = {"L3_to_L4": {}, "L4_to_L5": {}, "L5_to_L6": {}}
+        keys = list(out)
+        for d, a, b in zip(self.edge_depth.tolist(), self.terms[self.edge_src].tolist(), self.terms[self.edge_dst].tolist()):
+            out[keys[d]].setdefault(a, []).append(b)
+        # missing (None) or non-string tags sort after the strings instead of failing the comparison
+        order = lambda t: (not isinstance(t, str), str(t))
+        return {k: {p: sorted(c, key=order) for p, c in v.items()} for k, v in out.items()}
+
+def process_sequential_paths_bulk(L1s: T.Sequence, L2s: T.Sequence, sequential_paths: T.Sequence) -> BulkPaths:
+    """
+    Vectorized process_sequential_paths_with_relationships over many articles.
+    The nested paths are flattened once into (article, path, depth, tag id)
+    columns; the per-article level arrays (deduped, sorted) and the global
+    edge weights are then derived with NumPy sorts and bincounts.
+    """
+    with _gc_paused():
+        return _process_sequential_paths_bulk(L1s, L2s, sequential_paths)
+
+def _process_sequential_paths_bulk(L1s: T.Sequence, L2s: T.Sequence, sequential_paths: T.Sequence) -> BulkPaths:
+    n = len(sequential_paths)
+    valid = [[p[:4] for p in paths if isinstance(p, list) and p] if isinstance(paths, list) else []
+             for paths in sequential_paths]
+    knowledge_paths = [[[l1, l2] + p for p in paths] for l1, l2, paths in zip(L1s, L2s, valid)]
+
+    flat_paths = [p for paths in valid for p in paths]
+    path_article = np.repeat(np.arange(n), [len(paths) for paths in valid])
+    path_len = np.fromiter(map(len, flat_paths), dtype=np.int64, count=len(flat_paths))
+    article = np.repeat(path_article, path_len).astype(np.int32)
+    path = np.repeat(np.arange(len(flat_paths)), path_len).astype(np.int32)
+    starts = np.cumsum(path_len) - path_len
+    depth = (np.arange(int(path_len.sum())) - np.repeat(starts, path_len)).astype(np.int8)
+    # sort=True: tag ids follow string order, so sorting ids sorts the tags
+    codes, terms = pd.factorize(pd.Series([t for p in flat_paths for t in p], dtype=object), sort=True, use_na_sentinel=False)
+    tag = codes.astype(np.int32)
+    terms = np.asarray(terms, dtype=object)
+    terms[pd.isna(terms)] = None  # factorize turns missing tags into NaN; the per-article version keeps None
+    V = max(len(terms), 1)
+
+    # per-article level arrays: distinct (article, tag) per depth, in tag order
+    levels = []
+    for d in range(4):
+        at = depth == d
+        key = np.unique(article[at].astype(np.int64) * V + tag[at])
+        ptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(key // V, minlength=n), out=ptr[1:])
+        names = terms[key % V].tolist()
+        levels.append([names[a:b] for a, b in zip(ptr[:-1].tolist(), ptr[1:].tolist())])
+
+    # edges between consecutive tags of a path, counted once per article
+    nxt = np.flatnonzero(depth[1:] > 0) + 1
+    edge = ((depth[nxt].astype(np.int64) - 1) * V + tag[nxt - 1]) * V + tag[nxt]
+    owner = article[nxt]
+    order = np.lexsort((owner, edge))
+    edge, owner = edge[order], owner[order]
+    first = np.ones(len(edge), dtype=bool)
+    first[1:] = (edge[1:] != edge[:-1]) | (owner[1:] != owner[:-1])
+    edges, weight = np.unique(edge[first], return_counts=True)
+    return BulkPaths(
+        knowledge_paths, *levels, terms=terms, article=article, path=path, depth=depth, tag=tag,
+        edge_depth=(edges // (V * V)).astype(np.int8), edge_src=(edges // V % V).astype(np.int32),
+        edge_dst=(edges % V).astype(np.int32), edge_weight=weight.astype(np.int64),
+    )
+
+def rederive_path_columns(df: pd.DataFrame) -> pd.DataFrame:
+    """Recompute knowledge_paths and L3–L6 of every row from L1, L2 and sequential_paths in one bulk pass."""
+    bulk = process_sequential_paths_bulk(df["L1"].tolist(), df["L2"].tolist(), df["sequential_paths"].tolist())
+    for col in ("L3", "L4", "L5", "L6"):
+        df[col] = pd.Series(getattr(bulk, col), index=df.index, dtype=object)
+    if isinstance(df["knowledge_paths"].dtype, LazyJSONDtype):
+        df["knowledge_paths"] = pd.Series(LazyJSONArray._from_sequence(bulk.knowledge_paths), index=df.index)
+    else:
+        df["knowledge_paths"] = pd.Series(bulk.knowledge_paths, index=df.index, dtype=object)
+    return df
+
 def init_store() -> pd.DataFrame:
     return pd.DataFrame(columns=COLUMNS)
 
@@ -557,35 +1238,306 @@ def _ensure_columns(df: pd.DataFrame) -> pd.DataFrame:
     for col in COLUMNS:
         if col not in df.columns:
             df[col] = None
-    # backfill url_canonical if missing/empty
-    if df["url_canonical"].isna().any() or (df["url_canonical"] == "").any():
-        df["url_canonical"] = df.apply(
-            lambda r: canonicalize_url(r["url"]) if pd.isna(r["url_canonical"]) or r["url_canonical"] == "" else r["url_canonical"],
-            axis=1
-        )
+    # backfill url_canonical if missing/empty (stores written by migrate_store.py
+    # never need this; it only touches the rows that are actually missing)
+    missing = (df["url_canonical"].isna() | (df["url_canonical"] == "")).to_numpy()
+    if missing.any():
+        canon = df["url_canonical"].to_numpy(dtype=object, copy=True)
+        canon[missing] = canonicalize_urls(df.loc[missing, "url"]).to_numpy()
+        df["url_canonical"] = canon
     return df[COLUMNS]
 
-def save_csv(df: pd.DataFrame, path: str = CSV_PATH) -> None:
+def save_csv(df: pd.DataFrame, path: str = CSV_PATH, expected_version: T.Optional[int] = None) -> None:
+    """
+    Atomic, locked write of the links store. The version check uses
+    expected_version or, by default, the version load_csv stamped on df.attrs;
+    raises StoreConflictError when another writer committed since then.
+    """
+    if expected_version is None:
+        expected_version = df.attrs.get("store_version")
+    written = _serialize_frame(df)
+    data = written.to_csv(index=False)
+    with store_lock(path):
+        version = _commit_store(path, lambda f: f.write(data), expected_version)
+        if STORE_SNAPSHOTS:
+            frame = _written_links_frame(written)
+            _write_snapshot(path, frame, data.encode("utf-8"), _file_signature(path), version,
+                            tags=_canonical_tag_snapshot(frame))
+    df.attrs["store_version"] = version
+
+def _serialize_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """On-disk form of a links frame: JSON list cells, compressed bodies."""
     df2 = df.copy()
     # lists and dicts -> JSON strings for portability
     for col in ["L3","L4","L5","L6","sequential_paths","knowledge_paths","tldr"]:
         if col in df2.columns:
-            df2[col] = df2[col].apply(lambda x: x if isinstance(x, str) else json.dumps(x, ensure_ascii=False))
-    df2.to_csv(path, index=False)
+            if isinstance(df2[col].dtype, LazyJSONDtype):
+                # cells never read since load are written back verbatim
+                df2[col] = df2[col].array.to_serialized()
+            else:
+                df2[col] = df2[col].apply(lambda x: x if isinstance(x, str) else json.dumps(x, ensure_ascii=False))
+    for col in COMPRESSED_TEXT_COLUMNS:
+        if col in df2.columns:
+            arr = df2[col].array
+            if not isinstance(arr, CompressedTextArray):
+                # plain texts get compressed, already-compressed cells pass through
+                arr = CompressedTextArray.from_serialized(df2[col])
+            df2[col] = arr.to_serialized(CONTENT_COMPRESSION)
+    return df2
+
+JSON_COLUMNS = ["L3","L4","L5","L6","sequential_paths","knowledge_paths","tldr"]
+# Heavy list columns most callers never read: kept serialized, decoded on access
+LAZY_JSON_COLUMNS = ["sequential_paths","knowledge_paths","tldr"]
+# Article bodies: stored compressed on disk and kept compressed in memory,
+# decompressed per cell on read (see lazy_columns.CompressedTextArray)
+COMPRESSED_TEXT_COLUMNS = ["content_text"]
+CONTENT_COMPRESSION = os.getenv("CONTENT_COMPRESSION", "zlib")
+if CONTENT_COMPRESSION not in CODECS:
+    raise ValueError(f"CONTENT_COMPRESSION must be one of {sorted(CODECS)}")
+
+def _json_cell_mask(s: pd.Series) -> np.ndarray:
+    try:
+        return s.str.startswith(("[", "{"), na=False).to_numpy(dtype=bool)
+    except AttributeError:
+        # non-string column (e.g. all numeric): nothing to decode
+        return np.zeros(len(s), dtype=bool)
+
+def decode_json_columns(df: pd.DataFrame, columns: T.List[str] = JSON_COLUMNS) -> pd.DataFrame:
+    """
+    Bulk-restore JSON-serialized list columns in place.
+    Cells starting with "[" or "{" from ALL columns are joined into one JSON
+    array and parsed with a single parser call (orjson when installed);
+    null cells become [] and any other string is kept as-is.
+    """
+    cols = [c for c in columns if c in df.columns]
+    if not cols or df.empty:
+        return df
+    outs, targets, texts = {}, [], []
+    for col in cols:
+        s = df[col]
+        out = s.to_numpy(dtype=object, copy=True)
+        null_pos = np.flatnonzero(s.isna().to_numpy())
+        if len(null_pos):
+            out[null_pos] = [[] for _ in range(len(null_pos))]
+        json_pos = np.flatnonzero(_json_cell_mask(s)) if len(null_pos) < len(s) else null_pos[:0]
+        if len(json_pos):
+            targets.append((col, json_pos))
+            texts.extend(out[json_pos].tolist())
+        outs[col] = out
+    if targets:
+        decoded = json_loads_many(texts)
+        start = 0
+        for col, pos in targets:
+            vals = np.empty(len(pos), dtype=object)
+            vals[:] = decoded[start:start + len(pos)]
+            outs[col][pos] = vals
+            start += len(pos)
+    for col in cols:
+        df[col] = outs[col]
+    return df
 
-def load_csv(path: str = CSV_PATH) -> pd.DataFrame:
+def _parse_links_csv(raw: bytes) -> pd.DataFrame:
+    """CSV bytes -> links frame in its lazy form (see load_csv)."""
+    df = pd.read_csv(io.BytesIO(raw))
+    lazy_cols = [c for c in LAZY_JSON_COLUMNS if c in df.columns]
+    for col in lazy_cols:
+        df[col] = LazyJSONArray.from_serialized(df[col])
+    for col in COMPRESSED_TEXT_COLUMNS:
+        if col in df.columns:
+            df[col] = CompressedTextArray.from_serialized(df[col])
+    # restore lists and dicts (all eager list columns in one parser pass)
+    decode_json_columns(df, [c for c in JSON_COLUMNS if c not in lazy_cols])
+    return _ensure_columns(df)
+
+def _written_links_frame(written: pd.DataFrame) -> pd.DataFrame:
+    """
+    The frame _parse_links_csv would return for the CSV of an already
+    serialized frame, built from the serialized cells instead of re-reading
+    the whole CSV: only the small columns (scalars, L3–L6) take a CSV round
+    trip, so their dtypes and missing values match a parse exactly.
+    """
+    from pandas.io.parsers.readers import STR_NA_VALUES
+
+    heavy = [c for c in written.columns if c in LAZY_JSON_COLUMNS or c in COMPRESSED_TEXT_COLUMNS]
+    df = pd.read_csv(io.StringIO(written.drop(columns=heavy).to_csv(index=False)))
+    for col in heavy:
+        cells = written[col].reset_index(drop=True)
+        cells = cells.mask(cells.isin(STR_NA_VALUES))  # "null", "" ... read back as missing
+        arr = LazyJSONArray if col in LAZY_JSON_COLUMNS else CompressedTextArray
+        df.insert(written.columns.get_loc(col), col, arr.from_serialized(cells))
+    decode_json_columns(df, [c for c in JSON_COLUMNS if c in df.columns and c not in heavy])
+    return _ensure_columns(df)
+
+def load_csv(path: str = CSV_PATH, lazy: bool = True) -> pd.DataFrame:
+    """
+    Load the links store. With lazy=True the LAZY_JSON_COLUMNS stay serialized
+    (LazyJSONArray) and each cell is decoded the first time it is read, and
+    content_text stays compressed (CompressedTextArray); lazy=False restores
+    every list column and decompresses every body eagerly.
+    A valid binary snapshot skips CSV parsing entirely.
+    """
+    version = store_version(path)  # read before the data (see store locking notes)
     p = Path(path)
     if not p.exists():
-        return init_store()
-    df = pd.read_csv(path)
-    # restore lists and dicts
-    for col in ["L3","L4","L5","L6","tldr","knowledge_paths"]:
-        if col in df.columns:
-            df[col] = df[col].apply(lambda s: json.loads(s) if isinstance(s, str) and (s.startswith("[") or s.startswith("{")) else ([] if pd.isna(s) else s))
-    # restore sequential_paths list specifically
-    if "sequential_paths" in df.columns:
-        df["sequential_paths"] = df["sequential_paths"].apply(lambda s: json.loads(s) if isinstance(s, str) and s.startswith("[") else ([] if pd.isna(s) else s))
-    df = _ensure_columns(df)
+        df = init_store()
+        df.attrs["store_version"] = version
+        return df
+    snap, raw, signature = _load_snapshot(path, version)
+    if snap is None:
+        df = _parse_links_csv(raw)
+        snap = _snapshot(df, raw, signature, version)
+    df = snap["frame"]
+    tags = snap.get("tags")
+    if tags is None or tags[0] != tag_synonyms_signature():
+        # first load since the store or the synonym map changed
+        tags = snap["tags"] = _canonical_tag_snapshot(df)
+        _save_snapshot(path, snap)
+    if tags[1]:
+        apply_tag_synonyms(df, tag_columns=_with_changed_cells(df, tags[1]))
+    df.attrs["tag_synonyms"] = tags[0]
+    if not lazy:
+        for col in df.columns:
+            if isinstance(df[col].dtype, (LazyJSONDtype, CompressedTextDtype)):
+                df[col] = df[col].array.materialize()
+    df.attrs["store_version"] = version
+    return df
+
+ITER_BATCH_SIZE = int(os.getenv("ITER_BATCH_SIZE", "5000"))
+
+def iter_records(path: str = CSV_PATH, columns: T.Optional[T.List[str]] = None,
+                 batch_size: int = ITER_BATCH_SIZE, synonyms: bool = True) -> T.Iterator[pd.DataFrame]:
+    """
+    Stream the links store as DataFrames of at most batch_size rows, reading
+    only the requested columns (tag synonyms applied unless synonyms=False).
+    List columns are decoded and bodies
+    decompressed per batch, so memory stays bounded by one batch.
+    The whole pass reads one consistent version of the store: writers
+    replace the file atomically, and the open handle keeps the old one.
+    """
+    columns = list(COLUMNS if columns is None else columns)
+    unknown = [c for c in columns if c not in COLUMNS]
+    if unknown:
+        raise ValueError(f"Unknown columns: {unknown}")
+    if not Path(path).exists():
+        return
+    with open(path, newline="", encoding="utf-8") as f:
+        header = pd.read_csv(f, nrows=0).columns
+        f.seek(0)
+        usecols = [c for c in columns if c in header]
+        for chunk in pd.read_csv(f, usecols=usecols, chunksize=batch_size):
+            for col in columns:
+                if col not in chunk.columns:
+                    chunk[col] = None
+            decode_json_columns(chunk, [c for c in JSON_COLUMNS if c in columns])
+            for col in COMPRESSED_TEXT_COLUMNS:
+                if col in columns:
+                    chunk[col] = CompressedTextArray.from_serialized(chunk[col]).materialize()
+            if synonyms:
+                apply_tag_synonyms(chunk)
+            yield chunk[columns]
+
+# =========================
+# Tag synonyms (canonical L3–L6 tags)
+# =========================
+# tag_synonyms.py clusters near-duplicate tags ("ML", "machine-learning",
+# "Machine Learning") and writes {tag: canonical} to TAG_SYNONYMS_PATH.
+# The map is applied to new records at ingest and to every frame on load;
+# stored rows keep their original strings until they are rewritten.
+TAG_SYNONYMS_PATH = "data/tag_synonyms.json"
+TAG_COLUMNS = ["L3","L4","L5","L6"]
+_TAG_SYNONYMS: T.Dict[str, T.Tuple[tuple, T.Dict[str, str]]] = {}
+
+def load_tag_synonyms(path: T.Optional[str] = None) -> T.Dict[str, str]:
+    """{tag: canonical tag}, re-read only when the file changes."""
+    path = TAG_SYNONYMS_PATH if path is None else path
+    if not Path(path).exists():
+        return {}
+    sig = _file_signature(path)
+    cached = _TAG_SYNONYMS.get(path)
+    if cached is None or cached[0] != sig:
+        data = json.loads(Path(path).read_text(encoding="utf-8"))
+        cached = (sig, dict(data.get("map") or {}))
+        _TAG_SYNONYMS[path] = cached
+    return cached[1]
+
+def tag_synonyms_signature(path: T.Optional[str] = None) -> T.Optional[tuple]:
+    """Signature of the synonym map file (None without one); derived data keyed on it is stale once it changes."""
+    path = TAG_SYNONYMS_PATH if path is None else path
+    return _file_signature(path) if Path(path).exists() else None
+
+def save_tag_synonyms(mapping: T.Dict[str, str], path: T.Optional[str] = None) -> int:
+    path = TAG_SYNONYMS_PATH if path is None else path
+    payload = {"map": {k: v for k, v in sorted(mapping.items()) if k != v}}
+    return _commit_store(path, lambda f: json.dump(payload, f, ensure_ascii=False, indent=1), None)
+
+def canonical_tags(tags: T.Any, synonyms: T.Dict[str, str], skip: int = 0) -> T.Any:
+    """Map a tag list (first `skip` items untouched) and drop duplicates it creates."""
+    if not isinstance(tags, list):
+        return tags
+    out, seen = list(tags[:skip]), set()
+    for t in tags[skip:]:
+        t = synonyms.get(t, t) if isinstance(t, str) else t
+        key = t if isinstance(t, str) else id(t)
+        if key not in seen:
+            seen.add(key)
+            out.append(t)
+    return out
+
+def canonical_paths(paths: T.Any, synonyms: T.Dict[str, str], skip: int = 0) -> T.Any:
+    """Map every path of a sequential/knowledge path list (paths with L1/L2 prefix: skip=2)."""
+    if not isinstance(paths, list):
+        return paths
+    return [canonical_tags(p, synonyms, skip) for p in paths]
+
+def canonical_tag_columns(df: pd.DataFrame, synonyms: T.Dict[str, str]) -> T.Dict[str, T.List[T.Any]]:
+    """{column: canonicalized cells} for the L3–L6 columns of df."""
+    return {col: [canonical_tags(v, synonyms) for v in df[col].tolist()]
+            for col in TAG_COLUMNS if col in df.columns}
+
+def _canonical_tag_snapshot(df: pd.DataFrame) -> T.Tuple[T.Optional[tuple], T.Dict[str, T.Dict[int, T.Any]]]:
+    """
+    The "tags" entry of a links snapshot: the L3–L6 cells the map changes, by
+    row ({} when there is no map to apply).
+    """
+    signature, synonyms = tag_synonyms_signature(), load_tag_synonyms()
+    changed: T.Dict[str, T.Dict[int, T.Any]] = {}
+    if synonyms and not df.empty:
+        for col, cells in canonical_tag_columns(df, synonyms).items():
+            changed[col] = {i: new for i, (old, new) in enumerate(zip(df[col].tolist(), cells)) if new != old}
+    return signature, changed
+
+def _with_changed_cells(df: pd.DataFrame, changed: T.Dict[str, T.Dict[int, T.Any]]) -> T.Dict[str, T.List[T.Any]]:
+    columns = {}
+    for col, cells in changed.items():
+        if not cells:
+            continue
+        columns[col] = df[col].tolist()
+        for i, value in cells.items():
+            columns[col][i] = value
+    return columns
+
+def apply_tag_synonyms(df: pd.DataFrame, synonyms: T.Optional[T.Dict[str, str]] = None,
+                       tag_columns: T.Optional[T.Dict[str, T.List[T.Any]]] = None) -> pd.DataFrame:
+    """
+    Canonicalize L3–L6 and the path columns in place. Lazy path columns get
+    the mapping as a decode-time transform, so nothing is decoded here.
+    tag_columns: L3–L6 already canonicalized (see canonical_tag_columns).
+    """
+    synonyms = load_tag_synonyms() if synonyms is None else synonyms
+    if not synonyms or df.empty:
+        return df
+    if tag_columns is None:
+        tag_columns = canonical_tag_columns(df, synonyms)
+    for col, cells in tag_columns.items():
+        df[col] = cells
+    for col, skip in (("sequential_paths", 0), ("knowledge_paths", 2)):
+        if col not in df.columns:
+            continue
+        fn = functools.partial(canonical_paths, synonyms=synonyms, skip=skip)
+        if isinstance(df[col].dtype, LazyJSONDtype):
+            df[col] = df[col].array.map_values(fn)
+        else:
+            df[col] = [fn(v) for v in df[col].tolist()]
     return df
 
 def append_record(df: pd.DataFrame, record: dict) -> pd.DataFrame:
@@ -609,14 +1561,261 @@ def append_record(df: pd.DataFrame, record: dict) -> pd.DataFrame:
         "author": record.get("author"),
         "publish_date": record.get("publish_date"),
     }
-    return pd.concat([df, pd.DataFrame([row])], ignore_index=True)
+    new = pd.DataFrame([row])
+    # keep lazy columns lazy, otherwise concat would decode them to object
+    for col in df.columns:
+        if isinstance(df[col].dtype, LazyJSONDtype):
+            new[col] = LazyJSONArray._from_sequence([row[col] if row[col] is not None else []])
+        elif isinstance(df[col].dtype, CompressedTextDtype):
+            new[col] = CompressedTextArray.from_texts([row[col]], CONTENT_COMPRESSION)
+    out = pd.concat([df, new], ignore_index=True)
+    out.attrs.update(df.attrs)  # keep the loaded store_version for save_csv
+    # hand the url index over to the new frame and add the appended row: O(1)
+    index = _pop_frame_index(_URL_INDEXES, df)
+    if index is not None:
+        index.setdefault(row["url_canonical"], len(out) - 1)
+        _register_frame_index(_URL_INDEXES, out, index)
+    tags = _pop_frame_index(_TAG_INDEXES, df)
+    if tags is not None and tags.n_rows == len(df):
+        _register_frame_index(_TAG_INDEXES, out, tags.appended(out))
+    return out
+
+def storage_report(path: str = CSV_PATH) -> T.Dict[str, int]:
+    """
+    Size of the links store on disk and of its article bodies, compressed
+    (as kept on disk and in memory by load_csv) vs. decompressed.
+    """
+    df = load_csv(path)
+    report = {"rows": len(df), "file_bytes": Path(path).stat().st_size if Path(path).exists() else 0}
+    for col in COMPRESSED_TEXT_COLUMNS:
+        arr = df[col].array
+        texts = [t for t in arr.materialize() if isinstance(t, str)]
+        report[f"{col}_compressed_bytes"] = arr.compressed_nbytes() if isinstance(arr, CompressedTextArray) else 0
+        report[f"{col}_plain_bytes"] = sum(len(t.encode("utf-8")) for t in texts)
+        report[f"{col}_resident_bytes"] = arr.resident_nbytes() if isinstance(arr, CompressedTextArray) else 0
+        report[f"{col}_decompressed_resident_bytes"] = CompressedTextArray._from_sequence(texts).resident_nbytes()
+    return report
+
+# Derived indexes kept per DataFrame object (frames are unhashable, so entries
+# are keyed by id() and dropped when the frame dies):
+#   _URL_INDEXES: url_canonical -> first row position
+#   _TAG_INDEXES: TagIndex over L1–L6
+_URL_INDEXES: T.Dict[int, T.Tuple[weakref.ref, T.Dict[str, int]]] = {}
+_TAG_INDEXES: T.Dict[int, T.Tuple[weakref.ref, TagIndex]] = {}
+
+def _register_frame_index(registry: dict, df: pd.DataFrame, index) -> None:
+    key = id(df)
+    registry[key] = (weakref.ref(df, lambda _, key=key: registry.pop(key, None)), index)
+
+def _cached_frame_index(registry: dict, df: pd.DataFrame):
+    entry = registry.get(id(df))
+    return entry[1] if entry is not None and entry[0]() is df else None
+
+def _pop_frame_index(registry: dict, df: pd.DataFrame):
+    index = _cached_frame_index(registry, df)
+    if index is not None:
+        del registry[id(df)]
+    return index
+
+def url_index(df: pd.DataFrame, rebuild: bool = False) -> T.Dict[str, int]:
+    """Hash index url_canonical -> row position (first occurrence), built once per frame."""
+    index = _cached_frame_index(_URL_INDEXES, df)
+    if index is not None and not rebuild:
+        return index
+    canon = df["url_canonical"]
+    pos = np.flatnonzero(~canon.duplicated(keep="first").to_numpy())
+    index = dict(zip(canon.to_numpy(dtype=object)[pos].tolist(), pos.tolist()))
+    _register_frame_index(_URL_INDEXES, df, index)
+    return index
+
+def tag_index(df: pd.DataFrame, path: T.Optional[str] = None, rebuild: bool = False) -> TagIndex:
+    """
+    Inverted L1–L6 tag index (see tag_index.py) for df, cached per frame and
+    rebuilt if the frame's length no longer matches. With path (the store df
+    was loaded from) the persisted index is reused and extended instead of
+    being built from scratch.
+    """
+    index = _cached_frame_index(_TAG_INDEXES, df)
+    if index is not None and index.n_rows == len(df) and not rebuild:
+        return index
+    index = sync_store_index(TagIndex, df, path) if path and not rebuild else TagIndex.build(df)
+    _register_frame_index(_TAG_INDEXES, df, index)
+    return index
+
+# =========================
+# Derived store indexes (persisted, extended on ingest)
+# =========================
+# StoreIndex subclasses (tag index, knowledge tree, relationship graph, path
+# analytics, knowledge gaps, related articles, full-text and semantic search,
+# ...) are pickled to <store>.<name>.index.pkl under the store lock and cached
+# in memory by file signature; attach() lets an index keep side files next to
+# its pickle. sync_store_index extends an index with the rows appended since
+# it was written, or rebuilds it if the store was rewritten or the tag-synonym
+# map df was canonicalized with (df.attrs["tag_synonyms"], set by load_csv)
+# changed, or an index it reads (StoreIndex.uses, synced first) was rebuilt.
+# Index files are a cache: safe to delete. STORE_INDEX_TYPES are kept in sync by ingest_or_fetch.
+STORE_INDEX_TYPES: T.List[T.Type[StoreIndex]] = [TagIndex, KnowledgeTree, RelationshipGraph, PathAnalytics,
+                                                 KnowledgeGaps, RelatedArticles, SearchIndex, SemanticIndex]
+_STORE_INDEX_CACHE: T.Dict[T.Tuple[str, str], T.Tuple[tuple, StoreIndex]] = {}
+
+def _store_index_path(path: str, name: str) -> Path:
+    return Path(path).with_suffix(f".{name}.index.pkl")
+
+def load_store_index(cls: T.Type[StoreIndex], path: str = CSV_PATH) -> T.Optional[StoreIndex]:
+    """The persisted index of this type for a store, or None if missing/unreadable."""
+    ip = _store_index_path(path, cls.name)
+    key = (os.path.abspath(path), cls.name)
+    if not ip.exists():
+        _STORE_INDEX_CACHE.pop(key, None)
+        return None
+    sig = _file_signature(str(ip))
+    cached = _STORE_INDEX_CACHE.get(key)
+    if cached is not None and cached[0] == sig:
+        return cached[1]
+    try:
+        with _gc_paused(), open(ip, "rb") as f:
+            index = pickle.load(f)
+    except Exception:
+        return None
+    if not isinstance(index, cls):
+        return None
+    try:
+        index.attach(str(ip))
+    except Exception:
+        return None
+    _STORE_INDEX_CACHE[key] = (sig, index)
+    return index
+
+def _save_store_index(index: StoreIndex, path: str) -> None:
+    ip = _store_index_path(path, index.name)
+    try:
+        _atomic_write(str(ip), lambda f: pickle.dump(index, f, protocol=pickle.HIGHEST_PROTOCOL), binary=True)
+        _STORE_INDEX_CACHE[(os.path.abspath(path), index.name)] = (_file_signature(str(ip)), index)
+    except Exception as e:
+        print(f"⚠️ Could not write {index.name} index for {path}: {e}")
+
+def _current_store_index(cls: T.Type[StoreIndex], df: pd.DataFrame, path: str) -> T.Optional[StoreIndex]:
+    """The persisted index if it (and every index it uses) already covers exactly df's rows, else None."""
+    uses = []
+    for dep in cls.uses:
+        index = _current_store_index(dep, df, path)
+        if index is None:
+            return None
+        uses.append(index)
+    index = load_store_index(cls, path)
+    synonyms = df.attrs.get("tag_synonyms", tag_synonyms_signature())
+    if (index is None or index.n_rows != len(df) or not index.covers_prefix_of(df, synonyms)
+            or index.used != tuple(dep.generation for dep in uses)):
+        return None
+    if uses:
+        index.use(*uses)
+    return index
+
+def sync_store_index(cls: T.Type[StoreIndex], df: pd.DataFrame, path: str = CSV_PATH) -> StoreIndex:
+    """
+    Index of this type covering every row of df (a frame of the store at path):
+    the persisted one, extended with df's new rows or rebuilt, and written back
+    when it changed. A df older than the persisted index gets an unsaved build.
+    Like store reads, an index that is already current is returned without
+    taking the store lock; only extending or rewriting it locks.
+    """
+    index = _current_store_index(cls, df, path)
+    if index is not None:
+        return index
+    with store_lock(path):
+        uses = [sync_store_index(dep, df, path) for dep in cls.uses]
+        index = load_store_index(cls, path)
+        if index is not None and index.n_rows > len(df):
+            loaded = df.attrs.get("store_version")
+            if loaded is None or loaded < store_version(path):
+                return cls.build(df, uses=uses)  # stale frame: don't replace the newer index with it
+        synonyms = df.attrs.get("tag_synonyms", tag_synonyms_signature())
+        if (index is None or not index.covers_prefix_of(df, synonyms)
+                or index.used != tuple(dep.generation for dep in uses)):
+            index = cls.build(df, str(_store_index_path(path, cls.name)), uses)
+            index.tag_synonyms = synonyms
+        else:
+            if uses:
+                index.use(*uses)
+            if not index.extend(df):
+                return index
+        _save_store_index(index, path)
+        return index
+
+def knowledge_tree(df: pd.DataFrame, path: str = CSV_PATH) -> KnowledgeTree:
+    """L1→L6 knowledge tree of the store (see tree_utils), up to date with df."""
+    return sync_store_index(KnowledgeTree, df, path)
+
+def tree_json(df: pd.DataFrame, root: T.Sequence[str] = (), max_depth: T.Optional[int] = None,
+              path: str = CSV_PATH) -> T.Optional[bytes]:
+    """
+    Serialized knowledge (sub)tree under root ([], [L1] or [L1, L2, ...]) as
+    JSON bytes, served from the tree's per-root cache; None if root is absent.
+    """
+    tree = knowledge_tree(df, path)
+    node = tree.find(root)
+    return None if node is None else tree.subtree_json(node, max_depth)
+
+def relationship_graph(df: pd.DataFrame, path: str = CSV_PATH) -> RelationshipGraph:
+    """Store-wide L3→L6 relationship graph (see relationship_graph.py), up to date with df."""
+    return sync_store_index(RelationshipGraph, df, path)
+
+def path_analytics(df: pd.DataFrame, path: str = CSV_PATH) -> PathAnalytics:
+    """Learning-path aggregates (see analytics.py), up to date with df."""
+    return sync_store_index(PathAnalytics, df, path)
+
+def knowledge_gaps(df: pd.DataFrame, path: str = CSV_PATH) -> KnowledgeGaps:
+    """Per-L2 knowledge-gap reports (see knowledge_gaps.py), up to date with df."""
+    return sync_store_index(KnowledgeGaps, df, path)
+
+def related_articles(df: pd.DataFrame, url: str, k: int = 10, min_similarity: float = 0.0,
+                     path: str = CSV_PATH) -> pd.DataFrame:
+    """
+    Up to k stored articles most similar to url's tags and knowledge paths
+    (MinHash-LSH, see recommendations.py), with an estimated "similarity" column.
+    """
+    pos = url_index(df).get(canonicalize_url(url))
+    if pos is None:
+        return df.iloc[:0].assign(similarity=pd.Series(dtype=float))
+    hits = sync_store_index(RelatedArticles, df, path).related(pos, k, min_similarity)
+    rows = [a for a, _ in hits if a < len(df)]
+    return df.iloc[rows].assign(similarity=[s for a, s in hits if a < len(df)])
+
+def search_articles(df: pd.DataFrame, query: str, k: int = 20, path: str = CSV_PATH) -> pd.DataFrame:
+    """
+    Up to k stored articles matching query over headline, TL;DR and
+    content_text (BM25, see search_index.py), best first, with a "score" column.
+    """
+    hits = [(a, s) for a, s in sync_store_index(SearchIndex, df, path).search(query, k) if a < len(df)]
+    return df.iloc[[a for a, _ in hits]].assign(score=pd.Series([s for _, s in hits], dtype=float).to_numpy())
+
+def _with_similarity(df: pd.DataFrame, hits: T.List[T.Tuple[int, float]]) -> pd.DataFrame:
+    hits = [(a, s) for a, s in hits if a < len(df)]
+    return df.iloc[[a for a, _ in hits]].assign(similarity=pd.Series([s for _, s in hits], dtype=float).to_numpy())
+
+def similar_articles(df: pd.DataFrame, url: str, k: int = 10, path: str = CSV_PATH) -> pd.DataFrame:
+    """
+    Up to k stored articles whose text is closest to url's (hashed n-gram
+    vectors + IVF, see semantic_index.py), with a cosine "similarity" column.
+    """
+    pos = url_index(df).get(canonicalize_url(url))
+    if pos is None:
+        return _with_similarity(df, [])
+    return _with_similarity(df, sync_store_index(SemanticIndex, df, path).similar(pos, k))
+
+def semantic_search(df: pd.DataFrame, text: str, k: int = 10, path: str = CSV_PATH) -> pd.DataFrame:
+    """Up to k stored articles whose text is closest to free text, with a "similarity" column."""
+    return _with_similarity(df, sync_store_index(SemanticIndex, df, path).search(text, k))
 
 def get_cached_row(df: pd.DataFrame, url: str) -> T.Optional[dict]:
     canon = canonicalize_url(url)
-    hits = df[df["url_canonical"] == canon]
-    if len(hits) == 0:
+    pos = url_index(df).get(canon)
+    if pos is not None and (pos >= len(df) or df["url_canonical"].iat[pos] != canon):
+        # frame was modified in place since the index was built
+        pos = url_index(df, rebuild=True).get(canon)
+    if pos is None:
         return None
-    rec = hits.iloc[0].to_dict()
+    rec = df.iloc[pos].to_dict()
     # ensure list types for convenience
     for col in ["L3","L4","L5","L6","tldr"]:
         v = rec.get(col)
@@ -638,14 +1837,12 @@ def ingest_or_fetch(
 ) -> T.Tuple[dict, pd.DataFrame]:
     """
     If canonical URL exists in CSV, return the cached row (and skip LLM).
-    Else run analyze_link_plus(), update taxonomy JSON, append 1 row to CSV, and return the new row.
+    Else run analyze_link_plus(), record its terms in the taxonomy, append 1 row to CSV, and return the new row.
     Returns: (row_as_dict, updated_df)
     """
-    # 0) load CSV (cache) and taxonomy
+    # 0) load CSV (cache) and taxonomy (cached service, catches up incrementally)
     df = load_csv(csv_path)
-    tax = load_taxonomy(taxonomy_path)
-    tax.setdefault("categories", [])
-    tax.setdefault("tags", [])
+    taxonomy = taxonomy_service(taxonomy_path)
 
     # 1) cached?
     if not force_reingest:
@@ -657,18 +1854,36 @@ def ingest_or_fetch(
     # 2) not cached → analyze
     rec = analyze_link_plus(
         url,
-        allowed_categories=tax["categories"],
-        allowed_tags=tax["tags"]
+        allowed_categories=taxonomy.categories,
+        allowed_tags=taxonomy.tags,
+        category_matcher=taxonomy.matcher("categories"),
+        tag_matcher=taxonomy.matcher("tags"),
+        taxonomy=taxonomy,
+    )
+
+    # 3) update taxonomy: one journal append (new terms + usage counts), safe under concurrent ingests
+    taxonomy.record(
+        categories=rec["_taxonomy"]["matched_categories"],
+        tags=rec["_taxonomy"]["matched_tags"],
+        domain=rec["domain"],
     )
 
-    # 3) update taxonomy (evolving lists)
-    tax["categories"] = rec["_taxonomy"]["updated_categories"]
-    tax["tags"] = rec["_taxonomy"]["updated_tags"]
-    save_taxonomy(tax["categories"], tax["tags"], taxonomy_path)
+    # 4) append to CSV cache; on a concurrent commit, reload and re-append
+    for _ in range(STORE_WRITE_RETRIES):
+        try:
+            df = append_record(df, rec)
+            save_csv(df, csv_path)
+            break
+        except StoreConflictError:
+            df = load_csv(csv_path)
+            if not force_reingest and get_cached_row(df, url) is not None:
+                break  # another writer stored this URL meanwhile
+    else:
+        raise StoreConflictError(f"could not commit {csv_path} after {STORE_WRITE_RETRIES} attempts")
 
-    # 4) append to CSV cache
-    df = append_record(df, rec)
-    save_csv(df, csv_path)
+    # 4b) extend the persisted store indexes (STORE_INDEX_TYPES) with the new row
+    for cls in STORE_INDEX_TYPES:
+        sync_store_index(cls, df, csv_path)
 
     # 5) return a compact dict consistent with CSV row formatting
     row = {
@@ -723,25 +1938,159 @@ CARD_COLUMNS = [
     "created_at_utc"   # ISO str
 ]
 
+# Learned-state changes are appended to a small review-event log next to the
+# cards CSV instead of rewriting the whole file on every swipe. The log is folded
+# into the frame on load and compacted back into the CSV once it grows past
+# CARD_EVENTS_COMPACT_BYTES (or whenever the full CSV is rewritten anyway).
+CARD_EVENTS_COMPACT_BYTES = int(os.getenv("CARD_EVENTS_COMPACT_BYTES", "65536"))
+
+def _card_events_path(path: str = CARDS_CSV) -> str:
+    return str(Path(path).with_suffix(".events.jsonl"))
+
+def _read_card_events(path: str = CARDS_CSV, start: int = 0) -> T.Tuple[T.Dict[str, bool], int]:
+    """
+    Replay the review-event log from byte offset `start`.
+    Returns ({card_id: learned} with the last event winning, end offset).
+    """
+    p = Path(_card_events_path(path))
+    if not p.exists():
+        return {}, 0
+    with p.open("rb") as f:
+        f.seek(start)
+        data = f.read()
+    # a trailing line without newline is a write still in progress: leave it for later
+    end = data.rfind(b"\n") + 1
+    state = {}
+    for line in data[:end].splitlines():
+        try:
+            ev = json.loads(line)
+        except Exception:
+            continue  # torn line from a crash mid-write
+        state[str(ev.get("card_id"))] = bool(ev.get("learned"))
+    return state, start + end
+
+def _apply_card_events(df: pd.DataFrame, events: T.Dict[str, bool]) -> None:
+    if not events:
+        return
+    mask = df["card_id"].astype(str).isin(events.keys())
+    if mask.any():
+        df.loc[mask, "learned"] = df.loc[mask, "card_id"].astype(str).map(events).astype(bool)
+
+def _append_card_event(card_id: str, learned: bool, path: str = CARDS_CSV) -> None:
+    """Durably record one learned-state change: O(1), independent of deck size."""
+    line = json.dumps({"card_id": card_id, "learned": bool(learned), "at_utc": _utc_now_iso()}) + "\n"
+    events_path = _card_events_path(path)
+    with store_lock(path):
+        with open(events_path, "a", encoding="utf-8") as f:
+            f.write(line)
+            f.flush()
+            os.fsync(f.fileno())
+        if os.path.getsize(events_path) >= CARD_EVENTS_COMPACT_BYTES:
+            compact_card_events(path)
+
+def compact_card_events(path: str = CARDS_CSV) -> None:
+    """Fold the review-event log into the cards CSV and truncate the log."""
+    with store_lock(path):
+        df = _ensure_cards_csv(path)
+        _save_cards_df(df, path)
+
 def _ensure_cards_csv(path: str = CARDS_CSV) -> pd.DataFrame:
+    version = store_version(path)  # read before the data (see store locking notes)
     p = Path(path)
     if not p.exists():
         df = pd.DataFrame(columns=CARD_COLUMNS)
-        df.to_csv(path, index=False)
+        with store_lock(path):
+            if not p.exists():
+                version = _commit_store(path, lambda f: df.to_csv(f, index=False), None)
+        df.attrs.update(store_version=version, events_offset=0)
         return df
-    df = pd.read_csv(path)
+    snap, raw, signature = _load_snapshot(path, version)
+    if snap is not None:
+        df = snap["frame"]
+    else:
+        df = _parse_cards_csv(raw)
+        _write_snapshot(path, df, raw, signature, version)
+    # Apply learned-state changes not yet compacted into the CSV
+    events, offset = _read_card_events(path)
+    _apply_card_events(df, events)
+    df = df[CARD_COLUMNS]
+    df.attrs.update(store_version=version, events_offset=offset)
+    return df
+
+def _parse_cards_csv(raw: bytes) -> pd.DataFrame:
+    df = pd.read_csv(io.BytesIO(raw))
     # Backward/robust handling
     for col in CARD_COLUMNS:
         if col not in df.columns:
             df[col] = None
-    # Coerce learned -> bool
+    # Coerce learned -> bool (vectorized; handles bools, "True"/"false" strings and NaN)
     if "learned" in df.columns:
-        df["learned"] = df["learned"].apply(lambda x: bool(x) if isinstance(x, (bool,)) else (str(x).lower() == "true"))
-    return df[CARD_COLUMNS]
+        df["learned"] = df["learned"].astype(str).str.strip().str.lower() == "true"
+    return df
 
-def _save_cards_df(df: pd.DataFrame, path: str = CARDS_CSV) -> None:
-    df2 = df.copy()
-    df2.to_csv(path, index=False)
+def _save_cards_df(
+    df: pd.DataFrame,
+    path: str = CARDS_CSV,
+    appended: pd.DataFrame = None,
+    expected_version: T.Optional[int] = None,
+) -> None:
+    """
+    Atomic, locked rewrite of the cards CSV (folds in and clears the event log).
+    Raises StoreConflictError if the CSV was committed by another writer since
+    df was loaded. Pass `appended` (the new rows only) when df is the
+    previously saved frame plus those rows, so the url index is extended in place.
+    """
+    if expected_version is None:
+        expected_version = df.attrs.get("store_version")
+    with store_lock(path):
+        prev = _CARD_URL_INDEX.get(path)
+        prev_current = prev is not None and Path(path).exists() and prev[0] == _file_signature(path)
+        df2 = df.copy()
+        # events logged after df was loaded are newer than its learned state
+        late, _ = _read_card_events(path, start=df.attrs.get("events_offset", 0))
+        _apply_card_events(df2, late)
+        data = df2.to_csv(index=False)
+        df.attrs["store_version"] = _commit_store(path, lambda f: f.write(data), expected_version)
+        df.attrs["events_offset"] = 0
+        if STORE_SNAPSHOTS:
+            raw = data.encode("utf-8")
+            _write_snapshot(path, _parse_cards_csv(raw), raw, _file_signature(path), df.attrs["store_version"])
+        # the CSV now carries every logged event
+        events_path = Path(_card_events_path(path))
+        if events_path.exists():
+            events_path.unlink()
+        if appended is not None and prev_current:
+            index = prev[1]
+            for url, ids in _group_card_ids(appended).items():
+                index.setdefault(url, []).extend(ids)
+        else:
+            index = _group_card_ids(df)
+        _CARD_URL_INDEX[path] = (_file_signature(path), index)
+
+# url_canonical -> [card_id, ...] per cards CSV, valid while the file signature matches
+_CARD_URL_INDEX: T.Dict[str, T.Tuple[tuple, T.Dict[str, T.List[str]]]] = {}
+
+def _file_signature(path: str) -> tuple:
+    st = os.stat(path)
+    return (st.st_mtime_ns, st.st_size)
+
+def _group_card_ids(df: pd.DataFrame) -> T.Dict[str, T.List[str]]:
+    if df.empty or "url_canonical" not in df.columns:
+        return {}
+    return df["card_id"].astype(str).groupby(df["url_canonical"], sort=False).agg(list).to_dict()
+
+def card_url_index(path: str = CARDS_CSV) -> T.Dict[str, T.List[str]]:
+    """Hash index url_canonical -> card ids; rebuilt (2 columns only) when the file changed."""
+    if not Path(path).exists():
+        return {}
+    sig = _file_signature(path)
+    cached = _CARD_URL_INDEX.get(path)
+    if cached is not None and cached[0] == sig:
+        return cached[1]
+    df = pd.read_csv(path, usecols=lambda c: c in ("card_id", "url_canonical"))
+    index = _group_card_ids(df)
+    _CARD_URL_INDEX[path] = (sig, index)
+    return index
 
 # =========================
 # Utilities
@@ -853,12 +2202,13 @@ def generate_cards_for_url(
     if reset_learn:
         reset_learned(url_canonical, reset_learn_scope)
 
-    df = _ensure_cards_csv(CARDS_CSV)
-
     # Fast path: URL already present -> skip generation unless forced
-    if not regenerate and (df["url_canonical"] == url_canonical).any():
+    if not regenerate and url_canonical in card_url_index(CARDS_CSV):
+        df = _ensure_cards_csv(CARDS_CSV)
         return df if return_scope == "all" else df[df["url_canonical"] == url_canonical].copy()
 
+    df = _ensure_cards_csv(CARDS_CSV)
+
     # Otherwise, try to generate
     rec, row, df_full = ingest_or_fetch(url_canonical)
     pairs = _call_llm_for_cards(row["content_text"])
@@ -867,7 +2217,8 @@ def generate_cards_for_url(
         df = _ensure_cards_csv(CARDS_CSV)
         return df if return_scope == "all" else df[df["url_canonical"] == url_canonical].copy()
 
-    existing_ids = set(df["card_id"].astype(str).tolist())
+    # card ids hash the url, so only this url's cards can collide
+    existing_ids = set(card_url_index(CARDS_CSV).get(url_canonical, []))
     rows_to_add = []
     now_iso = _utc_now_iso()
     count_added = 0
@@ -890,8 +2241,19 @@ def generate_cards_for_url(
         count_added += 1
 
     if rows_to_add:
-        df = pd.concat([df, pd.DataFrame(rows_to_add)], ignore_index=True)
-        _save_cards_df(df, CARDS_CSV)
+        added = pd.DataFrame(rows_to_add)
+        for _ in range(STORE_WRITE_RETRIES):
+            out = pd.concat([df, added], ignore_index=True)
+            out.attrs.update(df.attrs)
+            try:
+                _save_cards_df(out, CARDS_CSV, appended=added)
+                break
+            except StoreConflictError:
+                # another writer committed: re-append onto the fresh cards, skipping ids it added
+                df = _ensure_cards_csv(CARDS_CSV)
+                added = added[~added["card_id"].isin(card_url_index(CARDS_CSV).get(url_canonical, []))]
+        else:
+            raise StoreConflictError(f"could not commit {CARDS_CSV} after {STORE_WRITE_RETRIES} attempts")
 
     df = _ensure_cards_csv(CARDS_CSV)
     return df if return_scope == "all" else df[df["url_canonical"] == url_canonical].copy()
@@ -925,7 +2287,7 @@ def swipe_left(queue: deque) -> None:
 
 def swipe_right(queue: deque, card_id: str) -> None:
     """
-    "I know it": mark learned=True in CSV, then remove from the queue.
+    "I know it": mark learned=True (review-event log), then remove from the queue.
     """
     if not queue:
         return
@@ -934,12 +2296,8 @@ def swipe_right(queue: deque, card_id: str) -> None:
         # guard: if caller passed mismatched card_id, align to current
         card_id = current["card_id"]
 
-    # persist learned=True
-    df = _ensure_cards_csv(CARDS_CSV)
-    idx = df.index[df["card_id"] == card_id]
-    if len(idx) > 0:
-        df.loc[idx, "learned"] = True
-        _save_cards_df(df, CARDS_CSV)
+    # persist learned=True (appended to the review-event log)
+    _append_card_event(card_id, True, CARDS_CSV)
 
     # remove from queue
     queue.popleft()
@@ -959,35 +2317,37 @@ def reset_learned(url_canonical: str, reset_learn_scope: str = "url") -> int:
     if reset_learn_scope not in ("url", "all"):
         raise ValueError("reset_learn_scope must be 'url' or 'all'.")
 
-    df = _ensure_cards_csv(CARDS_CSV)
-    if df.empty:
-        return 0
-
-    if reset_learn_scope == "all":
-        n = len(df)
+    # hold the lock across load+save so no concurrent commit can interleave
+    with store_lock(CARDS_CSV):
+        df = _ensure_cards_csv(CARDS_CSV)
+        if df.empty:
+            return 0
+
+        if reset_learn_scope == "all":
+            n = len(df)
+            if n > 0:
+                df["learned"] = False
+                _save_cards_df(df, CARDS_CSV)
+            return n
+
+        # scope == "url"
+        mask = (df["url_canonical"] == url_canonical)
+        n = int(mask.sum())
         if n > 0:
-            df["learned"] = False
+            df.loc[mask, "learned"] = False
             _save_cards_df(df, CARDS_CSV)
         return n
 
-    # scope == "url"
-    mask = (df["url_canonical"] == url_canonical)
-    n = int(mask.sum())
-    if n > 0:
-        df.loc[mask, "learned"] = False
-        _save_cards_df(df, CARDS_CSV)
-    return n
-
-
 
 # =========================
 # Convenience helpers
 # =========================
 def url_exists_in_cards(url_canonical: str, path: str = CARDS_CSV) -> bool:
-    df = _ensure_cards_csv(path)
-    return bool((df["url_canonical"] == url_canonical).any())
+    return url_canonical in card_url_index(path)
 
 def get_cards_for_url(url_canonical: str, path: str = CARDS_CSV) -> pd.DataFrame:
+    if url_canonical not in card_url_index(path):
+        return pd.DataFrame(columns=CARD_COLUMNS)
     df = _ensure_cards_csv(path)
     return df[df["url_canonical"] == url_canonical].copy()
 
@@ -0,0 +1,190 @@
+"""
+Knowledge-gap detection per L2 domain (roadmap phase 3: "missing links in
+chains") over the aggregated L3→L6 relationship graph.
+
+KnowledgeGaps reads the store-wide RelationshipGraph (the persisted graph
+index, handed over by core; a standalone build keeps its own in memory) and
+keeps, per L2 domain, how many of the domain's articles mention each node
+and each edge (node/edge ids are the graph's). A domain's report lists:
+
+  dead_ends              L3–L5 nodes no domain article continues past,
+                         with the continuations other domains have
+  thin_nodes             L4/L5 links of a chain backed by at most THIN_RATIO
+                         of the articles of their heaviest parent
+  missing_links          parent→child edges seen elsewhere in the store
+                         between two nodes the domain has but never links
+  missing_intermediates  nodes the store uses to bridge two domain nodes
+                         two levels apart that the domain never bridges
+
+Reports are plain dicts, computed on first request and cached in the index
+until an ingest marks the domain dirty: the article's own L2, and every
+domain holding a node of a store-wide edge the article added or
+strengthened. An ingest itself only updates counters; the analysis works on
+arrays sized to the domain's nodes, not to the whole graph.
+"""
+import typing as T
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+
+from relationship_graph import LEVELS, RelationshipGraph, _DST_BITS, _DST_MASK
+from store_index import StoreIndex
+
+THIN_RATIO = 0.25
+THIN_MIN_PARENT = 3
+GAP_LIMIT = 25
+GAP_KINDS = ["dead_ends", "thin_nodes", "missing_links", "missing_intermediates"]
+
+
+def empty_report(domain: str) -> T.Dict[str, T.Any]:
+    return {"domain": domain, "articles": 0, **{kind: [] for kind in GAP_KINDS}}
+
+
+class KnowledgeGaps(StoreIndex):
+    name = "gaps"
+    uses = (RelationshipGraph,)
+
+    def __init__(self):
+        super().__init__()
+        self.graph: T.Optional[RelationshipGraph] = None
+        self.domain_articles: T.Counter[str] = Counter()
+        self.domain_nodes: T.Dict[str, T.Counter[int]] = {}
+        self.domain_edges: T.Dict[str, T.Counter[int]] = {}
+        self.node_domains: T.Dict[int, T.Set[str]] = {}
+        self.reports: T.Dict[str, T.Dict[str, T.Any]] = {}
+        self.dirty: T.Set[str] = set()
+
+    def use(self, graph: RelationshipGraph) -> None:
+        super().use(graph)
+        self.graph = graph
+
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        state["graph"] = None  # the graph is its own index
+        return state
+
+    # ---- building ----
+    def _add_rows(self, df: pd.DataFrame, start: int) -> None:
+        if self.graph is None:
+            self.graph = RelationshipGraph()
+        if self.graph.n_rows < len(df):
+            self.graph.extend(df)  # standalone; core hands over the synced store graph
+        l2s = df["L2"].iloc[start:].tolist() if "L2" in df.columns else [None] * (len(df) - start)
+        changed: T.Set[int] = set()
+        for domain, paths in zip(l2s, df["sequential_paths"].iloc[start:].tolist()):
+            nodes, edges = self.graph.article_edges(paths)
+            changed |= edges
+            if not isinstance(domain, str) or not domain or not nodes:
+                continue
+            self.dirty.add(domain)
+            self.domain_articles[domain] += 1
+            self.domain_nodes.setdefault(domain, Counter()).update(nodes)
+            self.domain_edges.setdefault(domain, Counter()).update(edges)
+            for node in nodes:
+                self.node_domains.setdefault(node, set()).add(domain)
+        for key in changed:  # store-wide edges changed: every domain holding an end may gain a gap
+            self.dirty.update(self.node_domains.get(key >> _DST_BITS, ()))
+            self.dirty.update(self.node_domains.get(key & _DST_MASK, ()))
+
+    def _node(self, node: int, **extra: T.Any) -> T.Dict[str, T.Any]:
+        return {"level": LEVELS[self.graph.node_level[node]], "tag": self.graph.node_label[node], **extra}
+
+    def _analyze(self, domain: str) -> T.Dict[str, T.Any]:
+        g = self.graph
+        counts = self.domain_nodes.get(domain, Counter())
+        edge_counts = self.domain_edges.get(domain, Counter())
+        # the domain's nodes, sorted; every array below is indexed by position in it
+        nodes = np.fromiter(counts, dtype=np.int64, count=len(counts))
+        order = np.argsort(nodes)
+        nodes = nodes[order]
+        support = np.fromiter(counts.values(), dtype=np.int64, count=len(counts))[order]
+        level = np.fromiter((g.node_level[n] for n in nodes.tolist()), dtype=np.int64, count=len(nodes))
+
+        def local(ids: np.ndarray) -> T.Tuple[np.ndarray, np.ndarray]:
+            """(position in nodes, is a domain node) of graph node ids."""
+            pos = np.minimum(np.searchsorted(nodes, ids), max(len(nodes) - 1, 0))
+            return pos, (nodes[pos] == ids) if len(nodes) else np.zeros(len(ids), dtype=bool)
+
+        keys = np.sort(np.fromiter(edge_counts, dtype=np.int64, count=len(edge_counts)))
+        src, dst = local(keys >> _DST_BITS)[0], local(keys & _DST_MASK)[0]
+        kids: T.Dict[int, T.List[int]] = {}
+        for p, c in zip(src.tolist(), dst.tolist()):
+            kids.setdefault(p, []).append(c)
+        report = empty_report(domain)
+        report["articles"] = int(self.domain_articles[domain])
+
+        # dead ends: no domain edge leaves the node although deeper levels exist
+        has_child = np.zeros(len(nodes), dtype=bool)
+        has_child[src] = True
+        ends = np.flatnonzero(~has_child & (level < len(LEVELS) - 1))
+        ends = ends[np.lexsort((nodes[ends], -support[ends]))][:GAP_LIMIT]
+        report["dead_ends"] = [
+            self._node(int(nodes[i]), articles=int(support[i]),
+                       continues_elsewhere=[c for c, _ in g.children(int(nodes[i]))[:3]])
+            for i in ends.tolist()]
+
+        # thin links: intermediate node backed by few of its heaviest parent's articles
+        heaviest_parent = np.zeros(len(nodes), dtype=np.int64)
+        np.maximum.at(heaviest_parent, dst, support[src])
+        by_support = np.argsort(support[src], kind="stable")
+        parent_of = dict(zip(dst[by_support].tolist(), src[by_support].tolist()))  # heaviest parent written last
+        thin = np.flatnonzero(has_child & (heaviest_parent >= THIN_MIN_PARENT)
+                              & (support <= THIN_RATIO * heaviest_parent))
+        thin = thin[np.lexsort((nodes[thin], support[thin], -heaviest_parent[thin]))][:GAP_LIMIT]
+        report["thin_nodes"] = [
+            self._node(int(nodes[i]), articles=int(support[i]), parent=g.node_label[nodes[parent_of[i]]],
+                       parent_articles=int(heaviest_parent[i]),
+                       children=sorted(g.node_label[nodes[c]] for c in kids[i]))
+            for i in thin.tolist()]
+
+        # missing links: the store links two domain nodes, the domain never does
+        a, b, w = g.out_edges(nodes)
+        missing = local(b)[1] & ~np.isin(a << _DST_BITS | b, keys)
+        a, b, w = a[missing], b[missing], w[missing]
+        top = np.lexsort((b, a, -w))[:GAP_LIMIT]
+        report["missing_links"] = [
+            {"level": LEVELS[g.node_level[p]], "parent": g.node_label[p], "child": g.node_label[c], "support": int(s)}
+            for p, c, s in zip(a[top].tolist(), b[top].tolist(), w[top].tolist())]
+
+        # missing intermediates: store bridges a → x → c (x outside the domain), the domain has no a → ? → c
+        a, x, w1 = g.out_edges(nodes[level < len(LEVELS) - 2])
+        outside = ~local(x)[1]
+        a, x, w1 = a[outside], x[outside], w1[outside]
+        report["missing_intermediates"] = []
+        if len(x):
+            vias, inv = np.unique(x, return_inverse=True)
+            _, ends, w2 = g.out_edges(vias)
+            lens = g.indptr[vias + 1] - g.indptr[vias]
+            rep = lens[inv]  # one row per a → x → c
+            offsets = np.repeat(np.cumsum(lens)[inv] - lens[inv] - np.cumsum(rep) + rep, rep) + np.arange(rep.sum())
+            pair = np.repeat(a, rep) << _DST_BITS | ends[offsets]
+            bridge = np.minimum(np.repeat(w1, rep), w2[offsets])
+            via = np.repeat(vias[inv], rep)
+            two_hop = np.fromiter((nodes[p] << _DST_BITS | nodes[q] for p, m in zip(src.tolist(), dst.tolist())
+                                   for q in kids.get(m, ())), dtype=np.int64)
+            keep = local(ends[offsets])[1] & ~np.isin(pair, two_hop)
+            pair, bridge, via = pair[keep], bridge[keep], via[keep]
+            order = np.lexsort((via, -bridge, pair))  # per pair: strongest bridge first
+            pair, bridge, via = pair[order], bridge[order], via[order]
+            first = np.flatnonzero(np.concatenate([[True], pair[1:] != pair[:-1]])) if len(pair) else np.empty(0, dtype=np.int64)
+            bounds = np.append(first, len(pair))
+            for i in np.lexsort((pair[first], -bridge[first]))[:GAP_LIMIT].tolist():
+                p, q = int(pair[first[i]] >> _DST_BITS), int(pair[first[i]] & _DST_MASK)
+                report["missing_intermediates"].append(
+                    {"level": LEVELS[g.node_level[p]], "start": g.node_label[p], "end": g.node_label[q],
+                     "via": [g.node_label[v] for v in via[bounds[i]:min(bounds[i + 1], bounds[i] + 3)].tolist()],
+                     "support": int(bridge[first[i]])})
+        return report
+
+    # ---- queries ----
+    def report(self, domain: str) -> T.Dict[str, T.Any]:
+        """Gap report of an L2 domain (empty if the domain has no paths), recomputed only if dirty."""
+        if domain in self.dirty:
+            self.reports[domain] = self._analyze(domain)
+            self.dirty.discard(domain)
+        return self.reports.get(domain) or empty_report(domain)
+
+    def domains(self) -> T.List[T.Tuple[str, int]]:
+        """(L2, articles with paths), most articles first."""
+        return sorted(self.domain_articles.items(), key=lambda r: (-r[1], r[0]))
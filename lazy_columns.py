@@ -0,0 +1,400 @@
+"""
+Lazy pandas column types for the links store.
+
+LazyJSONArray keeps each cell's serialized JSON string and only parses it the
+first time that cell is read (or the whole column, in one bulk parser pass,
+when pandas needs every value at once, e.g. .apply / .tolist / to_dict).
+Decoded values are cached in place, so each cell is parsed at most once.
+
+CompressedTextArray keeps article bodies zlib/lzma-compressed in memory and
+decompresses a cell on every read without caching it.
+
+Filtering, slicing, copying and concatenating never decode anything.
+"""
+import gc
+import sys
+import functools
+import json
+import lzma
+import zlib
+import base64
+import typing as T
+
+import numpy as np
+import pandas as pd
+from pandas.api.extensions import (
+    ExtensionArray,
+    ExtensionDtype,
+    register_extension_dtype,
+    take,
+)
+from pandas.api.indexers import check_array_indexer
+
+try:
+    import orjson  # optional: much faster JSON decoding
+except Exception:
+    orjson = None
+
+_EMPTY_LIST_JSON = "[]"
+
+
+def json_loads(text: str):
+    return orjson.loads(text) if orjson is not None else json.loads(text)
+
+
+def json_loads_many(texts: T.Sequence[str]) -> list:
+    """
+    Decode many JSON documents with a single parser call by joining them
+    into one JSON array. A malformed document falls back to cell-by-cell
+    decoding, keeping the bad cell as its raw string.
+    """
+    if len(texts) == 0:
+        return []
+    # millions of fresh (acyclic) lists would otherwise trigger repeated GC passes
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        return json_loads("[" + ",".join(texts) + "]")
+    except Exception:
+        out = []
+        for raw in texts:
+            try:
+                out.append(json_loads(raw))
+            except Exception:
+                out.append(raw)
+        return out
+    finally:
+        if gc_enabled:
+            gc.enable()
+
+
+def _compose(first: T.Callable, second: T.Callable, value):
+    return second(first(value))
+
+
+def _object_array(values: T.Iterable) -> np.ndarray:
+    # np.array() would try to broadcast nested lists; fill element-wise instead
+    values = list(values)
+    arr = np.empty(len(values), dtype=object)
+    arr[:] = values
+    return arr
+
+
+class _LazyArray(ExtensionArray):
+    """
+    Object column whose cells may still be in serialized form.
+
+    _values[i] holds the serialized cell while _pending[i] is True and the
+    Python value otherwise. Subclasses define how cells decode and whether
+    decoded values replace the serialized form (_cache_decoded). An optional
+    transform (see map_values) is applied to every value as it is decoded.
+    """
+    _cache_decoded = True
+    _transform = None  # default for arrays unpickled from older snapshots
+
+    def __init__(self, values: np.ndarray, pending: np.ndarray, transform: T.Optional[T.Callable] = None):
+        self._values = values
+        self._pending = pending
+        self._transform = transform
+
+    # ---- subclass hooks ----
+    @staticmethod
+    def _decode(raw):
+        raise NotImplementedError
+
+    @classmethod
+    def _decode_many(cls, raws: list) -> list:
+        return [cls._decode(r) for r in raws]
+
+    # ---- construction ----
+    @classmethod
+    def _from_sequence(cls, scalars, *, dtype=None, copy=False):
+        if isinstance(scalars, cls):
+            return scalars.copy() if copy else scalars
+        values = _object_array(scalars)
+        return cls(values, np.zeros(len(values), dtype=bool))
+
+    @classmethod
+    def _from_factorized(cls, values, original):
+        return cls._from_sequence(values)
+
+    # ---- decoding ----
+    def _decode_cell(self, i: int):
+        if not self._pending[i]:
+            return self._values[i]
+        try:
+            value = self._decode(self._values[i])
+        except Exception:
+            value = self._values[i]  # keep malformed cells in their raw form
+        if self._transform is not None:
+            value = self._transform(value)
+        if self._cache_decoded:
+            self._values[i] = value
+            self._pending[i] = False
+        return value
+
+    def materialize(self) -> np.ndarray:
+        """Decode every pending cell (one bulk pass) and return the values."""
+        pos = np.flatnonzero(self._pending)
+        if not len(pos):
+            return self._values
+        decoded = self._decode_many(self._values[pos].tolist())
+        if self._transform is not None:
+            decoded = [self._transform(v) for v in decoded]
+        decoded = _object_array(decoded)
+        if not self._cache_decoded:
+            out = self._values.copy()
+            out[pos] = decoded
+            return out
+        self._values[pos] = decoded
+        self._pending[pos] = False
+        return self._values
+
+    @property
+    def n_decoded(self) -> int:
+        return int(len(self._pending) - self._pending.sum())
+
+    def map_values(self, fn: T.Callable) -> "_LazyArray":
+        """
+        Copy whose values all pass through fn: decoded cells now, pending cells
+        when they are decoded (so nothing is decoded just to apply fn).
+        """
+        values = self._values.copy()
+        done = np.flatnonzero(~self._pending)
+        if len(done):
+            values[done] = _object_array(fn(v) for v in values[done])
+        prev = self._transform
+        transform = fn if prev is None else functools.partial(_compose, prev, fn)
+        return type(self)(values, self._pending.copy(), transform)
+
+    # ---- ExtensionArray interface ----
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self._decode_cell(i)
+
+    def __getitem__(self, item):
+        if isinstance(item, (int, np.integer)):
+            return self._decode_cell(int(item))
+        if isinstance(item, tuple) and len(item) == 1:
+            item = item[0]
+        if not isinstance(item, slice):
+            item = check_array_indexer(self, item)
+        return type(self)(self._values[item], self._pending[item], self._transform)
+
+    def _is_cell_value(self, v) -> bool:
+        return isinstance(v, (list, dict, str)) or v is None
+
+    def __setitem__(self, key, value):
+        if isinstance(key, tuple) and len(key) == 1:
+            key = key[0]
+        if isinstance(key, (int, np.integer)):
+            self._values[key] = value
+            self._pending[key] = False
+            return
+        if not isinstance(key, slice):
+            key = check_array_indexer(self, key)
+        n = len(self._values[key])
+        if isinstance(value, _LazyArray):
+            value = value.materialize()
+        elif not (isinstance(value, (list, np.ndarray, pd.Series)) and len(value) == n
+                  and all(self._is_cell_value(v) for v in value)):
+            value = [value] * n  # one scalar (e.g. a single list) for every position
+        self._values[key] = _object_array(value)
+        self._pending[key] = False
+
+    @property
+    def nbytes(self) -> int:
+        return self._values.nbytes + self._pending.nbytes
+
+    def isna(self) -> np.ndarray:
+        return np.array([v is None for v in self._values], dtype=bool)
+
+    def take(self, indices, allow_fill=False, fill_value=None):
+        values = take(self._values, indices, allow_fill=allow_fill, fill_value=fill_value)
+        pending = take(self._pending, indices, allow_fill=allow_fill, fill_value=False)
+        return type(self)(values, pending, self._transform)
+
+    def copy(self):
+        return type(self)(self._values.copy(), self._pending.copy(), self._transform)
+
+    @classmethod
+    def _concat_same_type(cls, to_concat):
+        transform = to_concat[0]._transform
+        parts = []
+        for a in to_concat:
+            if a._transform is not transform and a._pending.any():
+                a = cls(a.materialize().copy(), np.zeros(len(a), dtype=bool), transform)  # decode under its own transform
+            parts.append(a)
+        return cls(
+            np.concatenate([a._values for a in parts]),
+            np.concatenate([a._pending for a in parts]),
+            transform,
+        )
+
+    def astype(self, dtype, copy=True):
+        if isinstance(dtype, type(self.dtype)):
+            return self.copy() if copy else self
+        values = self.materialize()
+        if pd.api.types.pandas_dtype(dtype) == np.dtype(object):
+            return values.copy() if copy and values is self._values else values
+        return np.asarray(values, dtype=dtype)
+
+    def __array__(self, dtype=None, copy=None):
+        return self.materialize()
+
+    def __arrow_array__(self, type=None):
+        import pyarrow as pa
+        return pa.array(self.materialize(), type=type)
+
+    def __eq__(self, other):
+        if isinstance(other, (pd.Series, pd.Index, pd.DataFrame)):
+            return NotImplemented
+        values = self.materialize()
+        if isinstance(other, (_LazyArray, np.ndarray)) and len(other) == len(self):
+            return np.array([a == b for a, b in zip(values, other)], dtype=bool)
+        return np.array([v == other for v in values], dtype=bool)
+
+    def _formatter(self, boxed: bool = False):
+        return repr
+
+
+@register_extension_dtype
+class LazyJSONDtype(ExtensionDtype):
+    name = "lazy_json"
+    type = list
+    kind = "O"
+    na_value = None
+
+    @classmethod
+    def construct_array_type(cls):
+        return LazyJSONArray
+
+
+class LazyJSONArray(_LazyArray):
+    """Column of JSON list values, each decoded (and cached) on first access."""
+
+    @staticmethod
+    def _decode(raw):
+        return json_loads(raw)
+
+    @classmethod
+    def _decode_many(cls, raws: list) -> list:
+        return json_loads_many(raws)
+
+    @classmethod
+    def from_serialized(cls, series: pd.Series) -> "LazyJSONArray":
+        """Wrap a column read from CSV: JSON cells stay raw, nulls become []."""
+        values = series.to_numpy(dtype=object, copy=True)
+        null = series.isna().to_numpy()
+        try:
+            is_json = series.str.startswith(("[", "{"), na=False).to_numpy(dtype=bool)
+        except AttributeError:
+            is_json = np.zeros(len(series), dtype=bool)
+        values[null] = _EMPTY_LIST_JSON
+        return cls(values, is_json | null)
+
+    @property
+    def dtype(self):
+        return LazyJSONDtype()
+
+    def to_serialized(self) -> np.ndarray:
+        """Serialized form for writing back: raw cells are reused as-is."""
+        out = self._values.copy()
+        for i in np.flatnonzero(~self._pending):
+            v = out[i]
+            out[i] = v if isinstance(v, str) else json.dumps(v, ensure_ascii=False)
+        return out
+
+    def _values_for_factorize(self):
+        return _object_array(json.dumps(v) for v in self.materialize()), None
+
+
+# ---- compressed article bodies ----
+# On disk a compressed cell is "<codec>:<base64 of compressed utf-8>"; cells
+# without a codec prefix are plain legacy text and are compressed on next save.
+CODECS = {
+    "zlib": (lambda b: zlib.compress(b, 6), zlib.decompress),
+    "lzma": (lzma.compress, lzma.decompress),
+}
+
+
+def compress_text(text: str, codec: str = "zlib") -> str:
+    compress, _ = CODECS[codec]
+    return f"{codec}:" + base64.b64encode(compress(text.encode("utf-8"))).decode("ascii")
+
+
+def decompress_text(raw: str) -> str:
+    codec, _, payload = raw.partition(":")
+    _, decompress = CODECS[codec]
+    return decompress(base64.b64decode(payload)).decode("utf-8")
+
+
+@register_extension_dtype
+class CompressedTextDtype(ExtensionDtype):
+    name = "compressed_text"
+    type = str
+    kind = "O"
+    na_value = None
+
+    @classmethod
+    def construct_array_type(cls):
+        return CompressedTextArray
+
+
+class CompressedTextArray(_LazyArray):
+    """
+    Column of long texts kept compressed in memory; every read decompresses
+    the cell (nothing is cached, so resident memory stays at compressed size).
+    """
+    _cache_decoded = False
+
+    @staticmethod
+    def _decode(raw):
+        return decompress_text(raw)
+
+    @classmethod
+    def from_serialized(cls, series: pd.Series) -> "CompressedTextArray":
+        values = series.to_numpy(dtype=object, copy=True)
+        values[series.isna().to_numpy()] = None
+        prefixes = tuple(f"{codec}:" for codec in CODECS)
+        try:
+            pending = series.str.startswith(prefixes, na=False).to_numpy(dtype=bool)
+        except AttributeError:
+            pending = np.zeros(len(series), dtype=bool)
+        return cls(values, pending)
+
+    @classmethod
+    def from_texts(cls, texts: T.Iterable, codec: str = "zlib") -> "CompressedTextArray":
+        """Compress plain texts up front (None stays None)."""
+        values = _object_array(compress_text(t, codec) if isinstance(t, str) else None for t in texts)
+        return cls(values, np.array([v is not None for v in values], dtype=bool))
+
+    @property
+    def dtype(self):
+        return CompressedTextDtype()
+
+    def _is_cell_value(self, v) -> bool:
+        return isinstance(v, str) or v is None
+
+    def to_serialized(self, codec: str = "zlib") -> np.ndarray:
+        """Compressed on-disk form; already-compressed cells are reused as-is."""
+        out = self._values.copy()
+        for i in np.flatnonzero(~self._pending):
+            v = out[i]
+            if isinstance(v, str):
+                out[i] = compress_text(v, codec)
+        return out
+
+    def compressed_nbytes(self) -> int:
+        """Bytes of cell payloads as held in memory."""
+        return int(sum(len(v) for v in self._values if isinstance(v, str)))
+
+    def resident_nbytes(self) -> int:
+        """Memory held by the cell objects themselves (sys.getsizeof)."""
+        return int(sum(sys.getsizeof(v) for v in self._values if v is not None))
+
+    def _values_for_factorize(self):
+        return self.materialize(), None
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+One-shot migration of the links stores to the v2 schema.
+
+Streams every source CSV in chunks (constant memory), converts v1 rows
+(categories/tags) to L1–L6, canonicalizes URLs in bulk, drops duplicate
+url_canonical rows across all sources (the first source listed wins) and
+writes one versioned store through the same locked, atomic commit as
+save_csv. The output may be one of the sources: the new file only replaces
+it once everything has been written.
+
+v1 mapping: L1 = first category, L3 = tags. L2 and the path columns stay
+empty; re-ingesting those links fills them in.
+
+Usage:
+    python migrate_store.py                      # data/links_store_v2.csv + legacy stores
+    python migrate_store.py old.csv --output new.csv --batch-size 2000
+"""
+import argparse
+import json
+import os
+import typing as T
+
+import pandas as pd
+
+import core
+
+LEGACY_SOURCES = ["data/links_store.csv", "links_store.csv"]
+
+
+def _upgrade_chunk(chunk: pd.DataFrame) -> pd.DataFrame:
+    """Bring one raw CSV chunk to COLUMNS, with list cells still serialized."""
+    if "categories" in chunk.columns or "tags" in chunk.columns:
+        legacy = chunk.reindex(columns=["categories", "tags"])
+        core.decode_json_columns(legacy, ["categories", "tags"])
+        first_cat = legacy["categories"].map(lambda c: c[0] if isinstance(c, list) and c else None)
+        tags = legacy["tags"].map(lambda t: json.dumps(t, ensure_ascii=False) if isinstance(t, list) else "[]")
+        l1 = chunk["L1"] if "L1" in chunk.columns else pd.Series(None, index=chunk.index, dtype=object)
+        chunk["L1"] = l1.where(l1.notna(), first_cat)
+        if "L3" in chunk.columns:
+            chunk["L3"] = chunk["L3"].where(chunk["L3"].notna() & (chunk["L3"] != "[]"), tags)
+        else:
+            chunk["L3"] = tags
+    out = chunk.reindex(columns=core.COLUMNS).astype(object)
+    for col in core.JSON_COLUMNS:
+        out[col] = out[col].where(out[col].notna(), "[]")
+    out["url_canonical"] = core.canonicalize_urls(out["url"])
+    return out
+
+
+def migrate(
+    sources: T.Optional[T.List[str]] = None,
+    output: str = core.CSV_PATH,
+    batch_size: int = core.ITER_BATCH_SIZE,
+) -> T.Dict[str, T.Dict[str, int]]:
+    """
+    Merge sources into output; returns per-source {"read", "written",
+    "duplicates", "no_url"} counts. Raises StoreConflictError if output
+    is written by someone else while the migration runs.
+    """
+    if sources is None:
+        sources = [output] + [p for p in LEGACY_SOURCES if os.path.abspath(p) != os.path.abspath(output)]
+    sources = [p for p in sources if os.path.exists(p)]
+    expected_version = core.store_version(output)
+    stats: T.Dict[str, T.Dict[str, int]] = {}
+
+    def write(f) -> None:
+        seen: T.Set[str] = set()
+        header = True
+        stats.clear()
+        for src in sources:
+            counts = stats.setdefault(src, {"read": 0, "written": 0, "duplicates": 0, "no_url": 0})
+            with open(src, newline="", encoding="utf-8") as fin:
+                for chunk in pd.read_csv(fin, chunksize=batch_size, dtype=str):
+                    counts["read"] += len(chunk)
+                    rows = _upgrade_chunk(chunk)
+                    canon = rows["url_canonical"]
+                    has_url = canon.notna()
+                    keep = has_url & ~canon.isin(seen) & ~canon.duplicated()
+                    counts["no_url"] += int((~has_url).sum())
+                    counts["duplicates"] += int((has_url & ~keep).sum())
+                    rows = rows[keep]
+                    seen.update(rows["url_canonical"])
+                    core._serialize_frame(rows).to_csv(f, header=header, index=False)
+                    header = False
+                    counts["written"] += len(rows)
+        if header:
+            core.init_store().to_csv(f, index=False)
+
+    core._commit_store(output, write, expected_version)
+    return stats
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Migrate links stores to the v2 schema")
+    parser.add_argument("sources", nargs="*", help="source CSVs in priority order (default: output + legacy stores)")
+    parser.add_argument("--output", default=core.CSV_PATH)
+    parser.add_argument("--batch-size", type=int, default=core.ITER_BATCH_SIZE)
+    args = parser.parse_args()
+
+    stats = migrate(args.sources or None, args.output, args.batch_size)
+    for src, counts in stats.items():
+        print(f"📦 {src}: read {counts['read']}, written {counts['written']}, "
+              f"duplicates {counts['duplicates']}, without url {counts['no_url']}")
+    print(f"✅ {args.output} at version {core.store_version(args.output)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+"""
+"Related articles" over L1–L6 tags and knowledge_paths (roadmap phase 3).
+
+Each article becomes a feature set: its L1..L6 tags (prefixed by level) plus
+the consecutive steps of its knowledge_paths. A MinHash signature of
+N_BANDS × ROWS_PER_BAND uint32 hashes estimates Jaccard similarity between
+two sets as the fraction of equal positions. LSH banding buckets every
+band of every signature; articles sharing at least one bucket with the query
+are the only candidates scored, so a lookup costs O(bucket sizes) instead of
+a pass over the store. With b bands of r rows, a pair of similarity s becomes
+a candidate with probability 1 - (1 - s^r)^b: more bands / fewer rows raises
+recall, fewer bands / more rows raises precision (and min_similarity cuts
+the scored list). As a StoreIndex the recommender is persisted next to the
+store and extended on every ingest.
+
+Persistence: signatures (uint32, n × n_perm) and band keys (uint64,
+n × bands) are raw arrays next to <store>.related.index.pkl, read through
+np.memmap and grown by appending (store_index.RowFile), so an ingest writes
+one row to each and the pickle holds only the hash parameters. The buckets
+are per-band sorted key arrays built in memory from the band keys on the
+first lookup; rows appended since are scanned directly until they make up
+a quarter of the store, then the tables are rebuilt.
+"""
+import zlib
+import typing as T
+
+import numpy as np
+import pandas as pd
+
+from store_index import RowFile, StoreIndex
+
+LEVELS = ["L1", "L2", "L3", "L4", "L5", "L6"]
+N_BANDS = 16
+ROWS_PER_BAND = 4
+_PRIME = (1 << 31) - 1
+_SEED = 20240601
+_BATCH = 4096
+_NO_FEATURES = np.iinfo(np.uint32).max  # every position of an empty set's signature
+
+
+def article_features(row: T.Dict[str, T.Any]) -> T.Set[str]:
+    """Level-prefixed tags plus knowledge-path steps of one article."""
+    features: T.Set[str] = set()
+    for level in LEVELS:
+        value = row.get(level)
+        tags = value if isinstance(value, list) else [value]
+        features.update(f"{level}:{t}" for t in tags if isinstance(t, str) and t)
+    for path in row.get("knowledge_paths") or []:
+        if isinstance(path, list):
+            steps = [t for t in path if isinstance(t, str)]
+            features.update(f"P:{a}>{b}" for a, b in zip(steps, steps[1:]))
+    return features
+
+
+class RelatedArticles(StoreIndex):
+    name = "related"
+
+    def __init__(self, bands: int = N_BANDS, rows_per_band: int = ROWS_PER_BAND):
+        super().__init__()
+        self.bands, self.rows_per_band = bands, rows_per_band
+        n_perm = bands * rows_per_band
+        rng = np.random.default_rng(_SEED)
+        self._a = rng.integers(1, _PRIME, n_perm, dtype=np.uint64)
+        self._b = rng.integers(0, _PRIME, n_perm, dtype=np.uint64)
+        self._band_mult = rng.integers(1, 1 << 61, rows_per_band, dtype=np.uint64) | np.uint64(1)
+        self._detach()
+
+    def _detach(self) -> None:
+        self._signature_file: T.Optional[RowFile] = None
+        self._band_file: T.Optional[RowFile] = None
+        self.signatures = np.zeros((0, len(self._a)), dtype=np.uint32)
+        self.band_keys = np.zeros((0, self.bands), dtype=np.uint64)
+        self._tables: T.Optional[T.Tuple[int, np.ndarray, np.ndarray]] = None
+
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        for key in ("_signature_file", "_band_file", "signatures", "band_keys", "_tables"):
+            state.pop(key)
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self._detach()
+
+    def attach(self, index_file: str) -> None:
+        base = index_file[:-len(".pkl")]
+        self._signature_file = RowFile(base + ".signatures.u32", np.uint32, len(self._a))
+        self._band_file = RowFile(base + ".bands.u64", np.uint64, self.bands)
+        self._reopen()
+
+    def _reopen(self) -> None:
+        self.signatures = self._signature_file.read(self.n_rows)
+        self.band_keys = self._band_file.read(self.n_rows)
+
+    # ---- building ----
+    def signatures_for(self, feature_sets: T.Sequence[T.Set[str]]) -> np.ndarray:
+        """MinHash signatures (len(feature_sets) × n_perm uint32); empty sets get all-max rows."""
+        n_perm = len(self._a)
+        out = np.full((len(feature_sets), n_perm), _NO_FEATURES, dtype=np.uint32)
+        sizes = np.fromiter(map(len, feature_sets), dtype=np.int64, count=len(feature_sets))
+        nonempty = np.flatnonzero(sizes)
+        if not len(nonempty):
+            return out
+        x = np.fromiter((zlib.crc32(f.encode("utf-8")) for i in nonempty for f in feature_sets[i]),
+                        dtype=np.uint64, count=int(sizes.sum())) % np.uint64(_PRIME)
+        hashed = (self._a[:, None] * x[None, :] + self._b[:, None]) % np.uint64(_PRIME)
+        starts = np.concatenate([[0], np.cumsum(sizes[nonempty])[:-1]])
+        out[nonempty] = np.minimum.reduceat(hashed, starts, axis=1).T.astype(np.uint32)
+        return out
+
+    def _band_keys(self, signatures: np.ndarray) -> np.ndarray:
+        """(n × bands) uint64 keys, one per band of rows_per_band hashes."""
+        r = self.rows_per_band
+        sig = signatures.astype(np.uint64).reshape(len(signatures), self.bands, r)
+        return (sig * self._band_mult).sum(axis=2, dtype=np.uint64)
+
+    def _add_rows(self, df: pd.DataFrame, start: int) -> None:
+        cols = [c for c in LEVELS + ["knowledge_paths"] if c in df.columns]
+        tail = df.iloc[start:]
+        records = [dict(zip(cols, values)) for values in zip(*(tail[c].tolist() for c in cols))]
+        sigs = np.concatenate([self.signatures_for([article_features(r) for r in records[lo:lo + _BATCH]])
+                               for lo in range(0, len(records), _BATCH)])
+        keys = self._band_keys(sigs)
+        if self._signature_file is not None:
+            self._signature_file.append(sigs, start)
+            self._band_file.append(keys, start)
+            self.n_rows = len(df)
+            self._reopen()
+        else:
+            self.signatures = np.concatenate([self.signatures, sigs])
+            self.band_keys = np.concatenate([self.band_keys, keys])
+
+    # ---- queries ----
+    def has_features(self, article: int) -> bool:
+        return bool(self.signatures[article, 0] != _NO_FEATURES)
+
+    def _bucket_tables(self) -> T.Tuple[int, np.ndarray, np.ndarray]:
+        """
+        (covered, keys, rows): for each band, the band keys of the first covered
+        articles (those with features) sorted, and their article ids in that order.
+        """
+        n = len(self.signatures)
+        if self._tables is None or n - self._tables[0] > max(_BATCH, self._tables[0] // 4):
+            rows = np.flatnonzero(np.asarray(self.signatures[:, 0]) != _NO_FEATURES)
+            keys = np.asarray(self.band_keys)[rows].T               # bands × articles
+            order = np.argsort(keys, axis=1, kind="stable")
+            self._tables = (n, np.take_along_axis(keys, order, axis=1), rows[order].astype(np.int32))
+        return self._tables
+
+    def candidates(self, signature: np.ndarray) -> np.ndarray:
+        """Articles sharing at least one LSH bucket with signature."""
+        keys = self._band_keys(signature[None, :])[0]
+        covered, sorted_keys, sorted_rows = self._bucket_tables()
+        found = []
+        for band, key in enumerate(keys):
+            lo, hi = (np.searchsorted(sorted_keys[band], key, side) for side in ("left", "right"))
+            found.append(sorted_rows[band, lo:hi])
+        recent = np.asarray(self.band_keys[covered:])
+        if len(recent):
+            hit = (recent == keys[None, :]).any(axis=1) & (np.asarray(self.signatures[covered:, 0]) != _NO_FEATURES)
+            found.append(np.flatnonzero(hit) + covered)
+        return np.unique(np.concatenate(found).astype(np.int64))
+
+    def similar(self, signature: np.ndarray, k: int = 10, min_similarity: float = 0.0,
+                exclude: T.Optional[int] = None) -> T.List[T.Tuple[int, float]]:
+        """(article id, estimated Jaccard), best first, among the LSH candidates."""
+        cand = self.candidates(signature)
+        if exclude is not None:
+            cand = cand[cand != exclude]
+        if not len(cand):
+            return []
+        sim = (self.signatures[cand] == signature[None, :]).mean(axis=1)
+        keep = sim >= min_similarity
+        cand, sim = cand[keep], sim[keep]
+        order = np.lexsort((cand, -sim))[:k]
+        return [(int(cand[i]), float(sim[i])) for i in order]
+
+    def related(self, article: int, k: int = 10, min_similarity: float = 0.0) -> T.List[T.Tuple[int, float]]:
+        """Top-k articles related to an indexed article (row position)."""
+        if article >= len(self.signatures) or not self.has_features(article):
+            return []
+        return self.similar(self.signatures[article], k, min_similarity, exclude=article)
+
+    def related_to(self, record: T.Dict[str, T.Any], k: int = 10, min_similarity: float = 0.0) -> T.List[T.Tuple[int, float]]:
+        """Top-k articles related to a record that need not be in the store."""
+        features = article_features(record)
+        return self.similar(self.signatures_for([features])[0], k, min_similarity) if features else []
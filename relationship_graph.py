@@ -0,0 +1,202 @@
+"""
+Store-wide L3→L4→L5→L6 relationship graph.
+
+process_sequential_paths_with_relationships derives L3→L4, L4→L5 and L5→L6
+edges for one article; this aggregates them over every article in the store.
+Nodes are (level, tag) pairs interned to integer ids; edges live in CSR
+arrays (indptr / indices / weights, sorted by source then target), where an
+edge's weight is the number of articles whose paths contain it and a node's
+weight the number of articles whose paths mention it. New articles merge
+their edges into the sorted arrays (existing edges get +1, new ones are
+inserted), so an ingest never rebuilds the graph. Walking "everything under
+Machine Learning → Model Deployment" is a few vectorized frontier expansions.
+
+Because edges are aggregated, a walk follows every article's continuation of
+a node, not only continuations seen after the exact path that led there.
+"""
+import typing as T
+
+import numpy as np
+import pandas as pd
+
+from store_index import StoreIndex
+
+LEVELS = ["L3", "L4", "L5", "L6"]
+_DST_BITS = 32
+_DST_MASK = (1 << _DST_BITS) - 1
+
+
+class RelationshipGraph(StoreIndex):
+    name = "graph"
+
+    def __init__(self):
+        super().__init__()
+        self.node_ids: T.Dict[T.Tuple[int, str], int] = {}
+        self.node_level: T.List[int] = []      # 0 = L3 ... 3 = L6
+        self.node_label: T.List[str] = []
+        self.node_weight: T.List[int] = []
+        self.keys = np.empty(0, dtype=np.int64)      # src << 32 | dst, sorted
+        self.weights = np.empty(0, dtype=np.int64)
+        self._compile()
+
+    # ---- building ----
+    def _node(self, level: int, label: str) -> int:
+        node = self.node_ids.get((level, label))
+        if node is None:
+            node = self.node_ids[(level, label)] = len(self.node_label)
+            self.node_level.append(level)
+            self.node_label.append(label)
+            self.node_weight.append(0)
+        return node
+
+    def _article(self, paths: T.Any, node: T.Callable[[int, str], T.Optional[int]]) -> T.Tuple[T.Set[int], T.Set[int]]:
+        """(node ids, distinct edge keys) of one article's paths; node(level, tag) gives the ids."""
+        nodes: T.Set[int] = set()
+        keys: T.Set[int] = set()
+        for path in paths if isinstance(paths, list) else []:
+            if not isinstance(path, list):
+                continue
+            prev = -1
+            for level, tag in enumerate(path[:len(LEVELS)]):
+                if not isinstance(tag, str) or not tag:
+                    break
+                cur = node(level, tag)
+                if cur is None:
+                    break
+                nodes.add(cur)
+                if prev >= 0:
+                    keys.add(prev << _DST_BITS | cur)
+                prev = cur
+        return nodes, keys
+
+    def _article_edges(self, paths: T.Any, edges: T.List[int]) -> T.Set[int]:
+        """Append one article's distinct edge keys to edges, count its nodes and return them."""
+        nodes, keys = self._article(paths, self._node)
+        for node in nodes:
+            self.node_weight[node] += 1
+        edges.extend(keys)
+        return nodes
+
+    def article_edges(self, paths: T.Any) -> T.Tuple[T.Set[int], T.Set[int]]:
+        """(node ids, edge keys) of an already indexed article's paths; the graph is left unchanged."""
+        return self._article(paths, lambda level, tag: self.node_ids.get((level, tag)))
+
+    def _add_rows(self, df: pd.DataFrame, start: int) -> None:
+        edges: T.List[int] = []
+        for paths in df["sequential_paths"].iloc[start:].tolist():
+            self._article_edges(paths, edges)
+        self.add_edges(np.asarray(edges, dtype=np.int64))
+
+    def add_edges(self, keys: np.ndarray) -> None:
+        """Merge edge keys (one per article occurrence) into the sorted CSR arrays."""
+        if not len(keys):
+            self._compile()
+            return
+        new, counts = np.unique(keys, return_counts=True)
+        pos = np.searchsorted(self.keys, new)
+        known = pos < len(self.keys)
+        known[known] = self.keys[pos[known]] == new[known]
+        np.add.at(self.weights, pos[known], counts[known])
+        fresh = ~known
+        self.keys = np.insert(self.keys, pos[fresh], new[fresh])
+        self.weights = np.insert(self.weights, pos[fresh], counts[fresh])
+        self._compile()
+
+    def _compile(self) -> None:
+        n = len(self.node_label)
+        src = self.keys >> _DST_BITS
+        self.indptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(src, minlength=n), out=self.indptr[1:])
+        self.indices = (self.keys & _DST_MASK).astype(np.int32)
+        self._reverse: T.Optional[T.Tuple[np.ndarray, np.ndarray, np.ndarray]] = None
+
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        state["_reverse"] = None
+        return state
+
+    # ---- queries ----
+    @property
+    def n_nodes(self) -> int:
+        return len(self.node_label)
+
+    @property
+    def n_edges(self) -> int:
+        return len(self.keys)
+
+    def node(self, level: str, label: str) -> T.Optional[int]:
+        return self.node_ids.get((LEVELS.index(level), label))
+
+    def describe(self, node: int) -> T.Tuple[str, str]:
+        return LEVELS[self.node_level[node]], self.node_label[node]
+
+    def children(self, node: int) -> T.List[T.Tuple[str, int]]:
+        """(child tag, edge weight), heaviest first."""
+        lo, hi = self.indptr[node], self.indptr[node + 1]
+        pairs = zip(self.indices[lo:hi].tolist(), self.weights[lo:hi].tolist())
+        return sorted(((self.node_label[c], w) for c, w in pairs), key=lambda cw: (-cw[1], cw[0]))
+
+    def parents(self, node: int) -> T.List[T.Tuple[str, int]]:
+        """(parent tag, edge weight), heaviest first."""
+        if self._reverse is None:
+            order = np.argsort(self.indices, kind="stable")
+            rptr = np.zeros(self.n_nodes + 1, dtype=np.int64)
+            np.cumsum(np.bincount(self.indices, minlength=self.n_nodes), out=rptr[1:])
+            self._reverse = (rptr, (self.keys[order] >> _DST_BITS).astype(np.int32), self.weights[order])
+        rptr, rsrc, rw = self._reverse
+        lo, hi = rptr[node], rptr[node + 1]
+        pairs = zip(rsrc[lo:hi].tolist(), rw[lo:hi].tolist())
+        return sorted(((self.node_label[p], w) for p, w in pairs), key=lambda pw: (-pw[1], pw[0]))
+
+    def out_edges(self, nodes: np.ndarray) -> T.Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """(source, target, weight) of every edge leaving nodes, gathered from the CSR slices in one go."""
+        nodes = np.asarray(nodes, dtype=np.int64)
+        starts, stops = self.indptr[nodes], self.indptr[nodes + 1]
+        lens = stops - starts
+        offsets = np.repeat(starts - np.cumsum(lens) + lens, lens) + np.arange(lens.sum())
+        return np.repeat(nodes, lens), self.indices[offsets].astype(np.int64), self.weights[offsets]
+
+    def resolve(self, path: T.Sequence[str]) -> T.Optional[int]:
+        """Node reached by [L3, L4, ...] along existing edges, None if the chain is broken."""
+        if not path:
+            return None
+        node = self.node("L3", path[0])
+        for level, label in enumerate(path[1:], start=1):
+            if node is None:
+                return None
+            child = self.node(LEVELS[level], label)
+            lo, hi = self.indptr[node], self.indptr[node + 1]
+            if child is None or child not in self.indices[lo:hi]:
+                return None
+            node = child
+        return node
+
+    def descendants(self, path: T.Sequence[str]) -> T.Dict[str, T.Dict[str, int]]:
+        """
+        Everything under a path: {level: {tag: weight}} for each deeper level,
+        weight = summed weight of the edges reaching the tag from the level above.
+        """
+        node = self.resolve(path)
+        out: T.Dict[str, T.Dict[str, int]] = {}
+        if node is None:
+            return out
+        frontier = np.array([node], dtype=np.int64)
+        level = self.node_level[node]
+        while len(frontier) and level + 1 < len(LEVELS):
+            _, targets, weights = self.out_edges(frontier)
+            if not len(targets):
+                break
+            frontier, inverse = np.unique(targets, return_inverse=True)
+            summed = np.bincount(inverse, weights=weights).astype(np.int64)
+            level += 1
+            out[LEVELS[level]] = {self.node_label[n]: int(w) for n, w in zip(frontier.tolist(), summed.tolist())}
+        return out
+
+    def relationships(self) -> T.Dict[str, T.Dict[str, T.List[str]]]:
+        """Store-wide map in the per-article format: {"L3_to_L4": {parent: [children]}, ...}."""
+        out: T.Dict[str, T.Dict[str, T.List[str]]] = {f"{a}_to_{b}": {} for a, b in zip(LEVELS, LEVELS[1:])}
+        for src, dst in zip((self.keys >> _DST_BITS).tolist(), self.indices.tolist()):
+            level = self.node_level[src]
+            key = f"{LEVELS[level]}_to_{LEVELS[level + 1]}"
+            out[key].setdefault(self.node_label[src], []).append(self.node_label[dst])
+        return {k: {p: sorted(c) for p, c in v.items()} for k, v in out.items()}
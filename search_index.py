@@ -0,0 +1,233 @@
+"""
+BM25 full-text search over headline, TL;DR and content_text.
+
+Layout on disk, next to the store's <store>.search.index.pkl:
+
+    <store>.search.index.segments/
+        <gen>.terms.pkl     term strings, term id = position
+        <gen>.ptr.npy       term id -> postings offset (CSR, int64)
+        <gen>.docs.npy      article ids per term, ascending (int32)
+        <gen>.tfs.npy       term frequency per posting (uint16)
+        <gen>.doclen.npy    token count per article (int32)
+
+The main segment's arrays are opened with np.load(mmap_mode="r"): a query
+reads only the posting slices of its terms, and article bodies are never
+kept in memory. Articles added since the last merge sit in a small delta
+(term id / article id / tf arrays inside the pickle, which core rewrites on
+every ingest); once it reaches DELTA_MAX_ARTICLES it is merged into a new
+main segment generation, like the taxonomy journal is folded into
+taxonomy.json. The previous generation's files are kept one merge longer so
+readers still holding it keep working.
+
+Tokens: lowercase [a-z0-9] words of 2+ characters minus a few stopwords;
+headline tokens count HEADLINE_WEIGHT times, TL;DR tokens TLDR_WEIGHT times.
+"""
+import os
+import re
+import pickle
+import typing as T
+from itertools import chain
+
+import numpy as np
+import pandas as pd
+
+from store_index import StoreIndex
+
+K1 = 1.2
+B = 0.75
+HEADLINE_WEIGHT = 3
+TLDR_WEIGHT = 2
+DELTA_MAX_ARTICLES = int(os.getenv("SEARCH_DELTA_MAX_ARTICLES", "256"))
+BUILD_BATCH = 1000
+_TOKEN_RE = re.compile(r"[a-z0-9]{2,}")
+STOPWORDS = frozenset(
+    "an and are as at be but by for from has have in into is it its of on or that the this to was were will with".split()
+)
+_GEN_RE = re.compile(r"^(\d+)\.")
+
+
+def tokenize(text: T.Any) -> T.List[str]:
+    return [t for t in _words(text) if t not in STOPWORDS]
+
+
+def _words(text: T.Any) -> T.List[str]:
+    return _TOKEN_RE.findall(text.lower()) if isinstance(text, str) else []
+
+
+def _document_words(headline: T.Any, tldr: T.Any, content: T.Any) -> T.List[str]:
+    """Weighted words of one article, stopwords included (dropped per batch by term)."""
+    summary = " ".join(t for t in tldr if isinstance(t, str)) if isinstance(tldr, list) else tldr
+    return _words(headline) * HEADLINE_WEIGHT + _words(summary) * TLDR_WEIGHT + _words(content)
+
+
+def _document_tokens(headline: T.Any, tldr: T.Any, content: T.Any) -> T.List[str]:
+    return [t for t in _document_words(headline, tldr, content) if t not in STOPWORDS]
+
+
+class SearchIndex(StoreIndex):
+    name = "search"
+    uses_tags = False  # headline, TL;DR and body only
+
+    def __init__(self):
+        super().__init__()
+        self.gen = 0                 # main segment generation (0 = none yet)
+        self.main_docs = 0           # articles 0..main_docs-1 are in the main segment
+        self.main_terms = 0          # term ids below this exist in the main segment
+        self.new_terms: T.Dict[str, int] = {}      # terms first seen in the delta
+        self.delta_term = np.empty(0, dtype=np.int32)
+        self.delta_doc = np.empty(0, dtype=np.int32)
+        self.delta_tf = np.empty(0, dtype=np.int32)
+        self.delta_len: T.List[int] = []
+        self.total_len = 0
+        self._detach()
+
+    def _detach(self) -> None:
+        self.directory: T.Optional[str] = None
+        self._vocab: T.Dict[str, int] = {}
+        self._ptr = self._docs = self._tfs = self._doclen = None
+
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        for key in ("directory", "_vocab", "_ptr", "_docs", "_tfs", "_doclen"):
+            state.pop(key)
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self._detach()
+
+    # ---- segment files ----
+    def attach(self, index_file: str) -> None:
+        self.directory = index_file[:-len(".pkl")] + ".segments"
+        self._open_main()
+
+    def _file(self, gen: int, part: str) -> str:
+        return os.path.join(self.directory, f"{gen}.{part}")
+
+    def _open_main(self) -> None:
+        if not self.gen:
+            return
+        with open(self._file(self.gen, "terms.pkl"), "rb") as f:
+            terms = pickle.load(f)
+        self._vocab = {t: i for i, t in enumerate(terms)}
+        self._ptr = np.load(self._file(self.gen, "ptr.npy"), mmap_mode="r")
+        self._docs = np.load(self._file(self.gen, "docs.npy"), mmap_mode="r")
+        self._tfs = np.load(self._file(self.gen, "tfs.npy"), mmap_mode="r")
+        self._doclen = np.load(self._file(self.gen, "doclen.npy"), mmap_mode="r")
+
+    def _merge(self, n_docs: int) -> None:
+        """Fold the delta (articles main_docs..n_docs-1) into a new main segment generation."""
+        os.makedirs(self.directory, exist_ok=True)
+        existing = [int(m.group(1)) for m in map(_GEN_RE.match, os.listdir(self.directory)) if m]
+        gen = max(existing + [self.gen]) + 1
+        n_terms = self.main_terms + len(self.new_terms)
+        if self.gen:
+            main_term = np.repeat(np.arange(self.main_terms, dtype=np.int32), np.diff(np.asarray(self._ptr)))
+            term = np.concatenate([main_term, self.delta_term])
+            doc = np.concatenate([np.asarray(self._docs), self.delta_doc])
+            tf = np.concatenate([np.asarray(self._tfs, dtype=np.int32), self.delta_tf])
+            doclen = np.concatenate([np.asarray(self._doclen), np.asarray(self.delta_len, dtype=np.int32)])
+            terms = sorted(self._vocab, key=self._vocab.get)
+        else:
+            term, doc, tf = self.delta_term, self.delta_doc, self.delta_tf
+            doclen = np.asarray(self.delta_len, dtype=np.int32)
+            terms = []
+        terms += sorted(self.new_terms, key=self.new_terms.get)
+        order = np.lexsort((doc, term))
+        ptr = np.zeros(n_terms + 1, dtype=np.int64)
+        np.cumsum(np.bincount(term, minlength=n_terms), out=ptr[1:])
+        with open(self._file(gen, "terms.pkl") + ".tmp", "wb") as f:
+            pickle.dump(terms, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(self._file(gen, "terms.pkl") + ".tmp", self._file(gen, "terms.pkl"))
+        for part, arr in (("ptr", ptr), ("docs", doc[order].astype(np.int32)),
+                          ("tfs", np.minimum(tf[order], np.iinfo(np.uint16).max).astype(np.uint16)),
+                          ("doclen", doclen.astype(np.int32))):
+            np.save(self._file(gen, f"{part}.npy"), arr)
+        for name in os.listdir(self.directory):  # keep the previous generation for current readers
+            m = _GEN_RE.match(name)
+            if m and int(m.group(1)) < self.gen:
+                os.unlink(os.path.join(self.directory, name))
+        self.gen, self.main_docs, self.main_terms = gen, n_docs, n_terms
+        self.new_terms = {}
+        self.delta_term = self.delta_doc = self.delta_tf = np.empty(0, dtype=np.int32)
+        self.delta_len = []
+        self._open_main()
+
+    # ---- building ----
+    def _term_id(self, term: str) -> int:
+        tid = self._vocab.get(term)
+        if tid is None:
+            tid = self.new_terms.get(term)
+            if tid is None:
+                tid = self.new_terms[term] = self.main_terms + len(self.new_terms)
+        return tid
+
+    def _add_rows(self, df: pd.DataFrame, start: int) -> None:
+        cols = {c: df[c] if c in df.columns else pd.Series([None] * len(df)) for c in ("headline", "tldr", "content_text")}
+        terms, docs, tfs = [self.delta_term], [self.delta_doc], [self.delta_tf]
+        for lo in range(start, len(df), BUILD_BATCH):
+            hi = min(lo + BUILD_BATCH, len(df))
+            # one batch of bodies decoded at a time
+            words = [_document_words(h, s, c) for h, s, c in zip(
+                cols["headline"].iloc[lo:hi].tolist(), cols["tldr"].iloc[lo:hi].tolist(),
+                cols["content_text"].iloc[lo:hi].tolist())]
+            counts = np.fromiter(map(len, words), dtype=np.int64, count=len(words))
+            codes, uniques = pd.factorize(np.fromiter(chain.from_iterable(words), dtype=object, count=int(counts.sum())))
+            doc = np.repeat(np.arange(lo, hi, dtype=np.int64), counts)
+            stop = np.fromiter((u in STOPWORDS for u in uniques), dtype=bool, count=len(uniques))
+            keep = ~stop[codes]
+            codes, doc = codes[keep], doc[keep]
+            lens = np.bincount(doc - lo, minlength=hi - lo)
+            self.delta_len.extend(lens.tolist())
+            self.total_len += int(lens.sum())
+            if not len(codes):
+                continue
+            ids = np.fromiter((-1 if s else self._term_id(u) for u, s in zip(uniques, stop.tolist())),
+                              dtype=np.int64, count=len(uniques))[codes]
+            pair, tf = np.unique(ids * (len(df) + 1) + doc, return_counts=True)
+            terms.append((pair // (len(df) + 1)).astype(np.int32))
+            docs.append((pair % (len(df) + 1)).astype(np.int32))
+            tfs.append(tf.astype(np.int32))
+        self.delta_term, self.delta_doc, self.delta_tf = np.concatenate(terms), np.concatenate(docs), np.concatenate(tfs)
+        if self.directory is not None and len(df) - self.main_docs >= DELTA_MAX_ARTICLES:
+            self._merge(len(df))
+
+    # ---- queries ----
+    def _postings(self, term: str) -> T.Tuple[np.ndarray, np.ndarray]:
+        tid = self._vocab.get(term, self.new_terms.get(term))
+        if tid is None:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        parts_doc, parts_tf = [], []
+        if tid < self.main_terms and self._ptr is not None:
+            lo, hi = int(self._ptr[tid]), int(self._ptr[tid + 1])
+            parts_doc.append(np.asarray(self._docs[lo:hi], dtype=np.int64))
+            parts_tf.append(np.asarray(self._tfs[lo:hi], dtype=np.float32))
+        hit = self.delta_term == tid
+        parts_doc.append(self.delta_doc[hit].astype(np.int64))
+        parts_tf.append(self.delta_tf[hit].astype(np.float32))
+        return np.concatenate(parts_doc), np.concatenate(parts_tf)
+
+    def doc_lengths(self) -> np.ndarray:
+        main = np.asarray(self._doclen, dtype=np.float32) if self._doclen is not None else np.empty(0, np.float32)
+        return np.concatenate([main[:self.main_docs], np.asarray(self.delta_len, dtype=np.float32)])
+
+    def search(self, query: str, k: int = 10) -> T.List[T.Tuple[int, float]]:
+        """(article id, BM25 score) of the k best matches, best first."""
+        terms = list(dict.fromkeys(tokenize(query)))
+        n = self.n_rows
+        if not terms or not n:
+            return []
+        doclen = self.doc_lengths()
+        norm = K1 * (1 - B + B * doclen / max(self.total_len / n, 1e-9))
+        scores = np.zeros(n, dtype=np.float32)
+        for term in terms:
+            docs, tf = self._postings(term)
+            if not len(docs):
+                continue
+            idf = np.log1p((n - len(docs) + 0.5) / (len(docs) + 0.5))
+            scores[docs] += idf * tf * (K1 + 1) / (tf + norm[docs])
+        hits = np.flatnonzero(scores)
+        if len(hits) > k:
+            hits = hits[np.argpartition(-scores[hits], k - 1)[:k]]
+        hits = hits[np.lexsort((hits, -scores[hits]))]
+        return [(int(d), float(scores[d])) for d in hits]
@@ -0,0 +1,284 @@
+"""
+Local "more like this" search: hashed n-gram vectors plus an IVF index.
+
+Vectorizer (no external embedding service): content_text and the TL;DR are
+tokenized like the BM25 index (search_index), and every unigram and bigram is
+hashed (crc32) into a 64-bit feature. Each feature adds ±(1 + log tf) to
+PROJECTION_NNZ of DIMS dimensions chosen by its hash: a sparse random
+projection of the (unbounded) hashed n-gram space, so nothing is fitted and
+a vector never changes once written. Vectors are L2-normalized and compared
+by dot product (cosine). Optionally (SEMANTIC_SVD_DIMS > 0) the projected
+vectors are further reduced by a truncated SVD fitted once the store holds
+SVD_FIT_ARTICLES articles; earlier vectors are rewritten in the reduced space.
+
+ANN: an IVF partitioning. Spherical k-means over the vectors gives ~sqrt(n)
+centroids (trained at IVF_MIN_ARTICLES and retrained whenever the store has
+grown IVF_RETRAIN_GROWTH times since); each article is assigned to its
+nearest centroid. A query scores only the articles of its n_probe nearest
+lists, read from per-list row arrays (CSR offsets by list, built in memory
+and grown as articles are assigned); below IVF_MIN_ARTICLES every article
+is scored exactly.
+
+Persistence: vectors (float32, n × dims) and list assignments (int32) are
+raw arrays next to the store's <store>.semantic.index.pkl, read through
+np.memmap and grown by appending, so an ingest writes one row to each and a
+query touches only the candidate rows. Rewrites (retraining, SVD) go
+through a temp file + os.replace so readers mapping the old file are safe.
+"""
+import os
+import zlib
+import typing as T
+from itertools import chain
+
+import numpy as np
+import pandas as pd
+
+from search_index import STOPWORDS, _words
+from store_index import RowFile, StoreIndex
+
+DIMS = 256
+PROJECTION_NNZ = 4
+SVD_DIMS = int(os.getenv("SEMANTIC_SVD_DIMS", "0"))
+SVD_FIT_ARTICLES = 2000
+IVF_MIN_ARTICLES = 2000
+IVF_RETRAIN_GROWTH = 4
+IVF_MAX_LISTS = 1024
+KMEANS_SAMPLE = 20_000
+KMEANS_ITERATIONS = 8
+N_PROBE = 8
+_BATCH = 1000
+_SEED = 20240601
+_GOLDEN = np.uint64(0x9E3779B97F4A7C15)
+# one seed per projected dimension of a feature
+_SEEDS = [np.uint64(((s + 1) * 0x9E3779B97F4A7C15) & 0xFFFFFFFFFFFFFFFF) for s in range(PROJECTION_NNZ)]
+
+
+def _mix(x: np.ndarray, seed: np.uint64) -> np.ndarray:
+    """splitmix64 finalizer: independent-looking 64-bit hashes of x per seed."""
+    x = x + seed
+    x = (x ^ (x >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    x = (x ^ (x >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return x ^ (x >> np.uint64(31))
+
+
+def article_text(tldr: T.Any, content: T.Any) -> T.List[str]:
+    summary = " ".join(t for t in tldr if isinstance(t, str)) if isinstance(tldr, list) else tldr
+    return _words(summary) + _words(content)
+
+
+def hash_vectors(word_lists: T.Sequence[T.List[str]], dims: int = DIMS) -> np.ndarray:
+    """L2-normalized (len(word_lists) × dims) float32 vectors of hashed unigrams + bigrams."""
+    n = len(word_lists)
+    out = np.zeros(n * dims, dtype=np.float64)
+    counts = np.fromiter(map(len, word_lists), dtype=np.int64, count=n)
+    codes, uniques = pd.factorize(np.fromiter(chain.from_iterable(word_lists), dtype=object, count=int(counts.sum())))
+    doc = np.repeat(np.arange(n, dtype=np.int64), counts)
+    keep = ~np.fromiter((u in STOPWORDS for u in uniques), dtype=bool, count=len(uniques))[codes]
+    codes, doc = codes[keep], doc[keep]
+    if len(codes):
+        unigram = np.fromiter((zlib.crc32(u.encode("utf-8")) for u in uniques), dtype=np.uint64, count=len(uniques))
+        h = unigram[codes]
+        same = doc[1:] == doc[:-1]
+        bigram = (h[:-1][same] * _GOLDEN) ^ (h[1:][same] + np.uint64(1))
+        features = np.concatenate([h * _GOLDEN, bigram * _GOLDEN])
+        owners = np.concatenate([doc, doc[1:][same]])
+        (owner, feature), tf = _unique_pairs(owners, features)
+        weight = 1.0 + np.log(tf)
+        for seed in _SEEDS:
+            mixed = _mix(feature, seed)
+            dim = ((mixed >> np.uint64(32)) % np.uint64(dims)).astype(np.int64)
+            sign = np.where(mixed & np.uint64(1), 1.0, -1.0)
+            out += np.bincount(owner * dims + dim, weights=weight * sign, minlength=n * dims)
+    vectors = out.reshape(n, dims).astype(np.float32)
+    return _normalize(vectors)
+
+
+def _unique_pairs(owners: np.ndarray, features: np.ndarray) -> T.Tuple[T.Tuple[np.ndarray, np.ndarray], np.ndarray]:
+    order = np.lexsort((features, owners))
+    owners, features = owners[order], features[order]
+    start = np.ones(len(owners), dtype=bool)
+    start[1:] = (owners[1:] != owners[:-1]) | (features[1:] != features[:-1])
+    first = np.flatnonzero(start)
+    return (owners[first], features[first]), np.diff(np.append(first, len(owners)))
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return np.divide(vectors, norms, out=np.zeros_like(vectors), where=norms > 0)
+
+
+def _spherical_kmeans(vectors: np.ndarray, n_lists: int, rng: np.random.Generator) -> np.ndarray:
+    centroids = vectors[rng.choice(len(vectors), n_lists, replace=False)].copy()
+    for _ in range(KMEANS_ITERATIONS):
+        assign = np.argmax(vectors @ centroids.T, axis=1)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assign, vectors)
+        empty = ~sums.any(axis=1)
+        sums[empty] = centroids[empty]
+        centroids = _normalize(sums)
+    return centroids
+
+
+class SemanticIndex(StoreIndex):
+    name = "semantic"
+    uses_tags = False  # TL;DR and body only
+
+    def __init__(self, svd_dims: int = SVD_DIMS):
+        super().__init__()
+        self.svd_dims = svd_dims
+        self.components: T.Optional[np.ndarray] = None   # (svd_dims × DIMS) once fitted
+        self.centroids: T.Optional[np.ndarray] = None    # (n_lists × dims) once trained
+        self.trained_at = 0
+        self._detach()
+
+    @property
+    def dims(self) -> int:
+        return len(self.components) if self.components is not None else DIMS
+
+    def _detach(self) -> None:
+        self._vector_file: T.Optional[RowFile] = None
+        self._list_file: T.Optional[RowFile] = None
+        self.vectors = np.zeros((0, self.dims), dtype=np.float32)
+        self.lists = np.zeros(0, dtype=np.int32)
+        self._members: T.Optional[T.Tuple[int, int, np.ndarray, np.ndarray]] = None
+
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        for key in ("_vector_file", "_list_file", "vectors", "lists", "_members"):
+            state.pop(key)
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self._detach()
+
+    def attach(self, index_file: str) -> None:
+        base = index_file[:-len(".pkl")]
+        self._vector_file = RowFile(base + ".vectors.f32", np.float32, self.dims)
+        self._list_file = RowFile(base + ".lists.i32", np.int32, 1)
+        self._reopen()
+
+    def _reopen(self) -> None:
+        self.vectors = self._vector_file.read(self.n_rows)
+        self.lists = self._list_file.read(self.n_rows if self.centroids is not None else 0)[:, 0]
+
+    # ---- building ----
+    def _project(self, vectors: np.ndarray) -> np.ndarray:
+        return _normalize(vectors @ self.components.T) if self.components is not None else vectors
+
+    def _assign(self, vectors: np.ndarray) -> np.ndarray:
+        return np.argmax(vectors @ self.centroids.T, axis=1).astype(np.int32)
+
+    def _add_rows(self, df: pd.DataFrame, start: int) -> None:
+        cols = [df[c] if c in df.columns else pd.Series([None] * len(df)) for c in ("tldr", "content_text")]
+        parts = []
+        for lo in range(start, len(df), _BATCH):
+            hi = min(lo + _BATCH, len(df))
+            texts = [article_text(s, c) for s, c in zip(cols[0].iloc[lo:hi].tolist(), cols[1].iloc[lo:hi].tolist())]
+            parts.append(self._project(hash_vectors(texts)))
+        new = np.concatenate(parts)
+        lists = self._assign(new) if self.centroids is not None else None
+        if self._vector_file is not None:
+            self._vector_file.append(new, start)
+            if lists is not None:
+                self._list_file.append(lists[:, None], start)
+        else:
+            self.vectors = np.concatenate([self.vectors, new])
+            if lists is not None:
+                self.lists = np.concatenate([self.lists, lists])
+        n = len(df)
+        if self.svd_dims and self.components is None and n >= SVD_FIT_ARTICLES:
+            self._fit_svd(n)
+        if n >= IVF_MIN_ARTICLES and (self.centroids is None or n >= self.trained_at * IVF_RETRAIN_GROWTH):
+            self._train(n)
+        elif self._vector_file is not None:
+            self.n_rows = n
+            self._reopen()
+
+    def _rewrite(self, vectors: T.Optional[np.ndarray], lists: np.ndarray, n: int) -> None:
+        if self._vector_file is None:
+            if vectors is not None:
+                self.vectors = vectors
+            self.lists = lists
+            return
+        if vectors is not None:
+            self._vector_file.width = self.dims
+            self._vector_file.rewrite(vectors)
+        self._list_file.rewrite(lists[:, None])
+        self.n_rows = n
+        self._reopen()
+
+    def _current_vectors(self, n: int) -> np.ndarray:
+        return np.asarray(self._vector_file.read(n) if self._vector_file is not None else self.vectors)
+
+    def _fit_svd(self, n: int) -> None:
+        vectors = self._current_vectors(n)
+        rng = np.random.default_rng(_SEED)
+        sample = vectors[rng.choice(n, min(n, KMEANS_SAMPLE), replace=False)]
+        self.components = np.linalg.svd(sample, full_matrices=False)[2][:self.svd_dims].astype(np.float32)
+        self.centroids = None  # the IVF lists live in the old space
+        self._rewrite(self._project(vectors), np.zeros(0, dtype=np.int32), n)
+
+    def _train(self, n: int) -> None:
+        vectors = self._current_vectors(n)
+        rng = np.random.default_rng(_SEED)
+        sample = vectors[rng.choice(n, min(n, KMEANS_SAMPLE), replace=False)]
+        n_lists = int(min(IVF_MAX_LISTS, max(8, np.sqrt(n))))
+        self.centroids = _spherical_kmeans(sample, n_lists, rng)
+        self.trained_at = n
+        self._rewrite(None, np.concatenate([self._assign(vectors[i:i + 10_000]) for i in range(0, n, 10_000)]), n)
+
+    def _list_rows(self) -> T.Tuple[np.ndarray, np.ndarray]:
+        """
+        (list_ptr, list_rows): the rows of list l are list_rows[list_ptr[l]:list_ptr[l + 1]],
+        ascending. Kept per training; rows assigned since the last call are
+        added at the end of their lists.
+        """
+        n, n_lists = len(self.lists), len(self.centroids)
+        if self._members is None or self._members[0] != self.trained_at or self._members[1] > n:
+            self._members = (self.trained_at, 0, np.zeros(n_lists + 1, dtype=np.int64), np.zeros(0, dtype=np.int32))
+        _, covered, ptr, rows = self._members
+        if covered < n:
+            new = np.asarray(self.lists[covered:])
+            order = np.argsort(new, kind="stable")
+            rows = np.insert(rows, ptr[new[order] + 1], (covered + order).astype(np.int32))
+            ptr = ptr.copy()
+            ptr[1:] += np.cumsum(np.bincount(new, minlength=n_lists))
+            self._members = (self.trained_at, n, ptr, rows)
+        return ptr, rows
+
+    # ---- queries ----
+    def vectorize(self, text: str) -> np.ndarray:
+        return self._project(hash_vectors([_words(text)]))[0]
+
+    def nearest(self, vector: np.ndarray, k: int = 10, n_probe: int = N_PROBE,
+                exclude: T.Optional[int] = None) -> T.List[T.Tuple[int, float]]:
+        """(article id, cosine similarity), best first: exact below IVF_MIN_ARTICLES, else over n_probe lists."""
+        if not vector.any() or not len(self.vectors):
+            return []
+        if self.centroids is None:
+            cand = np.arange(len(self.vectors))
+        else:
+            probes = np.argsort(-(self.centroids @ vector))[:n_probe]
+            ptr, rows = self._list_rows()
+            cand = np.sort(np.concatenate([rows[ptr[p]:ptr[p + 1]] for p in probes]))
+        if exclude is not None:
+            cand = cand[cand != exclude]
+        sims = np.asarray(self.vectors[cand]) @ vector
+        keep = sims > 0
+        cand, sims = cand[keep], sims[keep]
+        if len(cand) > k:
+            top = np.argpartition(-sims, k - 1)[:k]
+            cand, sims = cand[top], sims[top]
+        order = np.lexsort((cand, -sims))
+        return [(int(cand[i]), float(sims[i])) for i in order]
+
+    def search(self, text: str, k: int = 10, n_probe: int = N_PROBE) -> T.List[T.Tuple[int, float]]:
+        """Articles closest to free text."""
+        return self.nearest(self.vectorize(text), k, n_probe)
+
+    def similar(self, article: int, k: int = 10, n_probe: int = N_PROBE) -> T.List[T.Tuple[int, float]]:
+        """Articles closest to an indexed article (row position), itself excluded."""
+        if article >= len(self.vectors):
+            return []
+        return self.nearest(np.asarray(self.vectors[article]), k, n_probe, exclude=article)
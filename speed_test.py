@@ -280,7 +280,304 @@ def speed_test():
 
     return True
 
+def _synthetic_store(n_rows: int):
+    """Serialized links-store frame shaped like data/links_store_v2.csv"""
+    import json
+    import pandas as pd
+
+    paths = [
+        ["Machine Learning", "Model Deployment", "Monitoring", "Alerts"],
+        ["Data Strategy", "Data Governance", "Privacy"],
+        ["Product Analytics", "Conversion"],
+    ]
+    base = {
+        "L3": json.dumps(["Machine Learning", "Data Strategy", "Product Analytics"]),
+        "L4": json.dumps(["Model Deployment", "Data Governance", "Conversion"]),
+        "L5": json.dumps(["Monitoring", "Privacy"]),
+        "L6": json.dumps(["Alerts"]),
+        "sequential_paths": json.dumps(paths),
+        "knowledge_paths": json.dumps([["Tech", "Product Management"] + p for p in paths]),
+        "tldr": json.dumps(["First takeaway of the article.", "Second takeaway.", "Third takeaway."]),
+    }
+    df = pd.DataFrame({col: [val] * n_rows for col, val in base.items()})
+    # ~10% empty cells, as in real stores
+    df.loc[df.index % 10 == 0, ["L6", "sequential_paths"]] = None
+    return df
+
+def _old_json_decode(df):
+    """Previous load_csv decoding: one Python-level apply per cell and per column"""
+    import json
+    import pandas as pd
+
+    for col in ["L3","L4","L5","L6","tldr","knowledge_paths"]:
+        df[col] = df[col].apply(lambda s: json.loads(s) if isinstance(s, str) and (s.startswith("[") or s.startswith("{")) else ([] if pd.isna(s) else s))
+    df["sequential_paths"] = df["sequential_paths"].apply(lambda s: json.loads(s) if isinstance(s, str) and s.startswith("[") else ([] if pd.isna(s) else s))
+    return df
+
+def json_decode_speed_test(sizes=(10_000, 100_000)) -> bool:
+    from core import decode_json_columns, JSON_COLUMNS, orjson
+
+    print()
+    print("🚀 load_csv JSON column decoding: per-cell apply vs bulk decoder")
+    print("=" * 50)
+    print(f"Parser: {'orjson' if orjson is not None else 'json (stdlib)'}")
+    ok = True
+    for n_rows in sizes:
+        src = _synthetic_store(n_rows)
+
+        start_time = time.time()
+        old_df = _old_json_decode(src.copy())
+        old_time = time.time() - start_time
+
+        start_time = time.time()
+        new_df = decode_json_columns(src.copy(), JSON_COLUMNS)
+        new_time = time.time() - start_time
+
+        same = all(old_df[c].tolist() == new_df[c].tolist() for c in JSON_COLUMNS)
+        ok = ok and same
+        print(f"   {n_rows:>7,} rows: old {old_time:.3f}s | bulk {new_time:.3f}s | "
+              f"⚡ {old_time/new_time:.1f}x | identical: {same}")
+    return ok
+
+def cold_start_speed_test(sizes=(10_000, 100_000)) -> bool:
+    import os
+    import tempfile
+    from pathlib import Path
+    import core
+
+    print()
+    print("🚀 load_csv cold start: CSV parse vs binary snapshot")
+    print("=" * 50)
+    ok = True
+    for n_rows in sizes:
+        df = _synthetic_store(n_rows)
+        df["url"] = [f"https://example.com/{i}" for i in range(n_rows)]
+        df["url_canonical"] = df["url"]
+        df["L1"], df["L2"] = "Tech", "Product Management"
+        df["content_text"] = "Body text of the article. " * 40
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "links.csv")
+            core.save_csv(df.reindex(columns=core.COLUMNS), path)
+
+            start_time = time.time()
+            parsed = core._parse_links_csv(Path(path).read_bytes())
+            parse_time = time.time() - start_time
+
+            start_time = time.time()
+            loaded = core.load_csv(path)
+            snap_time = time.time() - start_time
+
+            same = parsed["L3"].tolist() == loaded["L3"].tolist() and len(loaded) == n_rows
+            ok = ok and same
+            print(f"   {n_rows:>7,} rows: csv {parse_time:.3f}s | snapshot {snap_time:.3f}s | "
+                  f"⚡ {parse_time/snap_time:.1f}x | identical: {same}")
+    return ok
+
+def bulk_paths_speed_test(sizes=(10_000, 100_000)) -> bool:
+    import numpy as np
+    import pandas as pd
+    from core import process_sequential_paths_with_relationships, process_sequential_paths_bulk
+
+    print()
+    print("🚀 Whole-store path re-derivation: row-by-row vs bulk")
+    print("=" * 50)
+    rng = np.random.default_rng(0)
+    vocab = [f"Concept {i}" for i in range(5000)]
+    ok = True
+    for n_rows in sizes:
+        df = pd.DataFrame({
+            "L1": "Tech",
+            "L2": "Product Management",
+            "sequential_paths": [
+                [[vocab[j] for j in rng.integers(0, len(vocab), rng.integers(1, 5))] for _ in range(rng.integers(0, 4))]
+                for _ in range(n_rows)
+            ],
+        })
+
+        start_time = time.time()
+        rows = df.apply(lambda r: process_sequential_paths_with_relationships(r["L1"], r["L2"], r["sequential_paths"]), axis=1)
+        edges = {}
+        for rel in (r[5] for r in rows):
+            for key, level in rel.items():
+                for parent, children in level.items():
+                    for child in children:
+                        edges[(key, parent, child)] = edges.get((key, parent, child), 0) + 1
+        old_time = time.time() - start_time
+
+        start_time = time.time()
+        bulk = process_sequential_paths_bulk(df["L1"].tolist(), df["L2"].tolist(), df["sequential_paths"].tolist())
+        new_time = time.time() - start_time
+
+        keys = ["L3_to_L4", "L4_to_L5", "L5_to_L6"]
+        bulk_edges = {(keys[d], bulk.terms[a], bulk.terms[b]): w for d, a, b, w in zip(
+            bulk.edge_depth.tolist(), bulk.edge_src.tolist(), bulk.edge_dst.tolist(), bulk.edge_weight.tolist())}
+        same = bulk_edges == edges and all(
+            r[1:5] == (bulk.L3[i], bulk.L4[i], bulk.L5[i], bulk.L6[i]) and r[0] == bulk.knowledge_paths[i]
+            for i, r in enumerate(rows)
+        )
+        ok = ok and same
+        print(f"   {n_rows:>7,} articles: row-by-row {old_time:.3f}s | bulk {new_time:.3f}s | "
+              f"⚡ {old_time/new_time:.1f}x | identical: {same}")
+    return ok
+
+def tag_filter_speed_test(sizes=(10_000, 100_000)) -> bool:
+    from tag_index import TagIndex
+    from synthetic import tagged_articles, seconds_per_call
+
+    print()
+    print("🚀 Three-level tag filter: pandas isin/map vs interned postings")
+    print("=" * 50)
+    selection = {"L1": ["domain1", "domain4"], "L2": ["category3", "category8"], "L3": ["tag10", "tag20", "tag30"]}
+    ok = True
+    for n_rows in sizes:
+        df = tagged_articles(n_rows)
+        start_time = time.time()
+        index = TagIndex.build(df)
+        build_time = time.time() - start_time
+
+        start_time = time.time()
+        old_mask = (df["L1"].isin(selection["L1"]) & df["L2"].isin(selection["L2"])
+                    & df["L3"].map(lambda c: any(t in c for t in selection["L3"])))
+        old_time = time.time() - start_time
+
+        new_time = seconds_per_call(index.filter, [selection] * 50)
+        same = bool((index.filter(selection) == old_mask.to_numpy()).all())
+        ok = ok and same
+        print(f"   {n_rows:>7,} rows: pandas {old_time * 1000:.1f} ms | index {new_time * 1000:.3f} ms "
+              f"(build {build_time:.2f}s) | ⚡ {old_time/new_time:.0f}x | identical: {same}")
+    return ok
+
+def relationship_graph_speed_test(sizes=(10_000, 100_000)) -> bool:
+    import numpy as np
+    from relationship_graph import RelationshipGraph
+    from synthetic import path_articles, seconds_per_call
+
+    print()
+    print("🚀 Relationship graph: build, descendant walk, one-article merge")
+    print("=" * 50)
+    ok = True
+    for n_rows in sizes:
+        df = path_articles(n_rows, seed=2)
+        paths = df["sequential_paths"].tolist()
+        start_time = time.time()
+        graph = RelationshipGraph.build(df)
+        build_time = time.time() - start_time
+
+        top = graph.children(graph.node("L3", "a0"))[0][0]
+        walk_time = seconds_per_call(graph.descendants, [["a0", top]] * 100)
+        start_time = time.time()
+        graph.add_edges(np.array([graph.node("L3", "a0") << 32 | graph.node("L4", top)], dtype=np.int64))
+        merge_time = time.time() - start_time
+
+        under = graph.descendants(["a0", top])
+        l5 = {p[2] for article in paths for p in article if p[1] == top}
+        l6 = {p[3] for article in paths for p in article if p[2] in l5}
+        same = set(under.get("L5", ())) == l5 and set(under.get("L6", ())) == l6
+        ok = ok and same
+        print(f"   {n_rows:>7,} articles: {graph.n_edges:,} edges | build {build_time:.2f}s | "
+              f"walk {walk_time * 1000:.2f} ms | merge {merge_time * 1000:.2f} ms | identical: {same}")
+    return ok
+
+def search_speed_test(sizes=(10_000, 100_000)) -> bool:
+    import os
+    import tempfile
+    import numpy as np
+    from search_index import SearchIndex, tokenize, _document_tokens
+    from synthetic import text_articles, seconds_per_call
+
+    print()
+    print("🚀 BM25 search: build and query")
+    print("=" * 50)
+    rng = np.random.default_rng(3)
+    queries = [" ".join(f"w{j}" for j in rng.integers(0, 300, 3)) for _ in range(50)]
+    ok = True
+    for n_rows in sizes:
+        df = text_articles(n_rows, seed=2)
+        with tempfile.TemporaryDirectory() as tmpdir:
+            start_time = time.time()
+            index = SearchIndex.build(df, os.path.join(tmpdir, "links.search.index.pkl"))
+            build_time = time.time() - start_time
+            query_time = seconds_per_call(lambda q: index.search(q, k=20), queries)
+
+        # every hit carries a query term, best first
+        same = True
+        for query in queries[:5]:
+            hits = index.search(query, k=20)
+            terms = set(tokenize(query))
+            same = same and bool(hits) and all(a[1] >= b[1] for a, b in zip(hits, hits[1:])) and all(
+                terms & set(_document_tokens(df["headline"].iat[i], df["tldr"].iat[i], df["content_text"].iat[i]))
+                for i, _ in hits)
+        ok = ok and same
+        print(f"   {n_rows:>7,} articles: build {build_time:.1f}s | query {query_time * 1000:.2f} ms | ranked: {same}")
+    return ok
+
+def semantic_speed_test(sizes=(10_000, 100_000)) -> bool:
+    import os
+    import tempfile
+    import numpy as np
+    from semantic_index import SemanticIndex
+    from synthetic import topic_text_articles, seconds_per_call
+
+    print()
+    print("🚀 Semantic neighbors: exact scan vs IVF probes")
+    print("=" * 50)
+    ok = True
+    for n_rows in sizes:
+        df = topic_text_articles(n_rows, seed=2, length=60)
+        with tempfile.TemporaryDirectory() as tmpdir:
+            start_time = time.time()
+            index = SemanticIndex.build(df, os.path.join(tmpdir, "links.semantic.index.pkl"))
+            build_time = time.time() - start_time
+
+            probes = range(0, n_rows, n_rows // 100)
+            vectors = np.asarray(index.vectors)
+
+            def exact(article):
+                sims = vectors @ vectors[article]
+                sims[article] = -1
+                return set(np.argsort(-sims, kind="stable")[:10].tolist())
+
+            old_time = seconds_per_call(exact, probes)
+            new_time = seconds_per_call(lambda a: index.similar(a, k=10), probes)
+            recall = sum(len({a for a, _ in index.similar(p, k=10)} & exact(p)) for p in probes) / (10 * len(probes))
+        ok = ok and recall > 0.8
+        print(f"   {n_rows:>7,} articles: build {build_time:.1f}s | exact {old_time * 1000:.2f} ms | "
+              f"IVF {new_time * 1000:.2f} ms | ⚡ {old_time/new_time:.1f}x | recall@10: {recall:.0%}")
+    return ok
+
+def related_articles_speed_test(sizes=(10_000, 100_000)) -> bool:
+    from recommendations import RelatedArticles
+    from synthetic import topic_tagged_articles, seconds_per_call
+
+    print()
+    print("🚀 Related articles (MinHash-LSH): build and lookup")
+    print("=" * 50)
+    ok = True
+    for n_rows in sizes:
+        df = topic_tagged_articles(n_rows, seed=2)
+        start_time = time.time()
+        index = RelatedArticles.build(df)
+        build_time = time.time() - start_time
+
+        probes = range(0, n_rows, n_rows // 100)
+        lookup_time = seconds_per_call(lambda a: index.related(a, k=10), probes)
+        topics = df["topic"].to_numpy()
+        hits = [(a, b) for a in probes for b, _ in index.related(a, k=10)]
+        share = sum(topics[a] == topics[b] for a, b in hits) / max(len(hits), 1)
+        ok = ok and share > 0.9
+        print(f"   {n_rows:>7,} articles: build {build_time:.1f}s | lookup {lookup_time * 1000:.2f} ms | "
+              f"same topic: {share:.0%}")
+    return ok
+
 if __name__ == "__main__":
     success = speed_test()
+    success = json_decode_speed_test() and success
+    success = cold_start_speed_test() and success
+    success = bulk_paths_speed_test() and success
+    success = tag_filter_speed_test() and success
+    success = search_speed_test() and success
+    success = semantic_speed_test() and success
+    success = relationship_graph_speed_test() and success
+    success = related_articles_speed_test() and success
     if not success:
         sys.exit(1)
\ No newline at end of file
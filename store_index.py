@@ -0,0 +1,116 @@
+"""
+Base class for indexes derived from the links store rows.
+
+Article id = row position in the store. An index remembers how many rows it
+covers and the url_canonical of the last one, so it can be extended with the
+rows appended since (the store only grows by append_record) and can tell when
+the store was rewritten underneath it (migration, dedupe) and must be rebuilt.
+Indexes built from the L1–L6 tags and paths also remember the signature of
+the tag-synonym map the rows were canonicalized with (tag_synonyms): a
+changed map rewrites those values for every row, so core rebuilds them.
+An index may read other indexes (uses): core syncs those first and hands
+them to use(); the generations of the ones it was built with are kept, so
+a rebuilt dependency (new ids) rebuilds it too.
+Persistence lives in core (load_store_index / sync_store_index); indexes
+that keep per-row arrays next to their pickle use RowFile for them.
+"""
+import os
+import typing as T
+
+import numpy as np
+import pandas as pd
+
+
+class StoreIndex:
+    # file suffix: <store>.<name>.index.pkl
+    name = ""
+    # built from tags/paths: rebuilt when the tag-synonym map changes
+    uses_tags = True
+    # signature of the synonym map at build (class default for older pickles)
+    tag_synonyms: T.Optional[tuple] = None
+    # StoreIndex types this one reads, and the generations it was built with
+    uses: T.Tuple[T.Type["StoreIndex"], ...] = ()
+    used: T.Tuple[T.Optional[str], ...] = ()
+    generation: T.Optional[str] = None
+
+    def __init__(self):
+        self.n_rows = 0
+        self.last_key: T.Optional[str] = None
+        self.generation = os.urandom(8).hex()  # new for every build, kept by extends
+
+    @classmethod
+    def build(cls, df: pd.DataFrame, index_file: T.Optional[str] = None,
+              uses: T.Sequence["StoreIndex"] = ()) -> "StoreIndex":
+        index = cls()
+        if uses:
+            index.use(*uses)
+        if index_file is not None:
+            index.attach(index_file)
+        index.extend(df)
+        return index
+
+    def use(self, *indexes: "StoreIndex") -> None:
+        """
+        Called by core with the synced indexes listed in uses (same order),
+        before extending or querying; records their generations.
+        """
+        self.used = tuple(index.generation for index in indexes)
+
+    def attach(self, index_file: str) -> None:
+        """
+        Called by core with the index's pickle path after loading and before
+        building. Indexes that keep side files next to it (instead of inside
+        the pickle) open them here; unattached indexes live in memory only.
+        """
+
+    def covers_prefix_of(self, df: pd.DataFrame, tag_synonyms: T.Optional[tuple] = None) -> bool:
+        """
+        True if df starts with the rows this index was built from, with tags
+        canonicalized by the same synonym map (signature tag_synonyms).
+        """
+        if self.uses_tags and self.tag_synonyms != tag_synonyms:
+            return False
+        if self.n_rows > len(df):
+            return False
+        return self.n_rows == 0 or df["url_canonical"].iat[self.n_rows - 1] == self.last_key
+
+    def extend(self, df: pd.DataFrame) -> bool:
+        """Add df's rows past n_rows; False if there were none."""
+        start = self.n_rows
+        if start >= len(df):
+            return False
+        self._add_rows(df, start)
+        self.n_rows = len(df)
+        self.last_key = df["url_canonical"].iat[-1]
+        return True
+
+    def _add_rows(self, df: pd.DataFrame, start: int) -> None:
+        """Index rows start..len(df)-1 of df (ids = row positions)."""
+        raise NotImplementedError
+
+
+class RowFile:
+    """Append-only raw array file of fixed-width rows, read through np.memmap."""
+
+    def __init__(self, filename: str, dtype: T.Any, width: int):
+        self.filename, self.dtype, self.width = filename, np.dtype(dtype), width
+
+    def read(self, n: int) -> np.ndarray:
+        if not n:
+            return np.zeros((0, self.width), dtype=self.dtype)
+        return np.memmap(self.filename, dtype=self.dtype, mode="r", shape=(n, self.width))
+
+    def append(self, rows: np.ndarray, n: int) -> None:
+        """Write rows after the first n; anything past row n on disk is stale."""
+        size = os.path.getsize(self.filename) if os.path.exists(self.filename) else 0
+        if size == n * self.width * self.dtype.itemsize:
+            with open(self.filename, "ab") as f:
+                f.write(np.ascontiguousarray(rows, dtype=self.dtype).tobytes())
+        else:
+            self.rewrite(np.concatenate([np.asarray(self.read(n)), rows.astype(self.dtype)]))
+
+    def rewrite(self, rows: np.ndarray) -> None:
+        tmp = self.filename + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(np.ascontiguousarray(rows, dtype=self.dtype).tobytes())
+        os.replace(tmp, self.filename)
@@ -0,0 +1,101 @@
+"""
+Synthetic links-store frames for the index tests and speed_test.py.
+
+Every generator returns a frame of n articles (url_canonical
+https://example.com/<row>, article id = row position) with the columns one
+index reads, drawn from a seeded RNG so runs are reproducible.
+"""
+import time
+import typing as T
+
+import numpy as np
+import pandas as pd
+
+
+def articles(n: int, **columns: T.Any) -> pd.DataFrame:
+    """n articles with the given columns."""
+    return pd.DataFrame({"url_canonical": [f"https://example.com/{i}" for i in range(n)], **columns})
+
+
+def tagged_articles(n: int, seed: int = 0) -> pd.DataFrame:
+    """Articles with L1 from 12 domains, L2 from 60 categories (some missing) and 0-5 of 2000 L3 tags."""
+    rng = np.random.default_rng(seed)
+    l1 = [f"domain{i}" for i in range(12)]
+    l2 = [f"category{i}" for i in range(60)]
+    l3 = [f"tag{i}" for i in range(2000)]
+    return articles(
+        n,
+        L1=[l1[i] for i in rng.integers(0, len(l1), n)],
+        L2=[l2[i] if i else None for i in rng.integers(0, len(l2), n)],
+        L3=[[l3[j] for j in rng.integers(0, len(l3), rng.integers(0, 6))] for _ in range(n)],
+        L4=[[] for _ in range(n)],
+    )
+
+
+def topic_tagged_articles(n: int, seed: int = 0) -> pd.DataFrame:
+    """Articles drawn from 50 topics; articles of one topic share most tags."""
+    rng = np.random.default_rng(seed)
+    rows = []
+    for _ in range(n):
+        topic = int(rng.integers(0, 50))
+        own = [f"topic{topic}-tag{j}" for j in range(8) if rng.random() < 0.85]
+        noise = [f"noise{int(j)}" for j in rng.integers(0, 5000, 2)]
+        rows.append({
+            "L1": f"domain{topic % 5}", "L2": f"cat{topic}",
+            "L3": own[:4] + noise, "L4": own[4:],
+            "knowledge_paths": [[f"domain{topic % 5}", f"cat{topic}"] + own[:3]],
+            "topic": topic,
+        })
+    return articles(n, **{col: [r[col] for r in rows] for col in ("L1", "L2", "L3", "L4", "knowledge_paths", "topic")})
+
+
+def path_articles(n: int, seed: int = 0) -> pd.DataFrame:
+    """Articles with 3 sequential paths each: one of 200 L3 roots, then 3 of 5000 deeper tags."""
+    rng = np.random.default_rng(seed)
+    roots = [f"a{i}" for i in range(200)]
+    deeper = [f"b{i}" for i in range(5000)]
+    return articles(n, sequential_paths=[
+        [[roots[rng.integers(0, 200)]] + [deeper[j] for j in rng.integers(0, 5000, 3)] for _ in range(3)]
+        for _ in range(n)
+    ])
+
+
+def text_articles(n: int, seed: int = 0) -> pd.DataFrame:
+    """Zipf-distributed bodies over a 5000-word vocabulary, random headlines and TL;DRs."""
+    rng = np.random.default_rng(seed)
+    words = np.array([f"w{i}" for i in range(5000)], dtype=object)
+    lengths = rng.integers(50, 400, n)
+    body = words[np.minimum(rng.zipf(1.3, int(lengths.sum())), 5000) - 1]
+    ends = np.cumsum(lengths)
+    heads, tldrs = words[rng.integers(0, 5000, (n, 6))], words[rng.integers(0, 5000, (n, 8))]
+    return articles(
+        n,
+        headline=[" ".join(h) for h in heads],
+        tldr=[[" ".join(t)] for t in tldrs],
+        content_text=[" ".join(body[e - l:e]) for e, l in zip(ends.tolist(), lengths.tolist())],
+    )
+
+
+def topic_text_articles(n: int, seed: int = 0, length: int = 120) -> pd.DataFrame:
+    """Articles on 40 topics: two thirds drawn from the topic's 100 words, the rest from a shared vocabulary."""
+    rng = np.random.default_rng(seed)
+    topic_words = np.array([[f"t{t}x{j}" for j in range(100)] for t in range(40)], dtype=object)
+    shared = np.array([f"common{j}" for j in range(2000)], dtype=object)
+    topics = rng.integers(0, 40, n)
+    own = topic_words[topics[:, None], rng.integers(0, 100, (n, 2 * length // 3))]
+    other = shared[rng.integers(0, 2000, (n, length // 3))]
+    return articles(
+        n,
+        tldr=[[" ".join(o[:5])] for o in own],
+        content_text=[" ".join(np.concatenate([o, x])) for o, x in zip(own, other)],
+        topic=topics,
+    )
+
+
+def seconds_per_call(fn: T.Callable[..., T.Any], args: T.Iterable[T.Any]) -> float:
+    """Mean wall time of fn(arg) over args."""
+    args = list(args)
+    start = time.perf_counter()
+    for arg in args:
+        fn(arg)
+    return (time.perf_counter() - start) / max(len(args), 1)
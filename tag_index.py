@@ -0,0 +1,219 @@
+"""
+Integer-interned tag index over the links store.
+
+Every L1–L6 tag is interned once in a TagDictionary (string -> int id).
+For each level the index keeps two CSR layouts as flat int32 arrays:
+  - article -> sorted tag ids  (row_ptr, row_tags)
+  - tag -> sorted article rows (tag_ptr, tag_rows)
+Multi-tag filters become NumPy operations over the sorted posting lists:
+OR within a level is a union, AND within a level ("all" mode) intersects
+postings starting from the shortest, and levels are combined by filtering
+the rarest level's ids through the other levels' membership masks. None of
+it touches the per-row Python lists. Option lists with per-tag counts are
+precomputed per level. As a StoreIndex the index is persisted next to the
+store and extended on every ingest (core.tag_index); appended rows only
+grow the end of the postings of the tags they carry.
+"""
+import itertools
+import typing as T
+
+import numpy as np
+import pandas as pd
+
+from store_index import StoreIndex
+
+LEVELS = ["L1", "L2", "L3", "L4", "L5", "L6"]
+SCALAR_LEVELS = {"L1", "L2"}
+
+
+class TagDictionary:
+    """Append-only string <-> id table shared by all levels."""
+
+    def __init__(self, terms: T.Iterable[str] = ()):
+        self.terms: T.List[str] = []
+        self.ids: T.Dict[str, int] = {}
+        for t in terms:
+            self.intern(t)
+
+    def __len__(self) -> int:
+        return len(self.terms)
+
+    def intern(self, term: str) -> int:
+        tid = self.ids.get(term)
+        if tid is None:
+            tid = self.ids[term] = len(self.terms)
+            self.terms.append(term)
+        return tid
+
+    def intern_many(self, terms: T.Sequence[str]) -> np.ndarray:
+        """Ids for a flat sequence of terms (one dict lookup per distinct term)."""
+        if not len(terms):
+            return np.empty(0, dtype=np.int32)
+        codes, uniques = pd.factorize(pd.Series(terms, dtype=object), sort=False)
+        ids = np.fromiter((self.intern(u) for u in uniques), dtype=np.int32, count=len(uniques))
+        return ids[codes]
+
+    def lookup(self, terms: T.Iterable[str]) -> T.List[int]:
+        """Ids of known terms; unknown terms are left out."""
+        return [self.ids[t] for t in terms if t in self.ids]
+
+
+def _flatten(values: T.Sequence, scalar: bool) -> T.Tuple[np.ndarray, T.List[str]]:
+    """(tags per row, flat tag list) for a scalar or list-valued level column."""
+    if scalar:
+        valid = np.fromiter((isinstance(v, str) and v != "" for v in values), dtype=bool, count=len(values))
+        return valid.astype(np.int64), [v for v, ok in zip(values, valid.tolist()) if ok]
+    cells = [[t for t in v if isinstance(t, str) and t] if isinstance(v, list) else () for v in values]
+    lens = np.fromiter(map(len, cells), dtype=np.int64, count=len(cells))
+    return lens, list(itertools.chain.from_iterable(cells))
+
+
+class _LevelPostings:
+    __slots__ = ("row_ptr", "row_tags", "tag_ptr", "tag_rows")
+
+    def __init__(self, rows: np.ndarray, ids: np.ndarray, n_rows: int, n_tags: int):
+        # dedupe (row, tag) pairs; sorted by row, then tag
+        key = np.unique(rows.astype(np.int64) * max(n_tags, 1) + ids)
+        rows, ids = key // max(n_tags, 1), key % max(n_tags, 1)
+        self.row_ptr = np.zeros(n_rows + 1, dtype=np.int64)
+        np.cumsum(np.bincount(rows, minlength=n_rows), out=self.row_ptr[1:])
+        self.row_tags = ids.astype(np.int32)
+        order = np.argsort(ids, kind="stable")  # rows stay ascending within each tag
+        self.tag_ptr = np.zeros(n_tags + 1, dtype=np.int64)
+        np.cumsum(np.bincount(ids, minlength=n_tags), out=self.tag_ptr[1:])
+        self.tag_rows = rows[order].astype(np.int32)
+
+    def extended(self, rows: np.ndarray, ids: np.ndarray, n_rows: int, n_tags: int) -> "_LevelPostings":
+        """
+        Postings with (row, tag) pairs of appended rows (all past the current
+        ones) added; self is left unchanged. The new rows sort after every
+        existing one, so each touched tag's posting just grows at its end:
+        one merge pass over the arrays instead of re-sorting every pair.
+        """
+        old_rows, old_tags = len(self.row_ptr) - 1, len(self.tag_ptr) - 1
+        key = np.unique(rows.astype(np.int64) * max(n_tags, 1) + ids)
+        rows, ids = key // max(n_tags, 1), key % max(n_tags, 1)
+        out = _LevelPostings.__new__(_LevelPostings)
+        per_row = np.bincount(rows - old_rows, minlength=n_rows - old_rows)
+        out.row_ptr = np.concatenate([self.row_ptr, self.row_ptr[-1] + np.cumsum(per_row)])
+        out.row_tags = np.concatenate([self.row_tags, ids.astype(np.int32)])
+        tag_ptr = np.concatenate([self.tag_ptr, np.full(n_tags - old_tags, self.tag_ptr[-1])])
+        order = np.argsort(ids, kind="stable")  # rows stay ascending within each tag
+        out.tag_rows = np.insert(self.tag_rows, tag_ptr[ids[order] + 1], rows[order].astype(np.int32))
+        out.tag_ptr = tag_ptr
+        out.tag_ptr[1:] += np.cumsum(np.bincount(ids, minlength=n_tags))
+        return out
+
+    def postings(self, tid: int) -> np.ndarray:
+        if tid + 1 >= len(self.tag_ptr):
+            return self.tag_rows[:0]
+        return self.tag_rows[self.tag_ptr[tid]:self.tag_ptr[tid + 1]]
+
+
+class TagIndex(StoreIndex):
+    """Per-level tag postings for a links frame (article id = row position)."""
+
+    name = "tags"
+
+    def __init__(self, dictionary: T.Optional[TagDictionary] = None):
+        super().__init__()
+        self.dictionary = dictionary if dictionary is not None else TagDictionary()
+        self.levels = {lv: _LevelPostings(np.empty(0, np.int64), np.empty(0, np.int32), 0, 0) for lv in LEVELS}
+        self._options: T.Dict[str, T.List[T.Tuple[str, int]]] = {}
+
+    def _add_rows(self, df: pd.DataFrame, start: int) -> None:
+        n = len(df)
+        tail = df.iloc[start:]
+        added = {}
+        for level in LEVELS:
+            values = tail[level].tolist() if level in tail.columns else [None] * len(tail)
+            lens, tags = _flatten(values, level in SCALAR_LEVELS)
+            added[level] = (np.repeat(np.arange(start, n), lens), self.dictionary.intern_many(tags))
+        n_tags = len(self.dictionary)
+        for level, (rows, ids) in added.items():
+            self.levels[level] = self.levels[level].extended(rows, ids, n, n_tags)
+        self._options = {}
+
+    def appended(self, df: pd.DataFrame) -> "TagIndex":
+        """A new index for df = these rows + appended ones; self is left unchanged."""
+        out = TagIndex(self.dictionary)  # the dictionary is append-only, so sharing it is safe
+        out.levels, out.n_rows, out.last_key = dict(self.levels), self.n_rows, self.last_key
+        out.extend(df)
+        return out
+
+    # ---- queries ----
+    def rows_with(self, level: str, tag: str) -> np.ndarray:
+        """Sorted article ids having tag at this level."""
+        tid = self.dictionary.ids.get(tag)
+        return self.levels[level].postings(tid) if tid is not None else np.empty(0, dtype=np.int32)
+
+    def level_rows(self, level: str, tags: T.Iterable[str], mode: str = "any") -> np.ndarray:
+        """Sorted article ids having any (union) / all (intersection) of tags at this level."""
+        if mode not in ("any", "all"):
+            raise ValueError(f"mode must be 'any' or 'all', not {mode!r}")
+        postings = [self.rows_with(level, t) for t in dict.fromkeys(tags)]
+        if not postings:
+            return np.arange(self.n_rows, dtype=np.int32) if mode == "all" else np.empty(0, dtype=np.int32)
+        if mode == "any":
+            return postings[0] if len(postings) == 1 else np.unique(np.concatenate(postings))
+        return _intersect(postings)
+
+    def rows_matching(self, selection: T.Dict[str, T.Sequence[str]], mode: str = "any") -> np.ndarray:
+        """Sorted article ids matching every level's selection; levels with nothing selected match all."""
+        selected = [(level, tags) for level, tags in selection.items() if tags]
+        if not selected:
+            return np.arange(self.n_rows, dtype=np.int32)
+        sizes = [sum(len(self.rows_with(level, t)) for t in tags) for level, tags in selected]
+        order = np.argsort(sizes, kind="stable")
+        # the rarest level seeds the result; every other level only filters it through a
+        # membership mask (a scatter of its postings), so large postings are never sorted
+        rows = self.level_rows(*selected[order[0]], mode)
+        for i in order[1:]:
+            if not len(rows):
+                break
+            rows = rows[self.mask(*selected[i], mode)[rows]]
+        return rows
+
+    def mask(self, level: str, tags: T.Iterable[str], mode: str = "any") -> np.ndarray:
+        """Boolean row mask: rows having any (OR) / all (AND) of tags at this level."""
+        out = np.zeros(self.n_rows, dtype=bool)
+        if mode == "any":
+            for t in dict.fromkeys(tags):
+                out[self.rows_with(level, t)] = True
+        else:
+            out[self.level_rows(level, tags, mode)] = True
+        return out
+
+    def filter(self, selection: T.Dict[str, T.Sequence[str]], mode: str = "any") -> np.ndarray:
+        """rows_matching as a boolean row mask."""
+        out = np.zeros(self.n_rows, dtype=bool)
+        out[self.rows_matching(selection, mode)] = True
+        return out
+
+    def tags_of(self, level: str, row: int) -> T.List[str]:
+        p = self.levels[level]
+        return [self.dictionary.terms[i] for i in p.row_tags[p.row_ptr[row]:p.row_ptr[row + 1]]]
+
+    def counts(self, level: str) -> T.Dict[str, int]:
+        """tag -> number of rows having it at this level (tags with no rows left out)."""
+        return dict(self.options(level))
+
+    def options(self, level: str) -> T.List[T.Tuple[str, int]]:
+        """(tag, article count) pairs of a level, alphabetical; computed once per update."""
+        cached = self._options.get(level)
+        if cached is None:
+            per_tag = np.diff(self.levels[level].tag_ptr)
+            cached = sorted((self.dictionary.terms[i], int(per_tag[i])) for i in np.flatnonzero(per_tag))
+            self._options[level] = cached
+        return cached
+
+
+def _intersect(postings: T.List[np.ndarray]) -> np.ndarray:
+    """Intersection of sorted unique id arrays, shortest first."""
+    postings = sorted(postings, key=len)
+    rows = postings[0]
+    for p in postings[1:]:
+        if not len(rows):
+            break
+        rows = np.intersect1d(rows, p, assume_unique=True)
+    return rows
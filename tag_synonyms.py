@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+Batch job: cluster near-duplicate L3–L6 tags and write the canonical-tag map.
+
+Every distinct tag in the store (L3–L6 and sequential_paths, read in chunks)
+becomes a hashed character 3-gram TF-IDF vector. Cosine similarities are
+computed with NumPy in row blocks (block × n_tags at a time, so memory stays
+bounded with tens of thousands of tags), and pairs at or above the threshold
+are merged. Tags that differ only in case/punctuation ("machine-learning")
+and unambiguous acronyms ("ML" -> the only "M... L..." tag) are merged too.
+Case is not folded inside mixed-case words ("ReAct" stays apart from
+"React"), and only all-caps tags count as acronyms, and only when their
+expansion is the more used spelling ("Go" and a common "API" stay as they
+are). Each cluster maps to its most used spelling.
+
+The map goes to core.TAG_SYNONYMS_PATH; load_csv and ingest apply it.
+
+Usage:
+    python tag_synonyms.py                 # cluster data/links_store_v2.csv, write the map
+    python tag_synonyms.py --dry-run --threshold 0.9
+"""
+import argparse
+import re
+import zlib
+import typing as T
+from collections import Counter
+
+import numpy as np
+
+import core
+
+THRESHOLD = 0.85
+HASH_DIM = 512
+BLOCK_ROWS = 512
+
+
+def _normalize(tag: str) -> str:
+    """Spelling key: punctuation and case folded, except case inside mixed-case words ("ReAct")."""
+    words = re.sub(r"[^0-9A-Za-z+#]+", " ", tag).split()
+    return " ".join(w if re.search(r"[a-z][A-Z]", w) else w.lower() for w in words)
+
+
+def collect_tags(path: str = core.CSV_PATH, batch_size: int = core.ITER_BATCH_SIZE) -> Counter:
+    """tag -> number of articles using it (raw spellings, no synonyms applied)."""
+    counts: Counter = Counter()
+    columns = core.TAG_COLUMNS + ["sequential_paths"]
+    for chunk in core.iter_records(path, columns=columns, batch_size=batch_size, synonyms=False):
+        for row in zip(*(chunk[c].tolist() for c in columns)):
+            tags = set()
+            for cell in row[:-1]:
+                if isinstance(cell, list):
+                    tags.update(t for t in cell if isinstance(t, str))
+            for p in row[-1] if isinstance(row[-1], list) else []:
+                if isinstance(p, list):
+                    tags.update(t for t in p if isinstance(t, str))
+            counts.update(t for t in tags if t.strip())
+    return counts
+
+
+def ngram_tfidf(norms: T.List[str], dim: int = HASH_DIM, n: int = 3) -> np.ndarray:
+    """Row-normalized TF-IDF of hashed character n-grams (float32, len(norms) × dim)."""
+    rows, cols = [], []
+    for i, s in enumerate(norms):
+        padded = f" {s} "
+        for j in range(max(len(padded) - n + 1, 1)):
+            rows.append(i)
+            cols.append(zlib.crc32(padded[j:j + n].encode("utf-8")) % dim)
+    X = np.zeros((len(norms), dim), dtype=np.float32)
+    np.add.at(X, (np.asarray(rows, dtype=np.int64), np.asarray(cols, dtype=np.int64)), 1.0)
+    nz = X > 0
+    X[nz] = 1.0 + np.log(X[nz])                            # sublinear tf
+    df = nz.sum(axis=0)
+    X *= (np.log((1 + len(norms)) / (1 + df)) + 1.0).astype(np.float32)
+    X /= np.maximum(np.linalg.norm(X, axis=1, keepdims=True), 1e-12)
+    return X
+
+
+def similar_pairs(X: np.ndarray, threshold: float = THRESHOLD, block: int = BLOCK_ROWS) -> T.Iterator[T.Tuple[int, int]]:
+    """(i, j) with i < j and cosine(X[i], X[j]) >= threshold, one row block at a time."""
+    n = len(X)
+    for start in range(0, n, block):
+        stop = min(start + block, n)
+        sims = X[start:stop] @ X[start:].T                 # only columns >= start: upper triangle
+        r, c = np.nonzero(sims >= threshold)
+        keep = c > r                                        # local column c is global start + c
+        for i, j in zip(r[keep] + start, c[keep] + start):
+            yield int(i), int(j)
+
+
+class _UnionFind:
+    def __init__(self, n: int):
+        self.parent = list(range(n))
+
+    def find(self, i: int) -> int:
+        while self.parent[i] != i:
+            self.parent[i] = self.parent[self.parent[i]]
+            i = self.parent[i]
+        return i
+
+    def union(self, i: int, j: int) -> None:
+        a, b = self.find(i), self.find(j)
+        if a != b:
+            self.parent[max(a, b)] = min(a, b)
+
+
+def build_synonym_map(
+    counts: T.Dict[str, int],
+    threshold: float = THRESHOLD,
+    dim: int = HASH_DIM,
+    block: int = BLOCK_ROWS,
+) -> T.Dict[str, str]:
+    """{tag: canonical} for every tag whose cluster has a different canonical spelling."""
+    tags = sorted(counts)
+    if not tags:
+        return {}
+    norms = [_normalize(t) for t in tags]
+    uf = _UnionFind(len(tags))
+
+    # same spelling up to case/punctuation
+    first: T.Dict[str, int] = {}
+    for i, norm in enumerate(norms):
+        uf.union(first.setdefault(norm, i), i)
+
+    # unambiguous acronyms: an all-caps tag and the only multi-word tag with its initials,
+    # if that expansion is used more (a common "API" is not folded into a rare expansion)
+    uses: Counter = Counter()
+    by_initials: T.Dict[str, T.Set[str]] = {}
+    for tag, norm in zip(tags, norms):
+        uses[norm] += counts[tag]
+        words = norm.split()
+        if len(words) >= 2:
+            by_initials.setdefault("".join(w[0].lower() for w in words), set()).add(norm)
+    for i, tag in enumerate(tags):
+        expansions = by_initials.get(tag.lower(), ()) if re.fullmatch(r"[A-Z]{2,6}", tag) else ()
+        if len(expansions) == 1:
+            expansion = next(iter(expansions))
+            if uses[expansion] > uses[norms[i]]:
+                uf.union(i, first[expansion])
+
+    # character n-gram cosine similarity (one vector per distinct normalized spelling)
+    uniq = list(first)
+    for a, b in similar_pairs(ngram_tfidf(uniq, dim), threshold, block):
+        uf.union(first[uniq[a]], first[uniq[b]])
+
+    clusters: T.Dict[int, T.List[str]] = {}
+    for i, tag in enumerate(tags):
+        clusters.setdefault(uf.find(i), []).append(tag)
+    mapping = {}
+    for members in clusters.values():
+        if len(members) < 2:
+            continue
+        # most used spelling; ties -> the longer (more descriptive), then alphabetical
+        canonical = min(members, key=lambda t: (-counts[t], -len(t), t))
+        mapping.update({t: canonical for t in members if t != canonical})
+    return mapping
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Cluster near-duplicate L3–L6 tags into a canonical map")
+    parser.add_argument("--store", default=core.CSV_PATH)
+    parser.add_argument("--output", default=core.TAG_SYNONYMS_PATH)
+    parser.add_argument("--threshold", type=float, default=THRESHOLD)
+    parser.add_argument("--dim", type=int, default=HASH_DIM)
+    parser.add_argument("--block", type=int, default=BLOCK_ROWS)
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args()
+
+    counts = collect_tags(args.store)
+    mapping = build_synonym_map(counts, args.threshold, args.dim, args.block)
+    n_canonical = len(set(mapping.values()))
+    print(f"🏷️  {len(counts)} distinct tags -> {len(counts) - len(mapping)} after merging "
+          f"{len(mapping)} spellings into {n_canonical} canonical tags")
+    for tag, canonical in sorted(mapping.items(), key=lambda kv: kv[1])[:50]:
+        print(f"   {tag!r} -> {canonical!r}")
+    if not args.dry_run:
+        core.save_tag_synonyms(mapping, args.output)
+        print(f"✅ Wrote {args.output}")
+
+
+if __name__ == "__main__":
+    main()
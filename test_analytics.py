@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Test learning-path analytics: heavy hitters, streaming updates, depth profile
+"""
+
+import os
+import tempfile
+from collections import Counter
+
+import numpy as np
+
+import core
+from analytics import PathAnalytics, article_keys
+
+
+def _articles(n: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    # a few popular progressions plus a long tail of random ones
+    popular = [["ML", "Deployment", "Docker", "K8s"], ["ML", "Evaluation"], ["Stats", "Bayes", "MCMC"]]
+    tags = [f"t{i}" for i in range(400)]
+    out = []
+    for _ in range(n):
+        paths = [list(popular[i]) for i in range(3) if rng.random() < (0.5, 0.3, 0.2)[i]]
+        paths += [[tags[j] for j in rng.integers(0, 400, rng.integers(1, 5))] for _ in range(rng.integers(0, 3))]
+        out.append(paths)
+    return out
+
+
+def _exact(articles):
+    prefixes, ngrams = Counter(), Counter()
+    for paths in articles:
+        p, g, _ = article_keys(paths)
+        prefixes.update(p)
+        ngrams.update(g)
+    return prefixes, ngrams
+
+
+def test_heavy_hitters_match_exact_counts():
+    print("🧪 Testing top progressions against exact counts...")
+    articles = _articles(3000)
+    analytics = PathAnalytics(top_k=64)
+    for start in range(0, len(articles), 250):  # streamed in batches
+        analytics.add_articles(articles[start:start + 250])
+    prefixes, ngrams = _exact(articles)
+
+    top = analytics.top_progressions(5, length=2)
+    exact_top = [k for k, _ in sorted(((k, c) for k, c in prefixes.items() if len(k) == 2), key=lambda kc: -kc[1])[:2]]
+    assert [k for k, _ in top[:2]] == exact_top
+    for key, est in analytics.top_progressions(20):
+        assert est >= prefixes[key]                      # count-min never undercounts
+        assert est - prefixes[key] <= 0.01 * len(articles)
+    assert analytics.top_progressions(1, root="Stats")[0][0] == ("Stats",)
+    assert analytics.top_ngrams(1, n=3)[0][0] in {("ML", "Deployment", "Docker"), ("Deployment", "Docker", "K8s")}
+    assert analytics.progression_count(["ML", "Deployment", "Docker", "K8s"]) >= prefixes[("ML", "Deployment", "Docker", "K8s")]
+    print(f"✅ Top progression: {' → '.join(top[0][0])} ({top[0][1]} articles)")
+
+
+def test_depth_profile_and_incremental_store():
+    print("🧪 Testing depth profile and per-write updates...")
+    articles = [[["A", "B", "C"], ["A", "D"]], [["A"]], [], [["E", "F", "G", "H"]]]
+    analytics = PathAnalytics()
+    analytics.add_articles(articles)
+    profile = analytics.depth_profile()
+    assert profile["by_depth"] == {"L3": 1, "L4": 1, "L5": 1, "L6": 1} and profile["articles"] == 3
+    assert profile["mean_depth"] == 2.5
+    assert analytics.root_complexity() == [("E", 4.0, 1), ("A", 2.0, 2)]
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, "links.csv")
+        core.save_csv(core.init_store(), path)
+        df = core.load_csv(path)
+        for i, paths in enumerate(articles):
+            df = core.append_record(df, {"url": f"https://example.com/{i}", "sequential_paths": paths})
+            core.save_csv(df, path)
+            core.path_analytics(df, path)
+        core._STORE_INDEX_CACHE.clear()
+        stored = core.load_store_index(PathAnalytics, path)
+        assert stored.n_rows == len(articles) and stored.depth_profile() == profile
+        assert stored.top_progressions(3) == analytics.top_progressions(3)
+    print("✅ Depth profile exact; persisted aggregates equal a one-shot build")
+
+
+if __name__ == "__main__":
+    test_heavy_hitters_match_exact_counts()
+    test_depth_profile_and_incremental_store()
+    print("\n✨ Test complete!")
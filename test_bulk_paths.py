@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Test bulk path processing against the per-article version
+"""
+
+import numpy as np
+
+import core
+
+
+def _random_paths(n: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    tags = [f"t{i}" for i in range(30)]
+    paths = [[[tags[j] for j in rng.integers(0, 30, rng.integers(0, 6))] for _ in range(rng.integers(0, 4))]
+             for _ in range(n)]
+    paths[3] = None
+    paths[4] = [None, "not a path", [], ["t1", "t2"]]
+    return paths
+
+
+def test_bulk_matches_per_article():
+    print("🧪 Testing process_sequential_paths_bulk...")
+    paths = _random_paths(500)
+    l1s = [f"D{i % 3}" for i in range(500)]
+    l2s = [f"C{i % 7}" for i in range(500)]
+    bulk = core.process_sequential_paths_bulk(l1s, l2s, paths)
+
+    edges = {}
+    for i, seq in enumerate(paths):
+        kp, l3, l4, l5, l6, rel = core.process_sequential_paths_with_relationships(l1s[i], l2s[i], seq)
+        assert (kp, l3, l4, l5, l6) == (bulk.knowledge_paths[i], bulk.L3[i], bulk.L4[i], bulk.L5[i], bulk.L6[i]), i
+        for key, level in rel.items():
+            for parent, children in level.items():
+                for child in children:
+                    edges[(key, parent, child)] = edges.get((key, parent, child), 0) + 1
+    keys = ["L3_to_L4", "L4_to_L5", "L5_to_L6"]
+    got = {(keys[d], bulk.terms[a], bulk.terms[b]): w for d, a, b, w in zip(
+        bulk.edge_depth.tolist(), bulk.edge_src.tolist(), bulk.edge_dst.tolist(), bulk.edge_weight.tolist())}
+    assert got == edges
+
+    # columnar view: one entry per path tag, depth restarts at 0 for each path
+    assert len(bulk.tag) == sum(len(p[:4]) for seq in paths if isinstance(seq, list) for p in seq if isinstance(p, list) and p)
+    assert bulk.terms[bulk.tag[bulk.article == 4]].tolist() == ["t1", "t2"]
+    assert bulk.depth[bulk.article == 4].tolist() == [0, 1]
+    print(f"✅ {len(paths)} articles and {len(got)} weighted edges match the per-article results")
+
+
+def test_bulk_matches_per_article_on_missing_tags():
+    print("🧪 Testing missing and non-string tags...")
+    paths = [[["A", None]], [["B", None, "C"]], [[None]], [["A", "B", None, "D"]], [["E", 7]], None]
+    bulk = core.process_sequential_paths_bulk(["Tech"] * len(paths), ["AI"] * len(paths), paths)
+    edges = {}
+    for i, seq in enumerate(paths):
+        kp, l3, l4, l5, l6, rel = core.process_sequential_paths_with_relationships("Tech", "AI", seq)
+        assert (kp, l3, l4, l5, l6) == (bulk.knowledge_paths[i], bulk.L3[i], bulk.L4[i], bulk.L5[i], bulk.L6[i]), i
+        for key, level in rel.items():
+            for parent, children in level.items():
+                for child in children:
+                    edges.setdefault(key, {}).setdefault(parent, set()).add(child)
+    assert {k: {p: set(c) for p, c in v.items()} for k, v in bulk.relationships().items() if v} == edges
+    assert bulk.L4[0] == [None] and bulk.L3[2] == [None] and bulk.L4[4] == [7]
+
+    nan = core.process_sequential_paths_bulk(["Tech"], ["AI"], [[["F", float("nan")]]])
+    assert nan.L4 == [[None]]  # NaN from a parsed frame is a missing tag too
+    print("✅ Missing tags stay None, as in the per-article results")
+
+
+def test_rederive_path_columns():
+    print("🧪 Testing whole-store re-derivation...")
+    df = core.init_store()
+    for i, seq in enumerate(_random_paths(20, seed=1)):
+        df = core.append_record(df, {"url": f"https://example.com/{i}", "L1": "Tech", "L2": "AI", "sequential_paths": seq})
+    core.rederive_path_columns(df)
+    for i, seq in enumerate(df["sequential_paths"].tolist()):
+        kp, l3, l4, l5, l6, _ = core.process_sequential_paths_with_relationships("Tech", "AI", seq)
+        assert df["knowledge_paths"].iat[i] == kp and df["L3"].iat[i] == l3 and df["L6"].iat[i] == l6
+    print("✅ knowledge_paths and L3–L6 recomputed for every row")
+
+
+if __name__ == "__main__":
+    test_bulk_matches_per_article()
+    test_bulk_matches_per_article_on_missing_tags()
+    test_rederive_path_columns()
+    print("\n✨ Test complete!")
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Test the append-only review-event log behind mark_card_status / swipe_right
+"""
+
+import os
+import tempfile
+from collections import deque
+
+import pandas as pd
+
+import core
+
+
+def _make_cards_csv(tmpdir: str) -> str:
+    path = os.path.join(tmpdir, "cards_store.csv")
+    pd.DataFrame([
+        {"card_id": "a1", "url_canonical": "https://x.com/1", "question": "Q1", "answer": "A1",
+         "learned": False, "created_at_utc": "2025-01-01T00:00:00Z"},
+        {"card_id": "b2", "url_canonical": "https://x.com/1", "question": "Q2", "answer": "A2",
+         "learned": False, "created_at_utc": "2025-01-01T00:00:00Z"},
+    ]).to_csv(path, index=False)
+    return path
+
+
+def test_swipe_appends_event_without_rewriting_csv():
+    print("🧪 Testing review-event log...")
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = _make_cards_csv(tmpdir)
+        before = open(path, encoding="utf-8").read()
+
+        old_path = core.CARDS_CSV
+        core.CARDS_CSV = path
+        try:
+            assert core.mark_card_status("a1", True)
+            queue = deque([{"card_id": "b2", "question": "Q2", "answer": "A2"}])
+            core.swipe_right(queue, "b2")
+            assert not queue
+
+            # CSV untouched, state lives in the log
+            assert open(path, encoding="utf-8").read() == before
+            assert os.path.exists(core._card_events_path(path))
+
+            df = core._ensure_cards_csv(path)
+            assert df.set_index("card_id")["learned"].to_dict() == {"a1": True, "b2": True}
+            print("✅ Events folded into loaded frame")
+
+            # last event wins
+            core.mark_card_status("a1", False)
+            df = core._ensure_cards_csv(path)
+            assert df.set_index("card_id")["learned"].to_dict() == {"a1": False, "b2": True}
+
+            # compaction moves state into the CSV and drops the log
+            core.compact_card_events(path)
+            assert not os.path.exists(core._card_events_path(path))
+            df = core._ensure_cards_csv(path)
+            assert df.set_index("card_id")["learned"].to_dict() == {"a1": False, "b2": True}
+            print("✅ Compaction preserved learned state")
+        finally:
+            core.CARDS_CSV = old_path
+
+
+if __name__ == "__main__":
+    test_swipe_appends_event_without_rewriting_csv()
+    print("\n✨ Test complete!")
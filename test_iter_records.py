@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+Test the chunked iter_records reader over the links store
+"""
+
+import os
+import tempfile
+
+import pandas as pd
+
+import core
+
+
+def test_iter_records_batches_and_projects():
+    print("🧪 Testing iter_records...")
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, "links.csv")
+        df = core.init_store()
+        for i in range(7):
+            df = core.append_record(df, {
+                "url": f"https://example.com/{i}", "L1": "Tech", "L3": [f"T{i}"],
+                "tldr": [f"point {i}"], "content_text": f"body {i}",
+            })
+        core.save_csv(df, path)
+
+        batches = list(core.iter_records(path, columns=["url_canonical", "L3", "content_text"], batch_size=3))
+        assert [len(b) for b in batches] == [3, 3, 1]
+        assert all(list(b.columns) == ["url_canonical", "L3", "content_text"] for b in batches)
+        merged = pd.concat(batches)
+        assert merged.index.tolist() == list(range(7))  # index = row position in the store
+        assert merged["L3"].tolist() == [[f"T{i}"] for i in range(7)]
+        assert merged["content_text"].tolist() == [f"body {i}" for i in range(7)]
+        print("✅ Batches projected and decoded")
+
+        full = pd.concat(core.iter_records(path))
+        assert full["tldr"].tolist() == core.load_csv(path, lazy=False)["tldr"].tolist()
+        assert list(core.iter_records(os.path.join(tmpdir, "missing.csv"))) == []
+        try:
+            next(core.iter_records(path, columns=["nope"]))
+            raise AssertionError("unknown column accepted")
+        except ValueError:
+            pass
+        print("✅ Full scan matches load_csv")
+
+
+if __name__ == "__main__":
+    test_iter_records_batches_and_projects()
+    print("\n✨ Test complete!")
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Test knowledge-gap detection per L2 domain over the aggregated path graph
+"""
+
+import os
+import pickle
+import tempfile
+
+import pandas as pd
+
+import core
+from knowledge_gaps import KnowledgeGaps
+from relationship_graph import RelationshipGraph
+
+
+def _rows():
+    deployment = (
+        [["Serving", "Docker", "K8s", "Helm"]] * 4
+        + [["Serving", "Batch"]]                      # dead end; Batch continues in Data Engineering
+        + [["Serving", "GPU", "Triton"]]              # GPU: 1 of Serving's 6 articles -> thin
+        + [["Metrics", "Grafana", "Prometheus"]]      # Serving and Prometheus never bridged here
+    )
+    data = (
+        [["ETL", "Batch", "Spark"]] * 2
+        + [["Serving", "Docker", "Triton"]]           # links two Deployment nodes Deployment never links
+        + [["Serving", "Monitoring", "Prometheus"]] * 2
+    )
+    rows = [("Deployment", p) for p in deployment] + [("Data Engineering", p) for p in data]
+    return pd.DataFrame({
+        "url_canonical": [f"https://example.com/{i}" for i in range(len(rows))],
+        "L2": [d for d, _ in rows],
+        "sequential_paths": [[list(p)] for _, p in rows],
+    })
+
+
+def test_gap_kinds():
+    print("🧪 Testing dead ends, thin nodes, missing links and missing intermediates...")
+    gaps = KnowledgeGaps.build(_rows())
+    report = gaps.report("Deployment")
+    assert report["articles"] == 7
+
+    dead = {(g["level"], g["tag"]): g for g in report["dead_ends"]}
+    assert dead[("L4", "Batch")]["continues_elsewhere"] == ["Spark"]
+    assert ("L5", "Triton") in dead and ("L6", "Helm") not in dead
+
+    thin = report["thin_nodes"]
+    assert [(g["tag"], g["parent"], g["parent_articles"], g["children"]) for g in thin] == [("GPU", "Serving", 6, ["Triton"])]
+
+    assert report["missing_links"] == [{"level": "L4", "parent": "Docker", "child": "Triton", "support": 1}]
+    assert report["missing_intermediates"] == [
+        {"level": "L3", "start": "Serving", "end": "Prometheus", "via": ["Monitoring"], "support": 2}]
+
+    assert gaps.report("Unknown")["articles"] == 0
+    assert gaps.domains() == [("Deployment", 7), ("Data Engineering", 5)]
+    print(f"✅ Deployment: {sum(len(report[k]) for k in ('dead_ends', 'thin_nodes', 'missing_links', 'missing_intermediates'))} gaps found")
+
+
+def _reports(gaps):
+    return {d: gaps.report(d) for d, _ in gaps.domains()}
+
+
+def test_incremental_reports_and_store():
+    print("🧪 Testing per-ingest recomputation and persistence...")
+    df = _rows()
+    gaps = KnowledgeGaps.build(df.iloc[:7])            # Deployment only
+    assert gaps.report("Deployment")["missing_links"] == []
+    before = gaps.report("Deployment")
+    gaps.extend(df.iloc[:9])                           # ETL → Batch → Spark touches Deployment's Batch
+    assert gaps.report("Deployment") is not before
+    assert gaps.report("Deployment")["dead_ends"][0]["continues_elsewhere"] == ["Spark"]
+    gaps.extend(df)
+    assert gaps.dirty == {"Deployment", "Data Engineering"}  # nothing analyzed until asked for
+    assert _reports(gaps) == _reports(KnowledgeGaps.build(df)) and not gaps.dirty
+
+    unrelated = pd.concat([df, pd.DataFrame({"url_canonical": ["https://example.com/x"], "L2": ["Statistics"],
+                                             "sequential_paths": [[["Bayes", "MCMC"]]]})], ignore_index=True)
+    deployment = gaps.report("Deployment")
+    gaps.extend(unrelated)
+    assert gaps.report("Deployment") is deployment     # untouched domain kept its cached report
+    assert gaps.report("Statistics")["dead_ends"][0]["tag"] == "MCMC"
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, "links.csv")
+        for stop in (3, 8, len(df)):
+            core.knowledge_gaps(df.iloc[:stop], path)
+        core._STORE_INDEX_CACHE.clear()
+        stored = core.knowledge_gaps(df, path)
+        assert stored.graph is core.load_store_index(RelationshipGraph, path)  # the graph index, not a copy
+        assert pickle.loads(pickle.dumps(stored)).graph is None
+        assert _reports(stored) == _reports(KnowledgeGaps.build(df))
+
+        core._store_index_path(path, "graph").unlink()     # a rebuilt graph renumbers nodes
+        core._STORE_INDEX_CACHE.clear()
+        rebuilt = core.knowledge_gaps(df, path)
+        assert rebuilt.generation != stored.generation and _reports(rebuilt) == _reports(stored)
+    print("✅ Only touched domains are recomputed; persisted reports equal a one-shot build")
+
+
+if __name__ == "__main__":
+    test_gap_kinds()
+    test_incremental_reports_and_store()
+    print("\n✨ Test complete!")
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Test lazy JSON list columns and compressed article bodies in load_csv / save_csv
+"""
+
+import os
+import tempfile
+
+import core
+import pandas as pd
+
+from lazy_columns import CompressedTextDtype, LazyJSONDtype
+
+
+def test_lazy_columns_decode_on_access():
+    print("🧪 Testing lazy list columns...")
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, "links.csv")
+        df = core.init_store()
+        for i in range(3):
+            df = core.append_record(df, {
+                "url": f"https://example.com/{i}",
+                "L1": "Tech", "L2": "GenAI", "L3": ["Agents"],
+                "sequential_paths": [["Agents", "ReAct"]],
+                "knowledge_paths": [["Tech", "GenAI", "Agents", "ReAct"]],
+                "tldr": [f"point {i}"],
+            })
+        core.save_csv(df, path)
+
+        lazy = core.load_csv(path)
+        eager = core.load_csv(path, lazy=False)
+        for col in core.LAZY_JSON_COLUMNS:
+            assert isinstance(lazy[col].dtype, LazyJSONDtype)
+            assert lazy[col].array.n_decoded == 0
+
+        # filtering/copying decodes nothing; reading one cell decodes one cell
+        subset = lazy[lazy["L1"] == "Tech"].copy()
+        assert subset["tldr"].array.n_decoded == 0
+        assert subset["tldr"].iloc[1] == ["point 1"]
+        assert subset["tldr"].array.n_decoded == 1
+        print("✅ Cells decoded only on first access")
+
+        for col in core.JSON_COLUMNS:
+            assert lazy[col].tolist() == eager[col].tolist()
+        assert lazy.iloc[2].to_dict()["knowledge_paths"] == [["Tech", "GenAI", "Agents", "ReAct"]]
+
+        # round-trip through save_csv (undecoded cells written verbatim)
+        lazy2 = core.load_csv(path)
+        lazy2.at[0, "tldr"] = ["edited"]
+        core.save_csv(lazy2, path)
+        back = core.load_csv(path, lazy=False)
+        assert back["tldr"].tolist() == [["edited"], ["point 1"], ["point 2"]]
+        assert back["sequential_paths"].tolist() == eager["sequential_paths"].tolist()
+        print("✅ Lazy columns round-trip through save_csv")
+
+
+def test_content_text_stored_compressed():
+    print("🧪 Testing compressed article bodies...")
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, "links.csv")
+        body = "Retrieval augmented generation grounds answers in documents. " * 200
+        df = core.init_store()
+        df = core.append_record(df, {"url": "https://example.com/1", "content_text": body})
+        df = core.append_record(df, {"url": "https://example.com/2"})
+        core.save_csv(df, path)
+
+        raw = pd.read_csv(path)["content_text"]
+        assert raw[0].startswith("zlib:") and len(raw[0]) < len(body) / 10
+        print("✅ Bodies compressed on disk")
+
+        lazy = core.load_csv(path)
+        assert isinstance(lazy["content_text"].dtype, CompressedTextDtype)
+        before = lazy["content_text"].array.n_decoded
+        assert lazy["content_text"].iloc[0] == body
+        assert lazy["content_text"].array.n_decoded == before  # decompressed copies are not kept
+        assert core.get_cached_row(lazy, "https://example.com/1")["content_text"] == body
+        assert core.load_csv(path, lazy=False)["content_text"].tolist()[0] == body
+
+        # legacy plain-text stores still load and get compressed on next save
+        raw_df = pd.read_csv(path)
+        raw_df.loc[0, "content_text"] = "plain legacy text"
+        raw_df.to_csv(path, index=False)
+        legacy = core.load_csv(path)
+        assert legacy["content_text"].iloc[0] == "plain legacy text"
+        core.save_csv(legacy, path)
+        assert pd.read_csv(path)["content_text"][0].startswith("zlib:")
+
+        report = core.storage_report(path)
+        assert report["rows"] == 2 and report["content_text_plain_bytes"] == len("plain legacy text")
+        print("✅ Transparent decompression and legacy upgrade")
+
+
+if __name__ == "__main__":
+    test_lazy_columns_decode_on_access()
+    test_content_text_stored_compressed()
+    print("\n✨ Test complete!")
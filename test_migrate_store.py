@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Test the chunked v1 -> v2 links store migration
+"""
+
+import os
+import tempfile
+
+import pandas as pd
+
+import core
+import migrate_store
+
+
+def test_migrate_merges_and_dedupes():
+    print("🧪 Testing store migration...")
+    with tempfile.TemporaryDirectory() as tmpdir:
+        v2 = os.path.join(tmpdir, "links_store_v2.csv")
+        v1 = os.path.join(tmpdir, "links_store.csv")
+        df = core.init_store()
+        df = core.append_record(df, {
+            "url": "https://example.com/a", "L1": "Tech", "L2": "GenAI", "L3": ["Agents"],
+            "sequential_paths": [["Agents", "ReAct"]], "content_text": "body a",
+        })
+        core.save_csv(df, v2)
+        pd.DataFrame([
+            {"url": "https://Example.com/a/?utm_source=x", "url_canonical": None, "headline": "dup",
+             "categories": '["AI/ML"]', "tags": '["RAG"]', "tldr": "[]", "content_text": "old a"},
+            {"url": "https://example.com/b", "url_canonical": None, "headline": "B",
+             "categories": '["AI/ML", "Product"]', "tags": '["RAG", "Agents"]', "tldr": '["x"]',
+             "content_text": "body b"},
+            {"url": "https://example.com/b/", "url_canonical": None, "headline": "dup b",
+             "categories": "[]", "tags": "[]", "tldr": "[]", "content_text": None},
+        ]).to_csv(v1, index=False)
+
+        stats = migrate_store.migrate([v2, v1], output=v2, batch_size=1)
+        assert stats[v2] == {"read": 1, "written": 1, "duplicates": 0, "no_url": 0}
+        assert stats[v1] == {"read": 3, "written": 1, "duplicates": 2, "no_url": 0}
+        assert core.store_version(v2) == 2
+        print("✅ Duplicates dropped across files")
+
+        out = core.load_csv(v2, lazy=False)
+        assert out["url_canonical"].tolist() == ["https://example.com/a", "https://example.com/b"]
+        assert out["sequential_paths"].tolist() == [[["Agents", "ReAct"]], []]
+        b = out.iloc[1]
+        assert (b["L1"], b["L3"], b["tldr"], b["content_text"]) == ("AI/ML", ["RAG", "Agents"], ["x"], "body b")
+        assert pd.read_csv(v2)["content_text"].str.startswith("zlib:").all()
+        print("✅ v1 rows converted to L1-L6")
+
+
+if __name__ == "__main__":
+    test_migrate_merges_and_dedupes()
+    print("\n✨ Test complete!")
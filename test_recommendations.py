@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Test the MinHash-LSH related-articles recommender
+"""
+
+import os
+import tempfile
+
+import numpy as np
+
+import core
+from recommendations import RelatedArticles, article_features
+from synthetic import topic_tagged_articles
+
+
+def _jaccard(a, b):
+    return len(a & b) / len(a | b) if a | b else 0.0
+
+
+def test_related_articles_share_topics():
+    print("🧪 Testing LSH candidates and similarity estimates...")
+    df = topic_tagged_articles(2000)
+    index = RelatedArticles.build(df)
+    records = df.to_dict("records")
+    feats = [article_features(r) for r in records]
+    hits = found = 0
+    for article in range(0, 2000, 40):
+        related = index.related(article, k=5)
+        assert all(a != article for a, _ in related)
+        found += len(related)
+        assert [s for _, s in related] == sorted((s for _, s in related), reverse=True)
+        hits += sum(df["topic"].iat[a] == df["topic"].iat[article] for a, _ in related)
+        for a, est in related[:2]:
+            assert abs(est - _jaccard(feats[a], feats[article])) < 0.25
+    assert found > 0.9 * 50 * 5 and hits / found > 0.95
+    assert len(index.candidates(index.signatures[0])) < 0.2 * len(df)   # sublinear: a bucket, not the store
+    assert index.related(0, k=5, min_similarity=1.01) == []
+    probe = dict(records[7], L3=records[7]["L3"][:3])
+    assert 7 in [a for a, _ in index.related_to(probe, k=3)]
+    print(f"✅ {hits / found:.0%} of {found} top-5 recommendations share the topic")
+
+
+def test_incremental_matches_build_and_store():
+    print("🧪 Testing incremental inserts and the store wiring...")
+    df = topic_tagged_articles(300, seed=1)
+    index = RelatedArticles.build(df.iloc[:100])
+    index.related(0)                                   # bucket tables over the first 100 rows
+    index.extend(df.iloc[:250])
+    index.extend(df)                                   # later rows are found by the recent-row scan
+    full = RelatedArticles.build(df)
+    assert (index.signatures == full.signatures).all() and (index.band_keys == full.band_keys).all()
+    assert all(np.array_equal(index.candidates(full.signatures[a]), full.candidates(full.signatures[a]))
+               for a in range(0, len(df), 7))
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, "links.csv")
+        core.save_csv(core.init_store(), path)
+        store = core.load_csv(path)
+        few_topics = df[df["topic"] < 3].iloc[:30]
+        for rec in few_topics.to_dict("records"):
+            rec["url"] = rec.pop("url_canonical")
+            store = core.append_record(store, rec)
+            core.save_csv(store, path)
+            core.sync_store_index(RelatedArticles, store, path)
+        first = few_topics["url_canonical"].iat[0]
+        related = core.related_articles(store, first, k=3, path=path)
+        assert len(related) and "similarity" in related.columns
+        assert first not in related["url"].tolist()
+        assert core.related_articles(store, "https://example.com/missing", path=path).empty
+
+        core._STORE_INDEX_CACHE.clear()
+        stored = core.load_store_index(RelatedArticles, path)
+        assert isinstance(stored.signatures, np.memmap) and stored.n_rows == len(few_topics)
+        assert os.path.getsize(core._store_index_path(path, "related")) < 4096  # arrays live in side files
+        assert stored.related(0, k=3) == RelatedArticles.build(store).related(0, k=3)
+    print("✅ Incremental signatures and buckets equal a rebuild; related_articles returns rows")
+
+
+if __name__ == "__main__":
+    test_related_articles_share_topics()
+    test_incremental_matches_build_and_store()
+    print("\n✨ Test complete!")
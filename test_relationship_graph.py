@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Test the store-wide relationship graph against the per-article relationships
+"""
+
+import os
+import tempfile
+
+import numpy as np
+
+import core
+from relationship_graph import RelationshipGraph
+from synthetic import articles
+
+PATHS = [
+    [["Machine Learning", "Model Deployment", "Docker", "Kubernetes"], ["Machine Learning", "Evaluation"]],
+    [["Machine Learning", "Model Deployment", "Serving"], ["Statistics", "Evaluation"]],
+    [["Machine Learning", "Model Deployment", "Docker"]],
+    [],
+]
+
+
+def _store(paths_per_article):
+    return articles(len(paths_per_article), sequential_paths=paths_per_article)
+
+
+def test_graph_matches_per_article_relationships():
+    print("🧪 Testing aggregated edges and weights...")
+    graph = RelationshipGraph.build(_store(PATHS))
+    expected = {"L3_to_L4": {}, "L4_to_L5": {}, "L5_to_L6": {}}
+    for paths in PATHS:
+        rel = core.process_sequential_paths_with_relationships("Tech", "AI", paths)[5]
+        for key, level in rel.items():
+            for parent, children in level.items():
+                expected[key].setdefault(parent, set()).update(children)
+    assert graph.relationships() == {k: {p: sorted(c) for p, c in v.items()} for k, v in expected.items()}
+
+    ml = graph.node("L3", "Machine Learning")
+    assert graph.children(ml) == [("Model Deployment", 3), ("Evaluation", 1)]
+    assert graph.parents(graph.node("L4", "Evaluation")) == [("Machine Learning", 1), ("Statistics", 1)]
+    assert graph.node_weight[ml] == 3
+    under = graph.descendants(["Machine Learning", "Model Deployment"])
+    assert under == {"L5": {"Docker": 2, "Serving": 1}, "L6": {"Kubernetes": 1}}
+    assert graph.descendants(["Machine Learning", "Docker"]) == {}  # no such edge
+    print("✅ Edges, weights, parents and descendant walks are correct")
+
+
+def test_incremental_merge_matches_rebuild():
+    print("🧪 Testing per-ingest edge merges...")
+    rng = np.random.default_rng(1)
+    tags = [f"t{i}" for i in range(40)]
+    paths = [[[tags[j] for j in rng.integers(0, 40, rng.integers(1, 5))] for _ in range(rng.integers(0, 4))]
+             for _ in range(300)]
+    df = _store(paths)
+    graph = RelationshipGraph.build(df.iloc[:10])
+    for stop in range(11, len(df) + 1, 7):
+        graph.extend(df.iloc[:stop])
+    graph.extend(df)
+    full = RelationshipGraph.build(df)
+    assert graph.relationships() == full.relationships()
+    for label in tags[:10]:
+        a, b = graph.node("L3", label), full.node("L3", label)
+        if a is not None:
+            assert graph.children(a) == full.children(b)
+            assert graph.descendants([label]) == full.descendants([label])
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, "links.csv")
+        core.save_csv(core.init_store(), path)
+        store = core.load_csv(path)
+        for i, p in enumerate(PATHS):
+            store = core.append_record(store, {"url": f"https://example.com/{i}", "sequential_paths": p})
+            core.save_csv(store, path)
+            core.relationship_graph(store, path)
+        core._STORE_INDEX_CACHE.clear()
+        stored = core.load_store_index(RelationshipGraph, path)
+        assert stored.n_rows == len(PATHS) and stored.relationships() == RelationshipGraph.build(_store(PATHS)).relationships()
+    print("✅ Merged graph equals a rebuild and is persisted per write")
+
+
+if __name__ == "__main__":
+    test_graph_matches_per_article_relationships()
+    test_incremental_merge_matches_rebuild()
+    print("\n✨ Test complete!")
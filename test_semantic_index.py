@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Test the hashed n-gram vectorizer and the IVF nearest-neighbor index
+"""
+
+import os
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+import core
+from semantic_index import SemanticIndex
+from synthetic import topic_text_articles
+
+
+def _exact(index, article, k):
+    sims = np.asarray(index.vectors) @ np.asarray(index.vectors[article])
+    sims[article] = -1
+    return set(np.argsort(-sims, kind="stable")[:k].tolist())
+
+
+def test_neighbors_share_topics_and_ivf_recall():
+    print("🧪 Testing neighbor quality and IVF recall...")
+    df = topic_text_articles(6000)
+    index = SemanticIndex.build(df)
+    assert index.centroids is not None and index.lists.max() < len(index.centroids)
+    same = recall = total = 0
+    for article in range(0, 6000, 60):
+        hits = index.similar(article, k=10)
+        assert article not in [a for a, _ in hits]
+        assert [s for _, s in hits] == sorted((s for _, s in hits), reverse=True)
+        same += sum(df["topic"].iat[a] == df["topic"].iat[article] for a, _ in hits)
+        recall += len({a for a, _ in hits} & _exact(index, article, 10))
+        total += 10
+    print(f"   topic precision {same / total:.0%}, IVF recall@10 {recall / total:.0%}")
+    assert same / total > 0.95 and recall / total > 0.8
+    query = " ".join(f"t7x{j}" for j in range(20))
+    assert all(df["topic"].iat[a] == 7 for a, _ in index.search(query, k=5))
+    assert index.search("") == [] and index.search("the and of") == []
+    print("✅ Neighbors share their topic; probing a few lists finds most exact neighbors")
+
+
+def test_incremental_persist_and_svd():
+    print("🧪 Testing incremental inserts, memmapped persistence and SVD reduction...")
+    df = topic_text_articles(2500, seed=1)
+    full = SemanticIndex.build(df)
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, "links.csv")
+        for stop in (500, 1999, 2000, 2001, 2500):  # IVF trained at 2000, then appended to
+            core.sync_store_index(SemanticIndex, df.iloc[:stop], path)
+        core._STORE_INDEX_CACHE.clear()
+        stored = core.load_store_index(SemanticIndex, path)
+        assert isinstance(stored.vectors, np.memmap) and stored.n_rows == 2500
+        assert np.allclose(np.asarray(stored.vectors), full.vectors, atol=1e-6)
+        assert stored.trained_at == 2000 and len(stored.lists) == 2500
+        assert stored.similar(5, k=5)[0][0] in _exact(stored, 5, 5)
+        stored.extend(pd.concat([df, topic_text_articles(100, seed=3)], ignore_index=True))
+        ptr, rows = stored._list_rows()                      # grown by the appended assignments
+        assert rows.tolist() == np.argsort(stored.lists, kind="stable").tolist()
+        assert (np.diff(ptr) == np.bincount(stored.lists, minlength=len(stored.centroids))).all()
+
+        store = core.init_store()
+        for rec in df.iloc[:20].to_dict("records"):
+            rec["url"] = rec.pop("url_canonical")
+            store = core.append_record(store, rec)
+        core.save_csv(store, path)
+        first = df["url_canonical"].iat[0]
+        similar = core.similar_articles(store, first, k=3, path=path)
+        assert len(similar) == 3 and first not in similar["url"].tolist()
+        text = df["content_text"].iat[4]
+        assert core.semantic_search(store, text, k=1, path=path)["url"].iat[0] == df["url_canonical"].iat[4]
+
+    reduced = SemanticIndex(svd_dims=64)
+    reduced.extend(df)
+    assert reduced.dims == 64 and reduced.vectors.shape == (2500, 64) and reduced.centroids.shape[1] == 64
+    hits = reduced.similar(0, k=10)
+    assert np.mean([df["topic"].iat[a] == df["topic"].iat[0] for a, _ in hits]) > 0.9
+    print("✅ Appended vectors equal a rebuild; SVD-reduced neighbors keep their topic")
+
+
+if __name__ == "__main__":
+    test_neighbors_share_topics_and_ivf_recall()
+    test_incremental_persist_and_svd()
+    print("\n✨ Test complete!")
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Test the binary snapshot cache behind load_csv / _ensure_cards_csv
+"""
+
+import os
+import tempfile
+
+import pandas as pd
+
+import core
+
+
+def test_links_snapshot_written_and_validated():
+    print("🧪 Testing links snapshot...")
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, "links.csv")
+        df = core.append_record(core.init_store(), {"url": "https://example.com/a", "headline": "A", "L3": ["Agents"], "tldr": ["t"]})
+        core.save_csv(df, path)
+        snap = core._snapshot_path(path)
+        assert snap.exists()
+
+        # a hit never touches the CSV parser
+        parse = core._parse_links_csv
+        core._parse_links_csv = None
+        try:
+            loaded = core.load_csv(path)
+        finally:
+            core._parse_links_csv = parse
+        assert loaded["L3"].tolist() == [["Agents"]] and loaded["tldr"].iloc[0] == ["t"]
+        assert core.load_csv(path, lazy=False)["tldr"].tolist() == [["t"]]
+        print("✅ Snapshot loaded without parsing the CSV")
+
+        # an external edit (same version, different bytes) invalidates it
+        raw = pd.read_csv(path)
+        raw.loc[0, "headline"] = "edited outside"
+        raw.to_csv(path, index=False)
+        assert core.load_csv(path)["headline"].iloc[0] == "edited outside"
+        # ...and the fresh snapshot written on that load is used next time
+        assert core._load_snapshot(path, core.store_version(path))[0] is not None
+
+        # a touched but unchanged file is still accepted through the checksum
+        os.utime(path, ns=(0, 0))
+        assert core._load_snapshot(path, core.store_version(path))[0] is not None
+
+        snap.write_bytes(b"garbage")
+        assert core.load_csv(path)["headline"].iloc[0] == "edited outside"
+        print("✅ Stale or corrupt snapshots fall back to the CSV")
+
+
+def test_cards_snapshot_keeps_event_log_on_top():
+    print("🧪 Testing cards snapshot...")
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, "cards_store.csv")
+        df = core._ensure_cards_csv(path)
+        added = pd.DataFrame([
+            {"card_id": "c1", "url_canonical": "https://x.com/1", "question": "Q", "answer": "A",
+             "learned": False, "created_at_utc": "2025-01-01T00:00:00Z"},
+        ])
+        core._save_cards_df(pd.concat([df, added], ignore_index=True), path, appended=added)
+        assert core._load_snapshot(path, core.store_version(path))[0] is not None
+
+        old_path = core.CARDS_CSV
+        core.CARDS_CSV = path
+        try:
+            core.mark_card_status("c1", True)
+        finally:
+            core.CARDS_CSV = old_path
+        assert core._ensure_cards_csv(path)["learned"].tolist() == [True]
+        print("✅ Learned events applied over the snapshot")
+
+
+if __name__ == "__main__":
+    test_links_snapshot_written_and_validated()
+    test_cards_snapshot_keeps_event_log_on_top()
+    print("\n✨ Test complete!")
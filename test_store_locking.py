@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Test locked, atomic, version-checked store writes with concurrent writers
+"""
+
+import os
+import tempfile
+import multiprocessing as mp
+
+import core
+
+
+def _writer(path: str, worker: int, n: int) -> None:
+    for i in range(n):
+        df = core.load_csv(path)
+        while True:
+            try:
+                core.save_csv(core.append_record(df, {"url": f"https://example.com/{worker}/{i}"}), path)
+                break
+            except core.StoreConflictError:
+                df = core.load_csv(path)
+
+
+def test_stale_frame_is_rejected():
+    print("🧪 Testing optimistic version check...")
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, "links.csv")
+        core.save_csv(core.init_store(), path)
+        a = core.load_csv(path)
+        b = core.load_csv(path)
+        core.save_csv(core.append_record(a, {"url": "https://example.com/a"}), path)
+        try:
+            core.save_csv(core.append_record(b, {"url": "https://example.com/b"}), path)
+            raise AssertionError("stale write was accepted")
+        except core.StoreConflictError:
+            pass
+        assert core.load_csv(path)["url"].tolist() == ["https://example.com/a"]
+        assert core.store_version(path) == 2
+        assert not [f for f in os.listdir(tmpdir) if f.endswith(".tmp")]
+        print("✅ Stale frame rejected, no temp files left behind")
+
+
+def test_concurrent_writers_lose_nothing():
+    print("🧪 Testing concurrent writers...")
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, "links.csv")
+        core.save_csv(core.init_store(), path)
+        ctx = mp.get_context("spawn")
+        procs = [ctx.Process(target=_writer, args=(path, w, 5)) for w in range(4)]
+        for p in procs:
+            p.start()
+        for p in procs:
+            p.join(120)
+            assert p.exitcode == 0
+        df = core.load_csv(path)
+        assert len(df) == 20 and df["url"].nunique() == 20
+        print(f"✅ {len(df)} rows committed by 4 processes")
+
+
+if __name__ == "__main__":
+    test_stale_frame_is_rejected()
+    test_concurrent_writers_lose_nothing()
+    print("\n✨ Test complete!")
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Test interned tag postings and vectorized any/all filters
+"""
+
+import os
+import tempfile
+import threading
+
+import numpy as np
+import pandas as pd
+
+import core
+from synthetic import tagged_articles
+from tag_index import TagIndex
+
+
+def _reference(df: pd.DataFrame, level: str, tags, mode: str) -> np.ndarray:
+    wanted = set(tags)
+    cells = [set(v) if isinstance(v, list) else ({v} if isinstance(v, str) else set()) for v in df[level]]
+    if mode == "any":
+        return np.array([bool(c & wanted) for c in cells])
+    return np.array([wanted <= c for c in cells])
+
+
+def test_masks_match_python_filters():
+    print("🧪 Testing any/all masks against plain Python filtering...")
+    df = tagged_articles(3000)
+    index = TagIndex.build(df)
+    for level, tags in (("L1", ["domain1", "domain5"]), ("L2", ["category3"]), ("L3", ["tag7", "tag9", "tag11"]),
+                        ("L3", ["tag1", "missing"]), ("L2", [])):
+        for mode in ("any", "all"):
+            assert (index.mask(level, tags, mode) == _reference(df, level, tags, mode)).all(), (level, tags, mode)
+    both = index.filter({"L1": ["domain2"], "L3": ["tag5", "tag6"]})
+    assert (both == _reference(df, "L1", ["domain2"], "any") & _reference(df, "L3", ["tag5", "tag6"], "any")).all()
+    assert index.filter({"L1": [], "L2": []}).all()
+    row = int(np.flatnonzero(df["L3"].map(len) > 0)[0])
+    assert set(index.tags_of("L3", row)) == set(df["L3"].iat[row])
+    assert sum(index.counts("L1").values()) == len(df)
+    assert [t for t, _ in index.options("L2")] == sorted(index.counts("L2"))
+    rows = index.rows_matching({"L1": ["domain2"], "L3": ["tag5", "tag6"]})
+    assert (np.diff(rows) > 0).all() and rows.tolist() == np.flatnonzero(both).tolist()
+    print("✅ Masks, filter, tags_of and counts agree with the Python reference")
+
+
+def test_append_matches_rebuild():
+    print("🧪 Testing incremental append...")
+    df = tagged_articles(500)
+    index = TagIndex.build(df.iloc[:400]).appended(df)
+    full = TagIndex.build(df)
+    stepped = TagIndex.build(df.iloc[:1])
+    for stop in (2, 3, 50, 51, 300, 500):
+        stepped.extend(df.iloc[:stop])
+    for level in ("L1", "L2", "L3"):
+        assert all(sorted(stepped.tags_of(level, row)) == sorted(full.tags_of(level, row)) for row in range(len(df)))
+        assert all(np.array_equal(stepped.rows_with(level, t), full.rows_with(level, t)) for t in full.counts(level))
+        assert index.counts(level) == full.counts(level)
+        assert (index.mask(level, ["tag3", "domain3", "category3"]) == full.mask(level, ["tag3", "domain3", "category3"])).all()
+
+    store = core.init_store()
+    store = core.append_record(store, {"url": "https://example.com/a", "L1": "Tech", "L3": ["python"]})
+    first = core.tag_index(store)
+    store = core.append_record(store, {"url": "https://example.com/b", "L1": "Science", "L3": ["python", "stats"]})
+    second = core.tag_index(store)
+    assert second is not first and second.n_rows == 2
+    assert second.mask("L3", ["python", "stats"], "all").tolist() == [False, True]
+    assert second.mask("L1", ["Tech"]).tolist() == [True, False]
+    print("✅ Appended index equals a full rebuild; append_record hands it over")
+
+
+def test_persisted_index_synced_on_write():
+    print("🧪 Testing the persisted tag index...")
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, "links.csv")
+        core.save_csv(core.init_store(), path)
+        df = core.load_csv(path)
+        for i, (l1, l3) in enumerate([("Tech", ["python"]), ("Tech", ["rust"]), ("Science", ["python", "stats"])]):
+            df = core.append_record(df, {"url": f"https://example.com/{i}", "L1": l1, "L3": l3})
+            core.save_csv(df, path)
+            for cls in core.STORE_INDEX_TYPES:
+                core.sync_store_index(cls, df, path)
+        core._STORE_INDEX_CACHE.clear()
+        stored = core.load_store_index(TagIndex, path)
+        assert stored.n_rows == 3 and stored.options("L3") == [("python", 2), ("rust", 1), ("stats", 1)]
+
+        fresh = core.load_csv(path)
+        index = core.tag_index(fresh, path)
+        assert index is stored  # reused, not rebuilt
+
+        # a current index is read without the store lock, so readers don't queue behind a writer
+        held, reads = threading.Event(), []
+        release = threading.Event()
+
+        def writer():
+            with core.store_lock(path):
+                held.set()
+                release.wait(10)
+
+        thread = threading.Thread(target=writer)
+        thread.start()
+        held.wait(10)
+        reader = threading.Thread(target=lambda: reads.append(core.sync_store_index(TagIndex, fresh, path)))
+        reader.start()
+        reader.join(5)
+        blocked = reader.is_alive()
+        release.set()
+        thread.join()
+        reader.join()
+        assert not blocked and reads == [stored]
+        assert index.rows_matching({"L1": ["Tech"], "L3": ["python"]}).tolist() == [0]
+        assert index.rows_matching({"L3": ["python", "stats"]}, mode="all").tolist() == [2]
+    print("✅ Index persisted per write and reused by readers")
+
+
+def test_rebuilt_when_synonyms_change():
+    print("🧪 Testing the persisted index after a tag-synonym map change...")
+    saved = core.TAG_SYNONYMS_PATH
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, "links.csv")
+        core.TAG_SYNONYMS_PATH = os.path.join(tmpdir, "tag_synonyms.json")
+        try:
+            df = core.init_store()
+            for i, l4 in enumerate(["Cross-Thread Memory", "Long-term Memory"]):
+                df = core.append_record(df, {"url": f"https://example.com/{i}", "L1": "Tech", "L4": [l4]})
+            core.save_csv(df, path)
+            assert core.tag_index(core.load_csv(path), path).options("L4") == \
+                [("Cross-Thread Memory", 1), ("Long-term Memory", 1)]
+
+            core.save_tag_synonyms({"Cross-Thread Memory": "Long-term Memory"})
+            index = core.tag_index(core.load_csv(path), path)
+            assert index.options("L4") == [("Long-term Memory", 2)]
+            core._STORE_INDEX_CACHE.clear()
+            assert core.load_store_index(TagIndex, path).tag_synonyms == core.tag_synonyms_signature()
+        finally:
+            core.TAG_SYNONYMS_PATH = saved
+    print("✅ A changed synonym map rebuilds the persisted index")
+
+
+def test_filter_matches_pandas():
+    print("🧪 Testing a three-level filter against the pandas filter...")
+    df = tagged_articles(3000)
+    index = TagIndex.build(df)
+    selection = {"L1": ["domain1", "domain4"], "L2": ["category3", "category8"],
+                 "L3": [f"tag{i}" for i in range(0, 2000, 10)]}
+    expected = (df["L1"].isin(selection["L1"]) & df["L2"].isin(selection["L2"])
+                & df["L3"].map(lambda c: any(t in c for t in selection["L3"])))
+    assert expected.any() and (index.filter(selection) == expected.to_numpy()).all()
+    print("✅ Indexed filter equals the pandas filter")
+
+
+if __name__ == "__main__":
+    test_masks_match_python_filters()
+    test_append_matches_rebuild()
+    test_persisted_index_synced_on_write()
+    test_rebuilt_when_synonyms_change()
+    test_filter_matches_pandas()
+    print("\n✨ Test complete!")
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Test tag synonym clustering and the canonical-tag map applied on load
+"""
+
+import contextlib
+import os
+import pickle
+import tempfile
+
+import core
+import tag_synonyms
+
+
+def test_clusters_near_duplicates():
+    print("🧪 Testing tag clustering...")
+    counts = {"Machine Learning": 5, "machine-learning": 2, "ML": 1, "Vector Databases": 3,
+              "Vector Database": 1, "Kubernetes": 4, "Prompt Engineering": 2}
+    mapping = tag_synonyms.build_synonym_map(counts, block=2)  # tiny blocks exercise the blocking
+    assert mapping == {"machine-learning": "Machine Learning", "ML": "Machine Learning",
+                       "Vector Database": "Vector Databases"}
+
+    counts = {"Go": 3, "Graph Optimization": 2, "Risk": 4, "Real Internet Security Kit": 1,
+              "API": 9, "App Performance Index": 2, "React": 5, "ReAct": 3, "REACT": 1, "ml": 1, "Machine Learning": 2}
+    assert tag_synonyms.build_synonym_map(counts) == {"REACT": "React"}
+    print("✅ Spelling variants, acronyms and near-duplicates merged; words, rare expansions and ReAct kept apart")
+
+
+def test_map_applied_on_load_and_ingest():
+    print("🧪 Testing canonical tags on load...")
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, "links.csv")
+        syn_path = os.path.join(tmpdir, "tag_synonyms.json")
+        df = core.append_record(core.init_store(), {
+            "url": "https://example.com/1", "L1": "Tech", "L2": "AI", "L3": ["ML", "Machine Learning"],
+            "sequential_paths": [["ML", "Evaluation"]],
+            "knowledge_paths": [["Tech", "AI", "ML", "Evaluation"]],
+        })
+        core.save_csv(df, path)
+        assert tag_synonyms.collect_tags(path) == {"ML": 1, "Machine Learning": 1, "Evaluation": 1}
+
+        core.save_tag_synonyms({"ML": "Machine Learning"}, syn_path)
+        synonyms = core.load_tag_synonyms(syn_path)
+        loaded = core.apply_tag_synonyms(core.load_csv(path), synonyms)
+        assert loaded["L3"].tolist() == [["Machine Learning"]]
+        assert loaded["sequential_paths"].array.n_decoded == 0  # mapped lazily
+        assert loaded["sequential_paths"].iloc[0] == [["Machine Learning", "Evaluation"]]
+        assert loaded["knowledge_paths"].iloc[0] == [["Tech", "AI", "Machine Learning", "Evaluation"]]
+        assert core.canonical_paths([["ML"], ["Machine Learning", "ML"]], synonyms) == \
+            [["Machine Learning"], ["Machine Learning"]]
+        print("✅ Map applied to L3-L6 and (lazily) to paths")
+
+
+def test_canonical_tags_kept_in_snapshot():
+    print("🧪 Testing canonical tags baked into the snapshot per map version...")
+    with tempfile.TemporaryDirectory() as tmpdir, _synonyms_at(os.path.join(tmpdir, "tag_synonyms.json")):
+        path = os.path.join(tmpdir, "links.csv")
+        df = core.init_store()
+        for i, tags in enumerate([["ML"], ["Evaluation"], ["ML", "Machine Learning"]]):
+            df = core.append_record(df, {"url": f"https://example.com/{i}", "L3": tags,
+                                         "sequential_paths": [[t] for t in tags]})
+        core.save_csv(df, path)
+        assert core.load_csv(path)["L3"].tolist() == [["ML"], ["Evaluation"], ["ML", "Machine Learning"]]
+
+        core.save_tag_synonyms({"ML": "Machine Learning"})      # default path resolved at call time
+        loaded = core.load_csv(path)
+        assert loaded["L3"].tolist() == [["Machine Learning"], ["Evaluation"], ["Machine Learning"]]
+        assert loaded["sequential_paths"].iloc[0] == [["Machine Learning"]]
+        with open(core._snapshot_path(path), "rb") as f:
+            snap = pickle.load(f)
+        assert snap["tags"][0] == core.tag_synonyms_signature()
+        assert {col: cells for col, cells in snap["tags"][1].items() if cells} == \
+            {"L3": {0: ["Machine Learning"], 2: ["Machine Learning"]}}
+        assert snap["frame"]["L3"].tolist()[0] == ["ML"]  # the cached frame keeps the stored strings
+
+        core.save_tag_synonyms({"Evaluation": "Evals"})
+        assert core.load_csv(path)["L3"].tolist() == [["ML"], ["Evals"], ["ML", "Machine Learning"]]
+    print("✅ Loads reuse the snapshot's canonical cells until the map changes")
+
+
+@contextlib.contextmanager
+def _synonyms_at(path):
+    saved, core.TAG_SYNONYMS_PATH = core.TAG_SYNONYMS_PATH, path
+    try:
+        yield
+    finally:
+        core.TAG_SYNONYMS_PATH = saved
+
+
+if __name__ == "__main__":
+    test_clusters_near_duplicates()
+    test_map_applied_on_load_and_ingest()
+    test_canonical_tags_kept_in_snapshot()
+    print("\n✨ Test complete!")
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Test the indexed TaxonomyMatcher behind update_matches against a linear scan
+"""
+
+import random
+
+import core
+
+
+def _scan_match(candidate, allowed):
+    """Reference: the original exact-then-substring scan over the allowed list"""
+    allowed_norm = {core._normalize_token(a): a for a in allowed}
+    c = core._normalize_token(candidate)
+    if c in allowed_norm:
+        return allowed_norm[c]
+    for a_norm, raw in allowed_norm.items():
+        if c in a_norm or a_norm in c:
+            return raw
+    return None
+
+
+def test_matcher_agrees_with_linear_scan():
+    print("🧪 Testing matcher against linear scan...")
+    rng = random.Random(7)
+    words = ["rag", "llm", "agents", "vector", "db", "prompt", "eval", "graph", "lang", "memory", "ai", "ml"]
+    allowed = [" ".join(rng.sample(words, rng.randint(1, 3))).title() for _ in range(300)]
+    matcher = core.TaxonomyMatcher(allowed)
+    for _ in range(2000):
+        cand = " ".join(rng.sample(words, rng.randint(1, 4)))
+        if rng.random() < 0.3:
+            cand = cand[rng.randint(0, 2):]  # partial words
+        if not cand.strip():
+            continue  # update_matches skips blank candidates
+        assert matcher.match(cand) == _scan_match(cand, allowed), cand
+    print("✅ 2000 random candidates resolved identically")
+
+
+def test_update_matches_grows_index():
+    print("🧪 Testing update_matches...")
+    allowed = ["Machine Learning", "RAG"]
+    matches, updated = core.update_matches(["machine  learning", "Retrieval", "LangGraph Agents"], allowed, 5)
+    assert matches == ["Machine Learning", "Retrieval", "LangGraph Agents"]
+    assert updated == ["Machine Learning", "RAG", "Retrieval", "LangGraph Agents"]
+
+    # the matcher is kept for the list and extended as terms are appended
+    allowed.extend(updated[2:])
+    matcher = core._matcher_for(allowed)
+    assert matcher.terms == allowed
+    assert core.update_matches(["langgraph"], allowed, 5)[0] == ["LangGraph Agents"]
+    assert core._matcher_for(allowed) is matcher
+    assert core.update_matches(["a", "b", "c"], ["x"], 2)[0] == ["a", "b"]
+    print("✅ New terms appended and indexed incrementally")
+
+
+if __name__ == "__main__":
+    test_matcher_agrees_with_linear_scan()
+    test_update_matches_grows_index()
+    print("\n✨ Test complete!")
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Test the journaled TaxonomyService (vocabulary growth, usage counts, compaction)
+"""
+
+import json
+import os
+import tempfile
+import multiprocessing as mp
+
+import core
+
+
+def _recorder(path: str, worker: int, n: int) -> None:
+    service = core.TaxonomyService(path)
+    for i in range(n):
+        service.record(categories=["Tech"], tags=[f"tag-{worker}-{i}", "shared"])
+
+
+def test_record_refresh_and_compact():
+    print("🧪 Testing taxonomy journal...")
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, "taxonomy.json")
+        a, b = core.TaxonomyService(path), core.TaxonomyService(path)  # two "processes"
+        a.record(categories=["Tech", "GenAI"], tags=["RAG", "Agents"])
+        a.record(categories=["Tech"], tags=["RAG"])
+        assert not os.path.exists(path)  # nothing rewritten yet
+        assert b.tags == ["RAG", "Agents"] and b.categories == ["Tech", "GenAI"]
+        assert b.usage("tags") == {"RAG": 2, "Agents": 1}
+        print("✅ Appends visible to other instances")
+
+        a.compact()
+        data = json.load(open(path, encoding="utf-8"))
+        assert data["tags"] == ["RAG", "Agents"] and data["counts"]["categories"] == {"Tech": 2, "GenAI": 1}
+        b.record(tags=["Agents", "Memory"])
+        assert a.usage("tags") == {"RAG": 2, "Agents": 2, "Memory": 1}
+        assert a.tags == ["RAG", "Agents", "Memory"]
+
+        # crash after the JSON commit but before the journal reset: nothing is counted twice
+        gen = json.load(open(path, encoding="utf-8"))["journal_gen"]
+        stale = open(core._taxonomy_journal_path(path), encoding="utf-8").read()
+        a.compact()
+        with open(core._taxonomy_journal_path(path), "w", encoding="utf-8") as f:
+            f.write(stale)
+        assert json.loads(stale.splitlines()[0])["gen"] == gen
+        assert core.TaxonomyService(path).usage("tags") == {"RAG": 2, "Agents": 2, "Memory": 1}
+        print("✅ Compaction folds the journal exactly once")
+
+        assert core.load_taxonomy(path)["tags"] == ["RAG", "Agents", "Memory"]
+        core.save_taxonomy(["Tech"], ["RAG"], path)
+        assert core.TaxonomyService(path).usage("tags") == {"RAG": 2}
+
+
+def test_concurrent_recorders():
+    print("🧪 Testing concurrent taxonomy writers...")
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, "taxonomy.json")
+        os.environ["TAXONOMY_JOURNAL_COMPACT_BYTES"] = "300"  # children compact every few records
+        ctx = mp.get_context("spawn")
+        procs = [ctx.Process(target=_recorder, args=(path, w, 10)) for w in range(4)]
+        try:
+            for p in procs:
+                p.start()
+            for p in procs:
+                p.join(120)
+                assert p.exitcode == 0
+        finally:
+            del os.environ["TAXONOMY_JOURNAL_COMPACT_BYTES"]
+        assert json.load(open(path, encoding="utf-8"))["journal_gen"] > 1
+        service = core.TaxonomyService(path)
+        assert service.usage("tags")["shared"] == 40 and service.usage("categories") == {"Tech": 40}
+        assert len(service.tags) == 41
+        print("✅ 40 records from 4 processes, no lost updates")
+
+
+def test_shortlist_ranks_by_domain_title_and_popularity():
+    print("🧪 Testing prompt shortlist...")
+    with tempfile.TemporaryDirectory() as tmpdir:
+        service = core.TaxonomyService(os.path.join(tmpdir, "taxonomy.json"))
+        service.record(tags=[f"Filler Term {i}" for i in range(500)])
+        for _ in range(5):
+            service.record(tags=["Popular"], domain="news.example.com")
+        service.record(tags=["Kubernetes Operators"], domain="www.k8s.io")
+
+        ranked = service.shortlist("tags", domain="k8s.io", title="Writing Kubernetes controllers")
+        assert ranked[:2] == ["Kubernetes Operators", "Popular"]
+        assert sum(core._estimate_tokens(t) for t in ranked) <= core.PROMPT_TAG_TOKENS
+        assert len(ranked) < 200  # was allowed_tags[:200]
+        assert service.shortlist("tags", max_tokens=10) == ["Popular", "Filler Term 0"]  # ties: vocabulary order
+        service.compact()
+        assert core.TaxonomyService(service.path).shortlist("tags", domain="k8s.io", max_terms=1) == ["Kubernetes Operators"]
+        print("✅ Shortlist ranked and within the token budget")
+
+
+def test_ingest_grows_vocabulary():
+    print("🧪 Testing ingest_or_fetch taxonomy update...")
+    page = core.PageContent(url="https://example.com/rag", domain="example.com", title="RAG",
+                            author=None, publish_date=None, text="x" * 500, html_len=500, text_len=500)
+    llm = {"title": "RAG", "L1": "Tech", "L2": "GenAI", "tldr": ["t"],
+           "sequential_paths": [["RAG", "Retrieval"], ["Agents"]]}
+    old = core.extract_readable_text, core.analyze_link_with_web_tool
+    core.extract_readable_text = lambda url: page
+    core.analyze_link_with_web_tool = lambda *a: llm
+    try:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            tax_path = os.path.join(tmpdir, "taxonomy.json")
+            csv_path = os.path.join(tmpdir, "links.csv")
+            rec, row, df = core.ingest_or_fetch("https://example.com/rag", tax_path, csv_path)
+            service = core.taxonomy_service(tax_path)
+            assert service.categories == ["Tech", "GenAI"]
+            assert sorted(service.tags) == ["Agents", "RAG", "Retrieval"]
+            assert rec["_taxonomy"]["updated_tags"] == rec["_taxonomy"]["matched_tags"]
+            assert rec["_taxonomy"]["prompt_tags"] == []  # empty vocabulary before this ingest
+            assert service.shortlist("categories", domain="example.com") == ["Tech", "GenAI"]
+    finally:
+        core.extract_readable_text, core.analyze_link_with_web_tool = old
+    print("✅ Vocabulary grows with each ingest")
+
+
+if __name__ == "__main__":
+    test_record_refresh_and_compact()
+    test_concurrent_recorders()
+    test_shortlist_ranks_by_domain_title_and_popularity()
+    test_ingest_grows_vocabulary()
+    print("\n✨ Test complete!")
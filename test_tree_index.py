@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+Test the persisted knowledge tree index and its incremental updates
+"""
+
+import os
+import json
+import tempfile
+
+import numpy as np
+
+import core
+import tree_utils
+from tree_utils import KnowledgeTree, filter_articles_by_tree_node
+
+ARTICLES = [
+    ("https://example.com/1", "Tech", "AI", [["ML", "Deep Learning", "CNN"], ["ML", "Ethics"]]),
+    ("https://example.com/2", "Tech", "AI", [["ML", "Deep Learning", "RNN"]]),
+    ("https://example.com/3", "Tech", "Web", [["CSS"]]),
+    ("https://example.com/4", "Science", None, []),
+    ("https://example.com/5", None, None, [["Orphan"]]),
+]
+
+
+def _store(rows):
+    df = core.init_store()
+    for url, l1, l2, paths in rows:
+        df = core.append_record(df, {"url": url, "L1": l1, "L2": l2, "sequential_paths": paths})
+    return df
+
+
+def test_tree_structure():
+    print("🧪 Testing tree nodes, counts and postings...")
+    df = _store(ARTICLES)
+    tree = KnowledgeTree.build(df)
+    assert [tree.label(r) for r in tree.roots] == ["Tech", "Science"]
+    ml = tree.find(["Tech", "AI", "ML"])
+    assert tree.count(ml) == 2 and tree.rows(ml).tolist() == [0, 1]  # article 0 counted once
+    assert tree.level(ml) == "L3" and tree.path(ml) == ["Tech", "AI", "ML"]
+    assert [tree.label(c) for c in tree.child_ids(ml)] == ["Deep Learning", "Ethics"]
+    assert tree.find(["Tech", "AI", "Missing"]) is None
+    assert tree.count(0) == 4  # article without L1 left out
+    sub = tree.to_dict(tree.find(["Tech"]), max_depth=1)
+    assert [(c["label"], c["count"], c["children"]) for c in sub["children"]] == [("AI", 2, []), ("Web", 1, [])]
+    picked = filter_articles_by_tree_node(df, ["Tech", "AI", "ML", "Deep Learning", "RNN"], tree)
+    assert picked["url"].tolist() == ["https://example.com/2"]
+    print("✅ Counts, children order, breadcrumbs and click-to-filter are correct")
+
+
+def test_incremental_sync_matches_rebuild():
+    print("🧪 Testing persisted tree extended per append...")
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, "links.csv")
+        core.save_csv(core.init_store(), path)
+        df = core.load_csv(path)
+        for url, l1, l2, paths in ARTICLES:
+            df = core.append_record(df, {"url": url, "L1": l1, "L2": l2, "sequential_paths": paths})
+            core.save_csv(df, path)
+            tree = core.knowledge_tree(df, path)
+            assert tree.n_rows == len(df)
+            if len(df) == 2:
+                early = df
+        assert core._store_index_path(path, "tree").exists()
+
+        fresh = KnowledgeTree.build(core.load_csv(path))
+        assert (tree.nodes == fresh.nodes).all() and (tree.posts == fresh.posts).all()
+        core._STORE_INDEX_CACHE.clear()
+        stored = core.load_store_index(KnowledgeTree, path)
+        assert isinstance(stored.posts, np.memmap) and (stored.posts == fresh.posts).all()
+        assert os.path.getsize(core._store_index_path(path, "tree")) < 4096  # nodes and postings live in side files
+        assert stored.to_dict() == fresh.to_dict()
+
+        # a stale frame gets an unsaved build; the persisted tree is untouched
+        stale = core.knowledge_tree(early, path)
+        assert stale.n_rows == 2 and core.load_store_index(KnowledgeTree, path).n_rows == len(ARTICLES)
+
+        # a rewritten store (same length, different rows) forces a rebuild
+        rewritten = _store(ARTICLES[::-1])
+        core.save_csv(rewritten, path, expected_version=core.store_version(path))
+        tree = core.knowledge_tree(core.load_csv(path), path)
+        assert tree.rows(tree.find(["Tech", "AI"])).tolist() == [3, 4]
+        print("✅ Incremental tree equals a rebuild, stale frames and rewrites are handled")
+
+
+def test_subtree_json_cache():
+    print("🧪 Testing cached subtree JSON and per-root invalidation...")
+    df = _store(ARTICLES + [("https://example.com/6", "Tech", "Web", [["HTML"]])])
+    tree = KnowledgeTree.build(df.iloc[:3])
+    for node, depth in ((0, None), (tree.find(["Tech"]), 1), (tree.find(["Tech", "AI", "ML"]), None)):
+        assert json.loads(tree.subtree_json(node, depth)) == tree.to_dict(node, depth)
+    tech, ai, web = (tree.subtree_json(tree.find(p)) for p in (["Tech"], ["Tech", "AI"], ["Tech", "Web"]))
+    assert tree.subtree_json(tree.find(["Tech", "AI"])) is ai      # served from the cache
+    version = tree.version
+
+    tree.extend(df.iloc[:5])                                       # Science / no L1: Tech untouched
+    assert tree.version > version and tree.subtree_json(tree.find(["Tech"])) is tech
+    tree.extend(df)                                                # Tech / Web touched
+    assert tree.subtree_json(tree.find(["Tech", "AI"])) is ai
+    assert tree.subtree_json(tree.find(["Tech", "Web"])) != web
+    assert json.loads(tree.subtree_json()) == tree.to_dict()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, "links.csv")
+        core.save_csv(df, path)
+        stored = core.load_csv(path)
+        assert json.loads(core.tree_json(stored, ["Tech"], path=path)) == KnowledgeTree.build(stored).to_dict(1)
+        assert core.tree_json(stored, ["Nope"], path=path) is None
+        assert core.knowledge_tree(stored, path).version == core.store_version(path)
+    print("✅ Subtree bytes equal to_dict and survive ingests that do not touch them")
+
+
+def test_rebuilt_when_synonyms_change():
+    print("🧪 Testing the persisted tree and its JSON cache after a tag-synonym map change...")
+    memory = [(f"https://example.com/{i}", "Tech", "GenAI", [["Memory", tag]])
+              for i, tag in enumerate(["Cross-Thread Memory", "Long-term Memory"])]
+    saved = core.TAG_SYNONYMS_PATH
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, "links.csv")
+        core.TAG_SYNONYMS_PATH = os.path.join(tmpdir, "tag_synonyms.json")
+        try:
+            core.save_csv(_store(memory), path)
+            before = json.loads(core.tree_json(core.load_csv(path), ["Tech", "GenAI", "Memory"], path=path))
+            assert sorted(c["label"] for c in before["children"]) == ["Cross-Thread Memory", "Long-term Memory"]
+
+            core.save_tag_synonyms({"Cross-Thread Memory": "Long-term Memory"})
+            df = core.load_csv(path)
+            tree = core.knowledge_tree(df, path)
+            memory_node = tree.find(["Tech", "GenAI", "Memory"])
+            assert [(label, count) for _, label, count in tree.children_page(memory_node)[0]] == [("Long-term Memory", 2)]
+            after = json.loads(core.tree_json(df, ["Tech", "GenAI"], path=path))
+            assert [(c["label"], c["count"]) for c in after["children"][0]["children"]] == [("Long-term Memory", 2)]
+            assert tree.tag_synonyms == core.tag_synonyms_signature()
+        finally:
+            core.TAG_SYNONYMS_PATH = saved
+    print("✅ A changed synonym map rebuilds the tree and drops its cached JSON")
+
+
+def test_children_pages():
+    print("🧪 Testing paginated children for the lazy tree view...")
+    rows = [(f"https://example.com/{i}", "Tech", "AI", [[f"tag{i % 130:03d}"]]) for i in range(300)]
+    df = _store(rows)
+    tree = KnowledgeTree.build(df.iloc[:200])
+    ai = tree.find(["Tech", "AI"])
+    pages, offset = [], 0
+    while True:
+        page, total = tree.children_page(ai, offset, 50)
+        if not page:
+            break
+        pages += page
+        offset += 50
+    assert total == 130 and [c for c, _, _ in pages] == tree.child_ids(ai)
+    assert pages[0] == (tree.find(["Tech", "AI", "tag000"]), "tag000", 2) and pages[-1][2] == 1
+    assert tree.children_page(tree.find(["Tech", "AI", "tag000"]))[1] == 0 and not tree.has_children(pages[0][0])
+
+    tree.extend(df)                                                # counts change: cached order refreshed
+    page, total = tree.children_page(ai, 0, 3)
+    assert total == 130 and [(label, count) for _, label, count in page] == [("tag000", 3), ("tag001", 3), ("tag002", 3)]
+    assert tree.child_ids(ai) == KnowledgeTree.build(df).child_ids(ai)
+    print("✅ Pages concatenate to the full ordered child list, with counts")
+
+
+def test_views_over_appends():
+    print("🧪 Testing per-node views while rows are appended...")
+    rows = [(f"https://example.com/{i}", f"L1-{i % 3}", f"L2-{i % 7}", [[f"t{i % 11}", f"u{i % 5}"], [f"t{i % 4}"]])
+            for i in range(400)]
+    df = _store(rows)
+    full = KnowledgeTree.build(df)
+    saved = tree_utils._GROUP_SLACK
+    tree_utils._GROUP_SLACK = 8  # rebuild the groupings often
+    try:
+        tree = KnowledgeTree.build(df.iloc[:20])
+        for stop in (21, 40, 41, 90, 200, 400):
+            tree.to_dict()                                         # groupings built, then outgrown
+            tree.extend(df.iloc[:stop])
+        assert tree.to_dict() == full.to_dict()
+        assert all(np.array_equal(tree.rows(node), full.rows(node)) for node in range(len(full)))
+    finally:
+        tree_utils._GROUP_SLACK = saved
+    print("✅ Grouped views plus the scanned tail equal a one-shot build")
+
+
+if __name__ == "__main__":
+    test_tree_structure()
+    test_incremental_sync_matches_rebuild()
+    test_subtree_json_cache()
+    test_rebuilt_when_synonyms_change()
+    test_children_pages()
+    test_views_over_appends()
+    print("\n✨ Test complete!")
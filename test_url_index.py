@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Test the url_canonical hash indexes for the links and cards stores
+"""
+
+import os
+import tempfile
+
+import pandas as pd
+
+import core
+
+
+def test_links_url_index_follows_appends():
+    print("🧪 Testing links url index...")
+    df = core.init_store()
+    df = core.append_record(df, {"url": "https://example.com/a/", "headline": "A"})
+    df = core.append_record(df, {"url": "https://example.com/b?utm_source=x", "headline": "B"})
+
+    assert core.url_index(df) == {"https://example.com/a": 0, "https://example.com/b": 1}
+    assert core.get_cached_row(df, "https://EXAMPLE.com/b")["headline"] == "B"
+    assert core.get_cached_row(df, "https://example.com/c") is None
+
+    # in-place edits invalidate stale positions instead of returning the wrong row
+    df.iloc[:] = df.iloc[::-1].to_numpy()
+    assert core.get_cached_row(df, "https://example.com/a")["headline"] == "A"
+    print("✅ Cache hits resolved through the index")
+
+
+def test_cards_url_index_extended_on_append():
+    print("🧪 Testing cards url index...")
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, "cards_store.csv")
+        df = core._ensure_cards_csv(path)
+        assert core.card_url_index(path) == {}
+
+        added = pd.DataFrame([
+            {"card_id": "c1", "url_canonical": "https://x.com/1", "question": "Q", "answer": "A",
+             "learned": False, "created_at_utc": "2025-01-01T00:00:00Z"},
+        ])
+        df = pd.concat([df, added], ignore_index=True)
+        core._save_cards_df(df, path, appended=added)
+        assert core.url_exists_in_cards("https://x.com/1", path)
+        assert not core.url_exists_in_cards("https://x.com/2", path)
+
+        # an external rewrite is picked up through the file signature
+        pd.concat([df, added.assign(card_id="c2", url_canonical="https://x.com/2")]).to_csv(path, index=False)
+        os.utime(path, ns=(0, 0))
+        assert core.card_url_index(path) == {"https://x.com/1": ["c1"], "https://x.com/2": ["c2"]}
+        print("✅ Card index tracks appends and external writes")
+
+
+if __name__ == "__main__":
+    test_links_url_index_follows_appends()
+    test_cards_url_index_extended_on_append()
+    print("\n✨ Test complete!")
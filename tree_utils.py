@@ -0,0 +1,303 @@
+"""
+Knowledge tree over the links store: L1 → L2 → L3 → L4 → L5 → L6.
+
+Every article adds [L1, L2] + each of its sequential_paths to a trie. Nodes
+are integer ids (0 = virtual root); each is one (parent, depth, label id) row
+of an append-only node array, labels interned in a TagDictionary. Every
+(node, article) posting is one row of an append-only posting array, written
+in article order, so a node's sorted article ids, its children and its
+count cost O(node/subtree) instead of a scan of the store.
+
+Both arrays are the live representation. core.knowledge_tree keeps them as
+raw files next to <store>.tree.index.pkl (read through np.memmap, grown by
+store_index.RowFile), so an ingest appends its rows and the pickle holds
+only the labels and stamps. Per-node views are built lazily in memory: CSR
+groupings of the children and postings by node (rows appended since are
+scanned directly until they make up a quarter of the array, then the
+grouping is rebuilt) and per-node article counts.
+
+subtree_json serves the JSON of the root, an L1 or an L2 subtree as bytes
+from a per-process cache kept in the tree. Each extend takes a new tree
+version (the frame's store_version when it has one, so it only grows) and
+stamps the root, L1 and L2 nodes its articles touch; a cached entry is
+served only while its node's stamp is unchanged. An L1's bytes are stitched
+from its L2 children's cached bytes, so an ingest re-serializes just the L2
+subtree it touched, and untouched roots are never rebuilt.
+"""
+import json
+import typing as T
+
+import numpy as np
+import pandas as pd
+
+from lazy_columns import orjson
+from store_index import RowFile, StoreIndex
+from tag_index import TagDictionary
+
+LEVELS = ["L1", "L2", "L3", "L4", "L5", "L6"]
+MAX_PATH_TAGS = 4  # L3..L6, as in process_sequential_paths_with_relationships
+CACHED_DEPTH = 2   # subtree_json caches the root, L1 and L2 nodes
+_GROUP_SLACK = 4096  # appended rows scanned directly before a grouping is rebuilt
+
+
+def _dumps(obj: T.Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+class KnowledgeTree(StoreIndex):
+    name = "tree"
+
+    def __init__(self):
+        super().__init__()
+        self.dictionary = TagDictionary([""])
+        self.n_nodes, self.n_posts = 1, 0
+        self.version = 0
+        self.stamps: T.Dict[int, int] = {}   # root/L1/L2 node -> version that last changed it
+        self._detach()
+
+    def _detach(self) -> None:
+        self._node_file: T.Optional[RowFile] = None
+        self._post_file: T.Optional[RowFile] = None
+        self.nodes = np.array([[-1, 0, 0]], dtype=np.int32)[:self.n_nodes]  # (parent, depth, label id)
+        self.posts = np.zeros((0, 2), dtype=np.int32)                          # (node, article)
+        self._groups: T.Dict[str, T.Tuple[int, np.ndarray, np.ndarray]] = {}
+        self._counts: T.Optional[np.ndarray] = None
+        self._child_of: T.Dict[T.Tuple[int, int], int] = {}
+        self._expanded: T.Set[int] = set()
+        self._json: T.Dict[T.Tuple[int, T.Optional[int]], T.Tuple[int, bytes]] = {}
+        self._order: T.Dict[int, T.Tuple[int, T.List[int]]] = {}
+
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        for key in ("_node_file", "_post_file", "nodes", "posts", "_groups", "_counts",
+                    "_child_of", "_expanded", "_json", "_order"):
+            state.pop(key)
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self._detach()
+
+    def attach(self, index_file: str) -> None:
+        base = index_file[:-len(".pkl")]
+        self._node_file = RowFile(base + ".nodes.i32", np.int32, 3)
+        self._post_file = RowFile(base + ".posts.i32", np.int32, 2)
+        if not self.n_rows:
+            self._node_file.rewrite(self.nodes)
+            self._post_file.rewrite(self.posts)
+        self._reopen()
+
+    def _reopen(self) -> None:
+        self.nodes = self._node_file.read(self.n_nodes)
+        self.posts = self._post_file.read(self.n_posts)
+
+    # ---- building ----
+    def _child(self, node: int, label: int, new: T.List[T.Tuple[int, int, int]]) -> int:
+        if node not in self._expanded:
+            children = self._children(node)
+            self._child_of.update(zip(zip([node] * len(children), self.nodes[children, 2].tolist()), children.tolist()))
+            self._expanded.add(node)
+        child = self._child_of.get((node, label))
+        if child is None:
+            child = self.n_nodes + len(new)
+            depth = self.nodes[node, 1] + 1 if node < self.n_nodes else new[node - self.n_nodes][1] + 1
+            new.append((node, int(depth), label))
+            self._child_of[(node, label)] = child
+            self._expanded.add(child)
+        return child
+
+    def _add_rows(self, df: pd.DataFrame, start: int) -> None:
+        self.version = max(self.version + 1, int(df.attrs.get("store_version") or 0))
+        tail = df.iloc[start:]
+        new: T.List[T.Tuple[int, int, int]] = []
+        posts: T.List[T.Tuple[int, int]] = []
+        intern = self.dictionary.intern
+        for article, l1, l2, paths in zip(
+            range(start, len(df)), tail["L1"].tolist(), tail["L2"].tolist(), tail["sequential_paths"].tolist()
+        ):
+            if not isinstance(l1, str) or not l1:
+                continue  # articles without L1 are left out
+            top = self._child(0, intern(l1), new)
+            posts += [(0, article), (top, article)]
+            self.stamps[0] = self.stamps[top] = self.version
+            if not isinstance(l2, str) or not l2:
+                continue
+            top = self._child(top, intern(l2), new)
+            posts.append((top, article))
+            self.stamps[top] = self.version
+            seen = set()
+            for path in paths if isinstance(paths, list) else []:
+                if not isinstance(path, list):
+                    continue
+                node = top
+                for tag in path[:MAX_PATH_TAGS]:
+                    if not isinstance(tag, str) or not tag:
+                        break
+                    node = self._child(node, intern(tag), new)
+                    if node not in seen:  # an article is posted once per node
+                        seen.add(node)
+                        posts.append((node, article))
+        nodes = np.array(new, dtype=np.int32).reshape(-1, 3)
+        pairs = np.array(posts, dtype=np.int32).reshape(-1, 2)
+        if self._counts is not None:
+            self._counts = np.concatenate([self._counts, np.zeros(len(nodes), dtype=np.int64)])
+            np.add.at(self._counts, pairs[:, 0], 1)
+        if self._node_file is not None:
+            self._node_file.append(nodes, self.n_nodes)
+            self._post_file.append(pairs, self.n_posts)
+        else:
+            self.nodes = np.concatenate([self.nodes, nodes])
+            self.posts = np.concatenate([self.posts, pairs])
+        self.n_nodes, self.n_posts = self.n_nodes + len(nodes), self.n_posts + len(pairs)
+        if self._node_file is not None:
+            self._reopen()
+        self._json = {key: hit for key, hit in self._json.items() if hit[0] == self.stamps.get(key[0], 0)}
+
+    # ---- per-node views ----
+    def _members(self, name: str, keys: np.ndarray, values: T.Optional[np.ndarray], group: int) -> np.ndarray:
+        """
+        values (row positions if None) of the rows whose key is group, in row
+        order: a CSR slice over the first `covered` rows plus a scan of the rest.
+        """
+        n = len(keys)
+        cached = self._groups.get(name)
+        if cached is None or n - cached[0] > max(_GROUP_SLACK, cached[0] // 4):
+            order = np.argsort(keys, kind="stable")
+            ptr = np.searchsorted(np.asarray(keys)[order], np.arange(self.n_nodes + 1))
+            cached = self._groups[name] = (n, ptr, order if values is None else np.asarray(values)[order])
+        covered, ptr, grouped = cached
+        base = grouped[ptr[group]:ptr[group + 1]] if group + 1 < len(ptr) else grouped[:0]
+        if covered == n:
+            return base
+        hit = np.flatnonzero(np.asarray(keys[covered:]) == group)
+        return np.concatenate([base, hit + covered if values is None else np.asarray(values[covered:])[hit]])
+
+    def _children(self, node: int) -> np.ndarray:
+        return self._members("children", self.nodes[:, 0], None, node)
+
+    def label(self, node: int) -> str:
+        return self.dictionary.terms[self.nodes[node, 2]]
+
+    # ---- queries ----
+    def __len__(self) -> int:
+        return self.n_nodes
+
+    @property
+    def roots(self) -> T.List[int]:
+        return self.child_ids(0)
+
+    def find(self, path: T.Sequence[str]) -> T.Optional[int]:
+        """Node id for [L1, L2, L3, ...] (a prefix is fine), None if absent."""
+        node = 0
+        for label in path:
+            tid = self.dictionary.ids.get(label)
+            if tid is None:
+                return None
+            children = self._children(node)
+            match = children[self.nodes[children, 2] == tid]
+            if not len(match):
+                return None
+            node = int(match[0])
+        return node
+
+    def child_ids(self, node: int) -> T.List[int]:
+        """Children by article count (desc), then label; cached for the root, L1 and L2 nodes."""
+        children = self._children(node)
+        depth = self.nodes[node, 1]
+        if depth <= CACHED_DEPTH:
+            hit = self._order.get(node)
+            if hit is not None and hit[0] == self.stamps.get(node, 0) and len(hit[1]) == len(children):
+                return hit[1]
+        counts = self._article_counts()
+        ids = sorted(children.tolist(), key=lambda c: (-counts[c], self.label(c)))
+        if depth <= CACHED_DEPTH:
+            self._order[node] = (self.stamps.get(node, 0), ids)
+        return ids
+
+    def has_children(self, node: int) -> bool:
+        return bool(len(self._children(node)))
+
+    def children_page(self, node: int, offset: int = 0, limit: int = 50) -> T.Tuple[T.List[T.Tuple[int, str, int]], int]:
+        """One page of (child id, label, article count) in child_ids order, plus the total number of children."""
+        ids = self.child_ids(node)
+        return [(c, self.label(c), self.count(c)) for c in ids[offset:offset + limit]], len(ids)
+
+    def _article_counts(self) -> np.ndarray:
+        if self._counts is None:
+            self._counts = np.bincount(np.asarray(self.posts[:, 0]), minlength=self.n_nodes)
+        return self._counts
+
+    def count(self, node: int) -> int:
+        return int(self._article_counts()[node])
+
+    def level(self, node: int) -> T.Optional[str]:
+        return LEVELS[self.nodes[node, 1] - 1] if node else None
+
+    def path(self, node: int) -> T.List[str]:
+        """Breadcrumb [L1, L2, ...] of a node."""
+        out = []
+        while node > 0:
+            out.append(self.label(node))
+            node = int(self.nodes[node, 0])
+        return out[::-1]
+
+    def rows(self, node: int) -> np.ndarray:
+        """Sorted row positions of the articles at or below node."""
+        return self._members("posts", self.posts[:, 0], self.posts[:, 1], node).astype(np.int64)
+
+    def to_dict(self, node: int = 0, max_depth: T.Optional[int] = None) -> dict:
+        """JSON-ready subtree: {"id", "label", "level", "count", "children"}; max_depth counts from node."""
+        out = {"id": node, "label": self.label(node), "level": self.level(node),
+               "count": self.count(node), "children": []}
+        if max_depth is None or max_depth > 0:
+            below = None if max_depth is None else max_depth - 1
+            out["children"] = [self.to_dict(c, below) for c in self.child_ids(node)]
+        return out
+
+    def subtree_json(self, node: int = 0, max_depth: T.Optional[int] = None) -> bytes:
+        """to_dict(node, max_depth) serialized, cached for the root, L1 and L2 nodes."""
+        if self.nodes[node, 1] > CACHED_DEPTH:
+            return _dumps(self.to_dict(node, max_depth))
+        stamp = self.stamps.get(node, 0)
+        hit = self._json.get((node, max_depth))
+        if hit is not None and hit[0] == stamp:
+            return hit[1]
+        head = _dumps({"id": node, "label": self.label(node), "level": self.level(node), "count": self.count(node)})
+        children = b""
+        if max_depth is None or max_depth > 0:
+            below = None if max_depth is None else max_depth - 1
+            children = b",".join(self.subtree_json(c, below) for c in self.child_ids(node))
+        data = head[:-1] + b',"children":[' + children + b"]}"
+        self._json[(node, max_depth)] = (stamp, data)
+        return data
+
+
+def build_hierarchical_tree(df_articles: pd.DataFrame, selected_filters: T.Optional[T.Dict[str, T.Sequence[str]]] = None) -> dict:
+    """
+    Tree JSON for a frame, optionally restricted by {"L1": [...], "L2": [...]}.
+    One-off helper; the app uses the persisted core.knowledge_tree instead.
+    """
+    tree = KnowledgeTree.build(df_articles)
+    root = tree.to_dict()
+    for depth, level in enumerate(LEVELS[:2]):
+        wanted = set((selected_filters or {}).get(level) or ())
+        if not wanted:
+            continue
+        if depth == 0:
+            root["children"] = [c for c in root["children"] if c["label"] in wanted]
+        else:
+            for top in root["children"]:
+                top["children"] = [c for c in top["children"] if c["label"] in wanted]
+    return root
+
+
+def filter_articles_by_tree_node(df_articles: pd.DataFrame, selected_path: T.Sequence[str],
+                                 tree: T.Optional[KnowledgeTree] = None) -> pd.DataFrame:
+    """Rows whose tree paths pass through selected_path ([L1, L2, L3, ...])."""
+    tree = tree if tree is not None else KnowledgeTree.build(df_articles)
+    node = tree.find(selected_path)
+    if node is None:
+        return df_articles.iloc[:0]
+    return df_articles.iloc[tree.rows(node)]